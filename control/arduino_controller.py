@@ -14,7 +14,6 @@ class ArduinoController:
                 cls._instance.port = port
                 cls._instance.baud = baud
                 cls._instance.serial_conn = None
-                cls._instance.connect()
             return cls._instance
 
     def connect(self):
@@ -30,14 +29,16 @@ class ArduinoController:
         """Envía un comando al Arduino en el formato: q1,q2,z,grip"""
         command = f"{q1},{q2},{z},{grip}\n"
         try:
+            # Conexión perezosa: se abre el puerto en el primer comando, no al importar
+            if not (self.serial_conn and self.serial_conn.is_open):
+                self.connect()
             if self.serial_conn and self.serial_conn.is_open:
                 self.serial_conn.write(command.encode('utf-8'))
                 # Leer respuesta (si la hay)
                 response = self.serial_conn.readline().decode().strip()
                 return response
             else:
-                self.connect()
-                return "Reconnected and sent"
+                return "Error: Arduino no conectado"
         except Exception as e:
             print(f"Error sending command: {e}")
             return f"Error: {e}"
@@ -0,0 +1,107 @@
+"""
+Caché de respuestas de la API de posiciones/secuencias.
+
+Cada recurso ('positions', 'sequences') tiene una versión que las señales
+de signals.py cambian en cada cambio; vive en shared_versions, así que un
+cambio hecho en otro worker también invalida este. El JSON ya renderizado se
+guarda por (recurso, versión, query string) y el ETag sale de esos mismos
+datos, así que un If-None-Match se resuelve con 304 sin tocar la base de
+datos ni serializar nada.
+"""
+import hashlib
+import threading
+
+from django.http import HttpResponse, HttpResponseNotModified
+from rest_framework.pagination import CursorPagination
+from rest_framework.renderers import JSONRenderer
+
+from . import shared_versions
+
+POSITIONS = 'positions'
+SEQUENCES = 'sequences'
+
+
+class ApiCursorPagination(CursorPagination):
+    """Paginación por cursor (estable aunque se inserten filas)."""
+    ordering = 'id'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+def wants_pagination(request):
+    """Los clientes existentes reciben la lista completa; pagina solo si se pide."""
+    return 'cursor' in request.query_params or 'page_size' in request.query_params
+
+
+class ResponseCache:
+    """Cuerpos JSON de este proceso por recurso y versión (compartida)."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+    def version(self, resource):
+        return shared_versions.current(f'api:{resource}')
+
+    def bump(self, *resources):
+        """Invalida los recursos: nueva versión y fuera sus cuerpos cacheados."""
+        with self._lock:
+            for resource in resources:
+                shared_versions.bump(f'api:{resource}')
+                for key in [k for k in self._bodies if k[0] == resource]:
+                    del self._bodies[key]
+
+    def etag(self, resource, version, query):
+        digest = hashlib.sha1(query.encode()).hexdigest()[:12]
+        return f'"{resource}-{version}-{digest}"'
+
+    def get(self, resource, version, query):
+        return self._bodies.get((resource, version, query))
+
+    def set(self, resource, version, query, body):
+        with self._lock:
+            # Si cambió la versión mientras se serializaba, no guardar
+            if version != self.version(resource):
+                return
+            # Cuerpos de versiones viejas (las cambió otro proceso) ya no sirven
+            for key in [k for k in self._bodies if k[0] == resource and k[1] != version]:
+                del self._bodies[key]
+            if len(self._bodies) >= self.max_entries:
+                self._bodies.pop(next(iter(self._bodies)))
+            self._bodies[(resource, version, query)] = body
+
+
+def _etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(',')]
+    return '*' in candidates or etag in candidates or f'W/{etag}' in candidates
+
+
+def cached_list_response(request, resource, build):
+    """
+    Respuesta GET cacheada para `resource`. `build()` retorna los datos
+    (lista o página) y solo se llama si no hay cuerpo en caché.
+    """
+    query = request.META.get('QUERY_STRING', '')
+    version = response_cache.version(resource)
+    etag = response_cache.etag(resource, version, query)
+
+    if _etag_matches(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        body = response_cache.get(resource, version, query)
+        if body is None:
+            body = JSONRenderer().render(build())
+            response_cache.set(resource, version, query, body)
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'      # Revalidar siempre con If-None-Match
+    return response
+
+
+# Instancia global
+response_cache = ResponseCache()
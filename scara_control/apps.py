@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ScaraControlConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'scara_control'
+
+    def ready(self):
+        # Registra los receivers que invalidan la caché de secuencias
+        from . import signals  # noqa: F401
@@ -1,108 +1,551 @@
 import serial
 import threading
 import time
+from collections import OrderedDict
 
+from . import metrics, motion_log, protocol
 from .mock_arduino_controller import MockArduinoController
 
+
+# Límites aplicados a cada comando (ver send_position)
+ARM1_LIMITS = (-90, 90)        # grados
+ARM2_LIMITS = (-120, 60)       # grados
+BASE_LIMITS = (-12.5, 12.5)    # cm
+SPEED_LIMITS = (100, 2000)     # pasos/s
+
+
+def clamp_position(arm1_angle, arm2_angle, base_height, speed=500):
+    """Limita ángulos, altura y velocidad a los rangos que acepta el robot."""
+    return (
+        max(ARM1_LIMITS[0], min(ARM1_LIMITS[1], arm1_angle)),
+        max(ARM2_LIMITS[0], min(ARM2_LIMITS[1], arm2_angle)),
+        max(BASE_LIMITS[0], min(BASE_LIMITS[1], base_height)),
+        max(SPEED_LIMITS[0], min(SPEED_LIMITS[1], speed)),
+    )
+
+
+def gripper_to_bool(gripper_state):
+    """Gripper: aceptar bool o número (True/≠0 = cerrada)."""
+    if isinstance(gripper_state, bool):
+        return gripper_state
+    if isinstance(gripper_state, (int, float)):
+        return bool(gripper_state)
+    return False
+
+
+class _PendingCommand:
+    """Comando enviado que espera su DONE/ERROR; lo completa el hilo lector."""
+
+    def __init__(self, seq=None):
+        self.seq = seq                 # Número de secuencia en modo binario
+        self.event = threading.Event()
+        self.result = False
+        # Solo en modo pipeline
+        self.frame = None              # Bytes enviados, para retransmitir
+        self.sent_at = 0.0
+        self.acked = False             # El firmware confirmó QUEUED
+        self.retries = 0
+        self._callbacks = []
+        self._callbacks_lock = threading.Lock()
+
+    def complete(self, result):
+        with self._callbacks_lock:
+            if self.event.is_set():
+                return
+            self.result = result
+            self.event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(result)
+
+    def add_done_callback(self, callback):
+        """Llama a callback(result) al completarse (en el hilo lector)."""
+        with self._callbacks_lock:
+            if not self.event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self.result)
+
+
 class ArduinoController:
     """
     Controlador de Arduino mejorado con manejo de confirmación DONE.
     Servo: 180° = ABIERTO, 119° = CERRADO
+    protocol_preference: 'auto' negocia el modo binario al conectar y cae a
+    CSV si el firmware no lo soporta; 'csv' lo desactiva y 'binary' lo usa
+    aunque el firmware no confirme.
+    pipeline_request: en binario, pide además el modo pipeline con hasta ese
+    número de comandos sin DONE (ventana deslizante, con retransmisión si no
+    llega el QUEUED a tiempo). 0, o un firmware sin buffer circular, deja el
+    stop-and-wait de siempre.
     """
-    _instance = None
-    _lock = threading.Lock()
-
-    def __new__(cls, port='COM10', baud=9600):
-        with cls._lock:
-            if cls._instance is None:
-                cls._instance = super(ArduinoController, cls).__new__(cls)
-                cls._instance.port = port
-                cls._instance.baud = baud
-                cls._instance.serial_conn = None
-                # Base inicial en centímetros (±12.5 cm)
-                cls._instance.last_position = {
-                    'arm1': 0,
-                    'arm2': 0,
-                    'base': 0,
-                    'gripper': False,
-                    'speed': 500
-                }
-                cls._instance.is_connected = False
-                cls._instance.current_gripper_state = False
-                cls._instance.is_busy = False          # Indica si está ejecutando un movimiento
-                cls._instance.waiting_for_done = False # Esperando “DONE” del Arduino
-                cls._instance.response_timeout = 30.0  # Timeout en segundos
-                cls._instance.connect()
-            return cls._instance
+    def __init__(self, port='COM10', baud=9600, name='default'):
+        self.name = name               # Id del robot (registro de robots, métricas)
+        self.port = port
+        self.baud = baud
+        self.serial_conn = None
+        # Base inicial en centímetros (±12.5 cm)
+        self.last_position = {
+            'arm1': 0,
+            'arm2': 0,
+            'base': 0,
+            'gripper': False,
+            'speed': 500
+        }
+        self.is_connected = False
+        self.current_gripper_state = False
+        self.is_busy = False          # Indica si está ejecutando un movimiento
+        self.waiting_for_done = False # Esperando “DONE” del Arduino
+        self.response_timeout = 30.0  # Timeout en segundos
+        # Hilo lector: es el único que lee del puerto
+        self._reader_thread = None
+        self._stop_reader = threading.Event()
+        self._ready_event = threading.Event()
+        self._write_lock = threading.Lock()
+        self._connect_lock = threading.Lock()
+        self._pending = None          # _PendingCommand en espera de DONE/ERROR
+        self._status_listeners = []   # Callbacks ante cambios de estado
+        self._stream_unacked = 0      # Comandos CSV en streaming sin su DONE
+        self._stream_seqs = set()     # Frames binarios en streaming sin respuesta
+        self._stream_cond = threading.Condition()
+        # Protocolo: 'csv' (líneas de texto) o 'binary' (frames con seq y CRC)
+        self.protocol_preference = 'auto'
+        self.protocol_mode = 'csv'
+        self.protocol_timeout = 2.0
+        self._proto_event = threading.Event()
+        self._decoder = protocol.reply_decoder()
+        self._seq = 0
+        # Pipeline: ventana negociada (0 = stop-and-wait)
+        self.pipeline_request = 0
+        self.pipeline_window = 0
+        self.ack_timeout = 0.5     # Espera del QUEUED antes de retransmitir
+        self.max_retries = 5
+        self.retransmissions = 0
+        self._inflight = OrderedDict()  # seq → _PendingCommand sin DONE
+        self._last_progress = 0.0
+        self._pipe_event = threading.Event()
+        self._pipe_event.set()
+        self._retransmit_thread = None
+        self.motion_log = None     # motion_log.MotionLog de E/S del puerto
         
     def connect(self):
         """Establece la conexión serial con Arduino y espera el mensaje inicial."""
+        with self._connect_lock:
+            self._connect()
+
+    def connect_in_background(self):
+        """Conecta en un hilo aparte para no bloquear el arranque del proceso."""
+        threading.Thread(target=self.connect, name="arduino-connect", daemon=True).start()
+
+    def _connect(self):
         if self.serial_conn is None or not self.serial_conn.is_open:
             try:
+                self._ready_event.clear()
+                self._reset_stream()
+                self.protocol_mode = 'csv'
+                self.pipeline_window = 0
+                self._decoder = protocol.reply_decoder()
                 self.serial_conn = serial.Serial(self.port, self.baud, timeout=1)
-                # Pequeña pausa para que Arduino resetee
-                time.sleep(2)
-                
-                # Leer el primer “Sistema iniciado… DONE”
-                self._wait_for_ready()
-                
+                self._start_reader()
+
+                # Esperar el primer “Sistema iniciado… DONE” (el Arduino se
+                # resetea al abrir el puerto; el hilo lector avisa al llegar)
+                if not self._wait_for_ready():
+                    print("[ArduinoController] ⚠️ No se recibió el mensaje inicial, se continúa")
+                    self._ready_event.set()
+
+                self._negotiate_protocol()
                 self.is_connected = True
+                metrics.RECONNECTS.inc(robot=self.name, result='ok')
                 print(f"[ArduinoController] Conectado a Arduino en {self.port}")
             except Exception as e:
                 self.is_connected = False
+                metrics.RECONNECTS.inc(robot=self.name, result='error')
                 print(f"[ArduinoController] Error conectando a Arduino: {e}")
+            self._notify_status()
+
+    def add_status_listener(self, callback):
+        """Registra un callback sin argumentos que se llama en cada cambio de estado."""
+        if callback not in self._status_listeners:
+            self._status_listeners.append(callback)
+
+    def remove_status_listener(self, callback):
+        if callback in self._status_listeners:
+            self._status_listeners.remove(callback)
+
+    def _notify_status(self):
+        for callback in list(self._status_listeners):
+            try:
+                callback()
+            except Exception as e:
+                print(f"[ArduinoController] Error en listener de estado: {e}")
+
+    def _negotiate_protocol(self):
+        """Pide el modo binario; si el firmware no lo acepta se queda en CSV."""
+        if self.protocol_preference == 'csv':
+            return
+        self._proto_event.clear()
+        with self._write_lock:
+            self._write_serial(protocol.PROTO_REQUEST)
+            self.serial_conn.flush()
+        self._proto_event.wait(self.protocol_timeout)
+        self._proto_event.set()
+        if self.protocol_preference == 'binary' and self.protocol_mode != 'binary':
+            # Forzado: se usa binario aunque el firmware no haya confirmado
+            self._set_binary_mode()
+        print(f"[ArduinoController] Protocolo: {self.protocol_mode}")
+        if self.protocol_mode == 'binary' and self.pipeline_request > 0:
+            self._negotiate_pipeline()
+
+    def _negotiate_pipeline(self):
+        """Pide el modo pipeline; sin respuesta válida se sigue en stop-and-wait."""
+        self._pipe_event.clear()
+        with self._write_lock:
+            self._write_serial(protocol.pipe_request(self.pipeline_request, self._seq + 1))
+            self.serial_conn.flush()
+        self._pipe_event.wait(self.protocol_timeout)
+        self._pipe_event.set()
+        if self.pipeline_window:
+            self._start_retransmitter()
+            print(f"[ArduinoController] Pipeline: ventana de {self.pipeline_window} comandos")
+        else:
+            print("[ArduinoController] Pipeline no soportado por el firmware, stop-and-wait")
+
+    def _set_binary_mode(self):
+        self.protocol_mode = 'binary'
+        self._decoder.binary = True
+
+    def _start_reader(self):
+        """Arranca el hilo lector dueño del puerto (si no está ya corriendo)."""
+        if self._reader_thread is not None and self._reader_thread.is_alive():
+            return
+        self._stop_reader.clear()
+        self._reader_thread = threading.Thread(
+            target=self._reader_loop, name="arduino-reader", daemon=True
+        )
+        self._reader_thread.start()
+
+    def _reader_loop(self):
+        """
+        Lee el puerto de forma continua, arma líneas/frames y despacha cada uno.
+        read() retorna en cuanto llegan bytes, sin polling con sleep.
+        """
+        while not self._stop_reader.is_set():
+            conn = self.serial_conn
+            if conn is None or not conn.is_open:
+                break
+            try:
+                raw = conn.read(conn.in_waiting or 1)
+            except Exception as e:
+                if not self._stop_reader.is_set():
+                    print(f"[ArduinoController] Error leyendo del puerto: {e}")
+                    self.is_connected = False
+                    self._fail_pending()
+                    self._notify_status()
+                break
+            if not raw:
+                continue
+            log = self.motion_log
+            for kind, value in self._decoder.feed(raw):
+                if kind == 'frame':
+                    if log is not None:
+                        log.record_rx_frame(*value)
+                    self._handle_frame(*value)
+                else:
+                    if log is not None:
+                        log.record_rx_line(value)
+                    self._handle_line(value)
+
+    def _write_serial(self, data):
+        """Escribe al puerto (con _write_lock tomado) y lo anota en el motion log."""
+        self.serial_conn.write(data)
+        if self.motion_log is not None:
+            self.motion_log.record_tx(data)
+
+    def _handle_line(self, response):
+        """Procesa una línea recibida: marca listo y completa el comando pendiente."""
+        if not self._ready_event.is_set():
+            print(f"[ArduinoController] Arduino: {response}")
+            if "DONE" in response or "iniciado" in response:
+                self._ready_event.set()
+            return
+
+        print(f"[ArduinoController] Arduino respuesta: {response}")
+        if not self._proto_event.is_set() and self.protocol_preference != 'csv':
+            if protocol.PROTO_ACCEPT in response:
+                self._set_binary_mode()
+                self._proto_event.set()
+                return
+            if "descartada" in response or "ERROR" in response:
+                # Firmware sin modo binario: seguimos con CSV
+                self._proto_event.set()
+                return
+
+        capacity = protocol.parse_pipe_accept(response)
+        if capacity is not None:
+            if not self._pipe_event.is_set():
+                self.pipeline_window = min(self.pipeline_request, capacity)
+                self._pipe_event.set()
+            return
+        if not self._pipe_event.is_set() and ("descartada" in response or "ERROR" in response):
+            # Firmware sin buffer circular
+            self._pipe_event.set()
+            return
+
+        # ARDUINO.txt no tiene ERROR: una línea que no ejecutó es "Línea descartada"
+        rejected = "ERROR" in response or "descartada" in response
+        if rejected:
+            metrics.ERROR_REPLIES.inc(robot=self.name)
+        if ("DONE" in response or rejected) and self._stream_unacked > 0:
+            # Confirmación de un punto enviado en streaming: no es del pendiente
+            with self._stream_cond:
+                self._stream_unacked -= 1
+                self._stream_cond.notify_all()
+            return
+
+        pending = self._pending
+        if pending is None or pending.seq is not None:
+            return
+        if "DONE" in response:
+            print("[ArduinoController] ✅ Confirmación DONE recibida")
+            pending.complete(True)
+        elif rejected:
+            print(f"[ArduinoController] ❌ Error reportado por Arduino: {response}")
+            pending.complete(False)
+
+    def _handle_frame(self, seq, status):
+        """Procesa un frame binario de respuesta, emparejado por número de secuencia."""
+        if status in (protocol.STATUS_ERROR, protocol.STATUS_BAD_CRC):
+            metrics.ERROR_REPLIES.inc(robot=self.name)
+        if self.pipeline_window:
+            self._handle_pipelined_reply(seq, status)
+            return
+        if seq in self._stream_seqs:
+            with self._stream_cond:
+                self._stream_seqs.discard(seq)
+                self._stream_cond.notify_all()
+            return
+        pending = self._pending
+        if pending is None or pending.seq != seq:
+            print(f"[ArduinoController] Respuesta binaria sin comando asociado (seq={seq})")
+            return
+        if status == protocol.STATUS_DONE:
+            print(f"[ArduinoController] ✅ Confirmación DONE recibida (seq={seq})")
+            pending.complete(True)
+        else:
+            print(f"[ArduinoController] ❌ Error reportado por Arduino (seq={seq}, status={status})")
+            pending.complete(False)
+
+    # ------------------------------------------------------------------
+    # Pipeline (ventana deslizante)
+    # ------------------------------------------------------------------
+    def _handle_pipelined_reply(self, seq, status):
+        """
+        QUEUED marca el comando como recibido (ya no se retransmite); DONE y
+        ERROR lo sacan de la ventana. El firmware ejecuta en orden, así que
+        una respuesta también vale para los comandos anteriores a ese seq
+        cuya respuesta se haya perdido.
+        """
+        finished = []
+        with self._stream_cond:
+            if seq not in self._inflight:
+                return      # Respuesta repetida a una retransmisión
+            if status == protocol.STATUS_QUEUED:
+                for inflight_seq, pending in self._inflight.items():
+                    pending.acked = True
+                    if inflight_seq == seq:
+                        break
+                return
+            if status in (protocol.STATUS_FULL, protocol.STATUS_BAD_CRC):
+                # No quedó en el buffer: se reenvía cuando venza ack_timeout
+                self._inflight[seq].acked = False
+                return
+            while self._inflight:
+                inflight_seq, pending = self._inflight.popitem(last=False)
+                ok = inflight_seq != seq or status == protocol.STATUS_DONE
+                finished.append((pending, ok))
+                if inflight_seq == seq:
+                    break
+            self._last_progress = time.monotonic()
+            self._stream_cond.notify_all()
+        for pending, ok in finished:
+            if not ok:
+                print(f"[ArduinoController] ❌ Error reportado por Arduino (seq={pending.seq}, status={status})")
+            pending.complete(ok)
+
+    def _send_pipelined(self, arm1_angle, arm2_angle, base_height, gripper_code, speed):
+        """
+        Envía un frame en cuanto hay lugar en la ventana y retorna su
+        _PendingCommand sin esperar el DONE (None si no se pudo enviar).
+        """
+        with self._stream_cond:
+            if not self._stream_cond.wait_for(
+                lambda: len(self._inflight) < self.pipeline_window or not self.is_connected,
+                self.response_timeout,
+            ) or not self.is_connected:
+                return None
+            command, seq = self._encode_command(arm1_angle, arm2_angle, base_height, gripper_code, speed)
+            pending = _PendingCommand(seq)
+            pending.frame = command
+            if not self._inflight:
+                self._last_progress = time.monotonic()
+            self._inflight[seq] = pending
+            try:
+                with self._write_lock:
+                    pending.sent_at = time.monotonic()
+                    self._write_serial(command)
+            except Exception as e:
+                del self._inflight[seq]
+                print(f"[ArduinoController] Error enviando frame (seq={seq}): {e}")
+                return None
+        return pending
+
+    def _start_retransmitter(self):
+        if self._retransmit_thread is not None and self._retransmit_thread.is_alive():
+            return
+        self._retransmit_thread = threading.Thread(
+            target=self._retransmit_loop, name="arduino-retransmit", daemon=True
+        )
+        self._retransmit_thread.start()
+
+    def _retransmit_loop(self):
+        while not self._stop_reader.is_set() and self.pipeline_window:
+            time.sleep(self.ack_timeout / 4)
+            try:
+                self._check_inflight()
+            except Exception as e:
+                print(f"[ArduinoController] Error en retransmisión: {e}")
+
+    def _check_inflight(self):
+        """
+        Go-back-N: si el comando más antiguo sin QUEUED venció ack_timeout se
+        reenvía junto con todos los posteriores (el firmware descarta lo que
+        llega fuera de orden). Tras max_retries, o sin ningún DONE durante
+        response_timeout, se dan por fallidos todos los comandos en vuelo.
+        """
+        now = time.monotonic()
+        expired = []
+        with self._stream_cond:
+            unacked = [p for p in self._inflight.values() if not p.acked]
+            if unacked and now - unacked[0].sent_at > self.ack_timeout:
+                if unacked[0].retries >= self.max_retries:
+                    expired = list(self._inflight.values())
+                else:
+                    print(f"[ArduinoController] ⚠️ Sin QUEUED para seq={unacked[0].seq}, "
+                          f"retransmitiendo {len(unacked)} comando(s)")
+                    with self._write_lock:
+                        for pending in unacked:
+                            pending.retries += 1
+                            pending.sent_at = now
+                            self._write_serial(pending.frame)
+                    self.retransmissions += len(unacked)
+                    metrics.RETRANSMISSIONS.inc(len(unacked), robot=self.name)
+            elif self._inflight and now - self._last_progress > self.response_timeout:
+                expired = list(self._inflight.values())
+            if expired:
+                self._inflight.clear()
+                self._stream_cond.notify_all()
+        if expired:
+            metrics.DONE_TIMEOUTS.inc(len(expired), robot=self.name)
+            print(f"[ArduinoController] ❌ {len(expired)} comando(s) sin confirmación, resincronizando")
+            for pending in expired:
+                pending.complete(False)
+            # Un PROTO PIPE nuevo resincroniza el seq que espera el firmware
+            with self._stream_cond, self._write_lock:
+                self._write_serial(protocol.pipe_request(self.pipeline_request, self._seq + 1))
+
+    def send_position_async(self, arm1_angle, arm2_angle, base_height, gripper_state, speed=500):
+        """
+        En modo pipeline: envía el comando sin esperar su DONE y retorna el
+        _PendingCommand (add_done_callback / event). Bloquea solo si la
+        ventana está llena. Retorna None si no se pudo enviar.
+        """
+        if not self.pipeline_window or not (self.serial_conn and self.serial_conn.is_open):
+            return None
+        arm1_angle, arm2_angle, base_height, speed = clamp_position(
+            arm1_angle, arm2_angle, base_height, speed
+        )
+        gripper_closed = gripper_to_bool(gripper_state)
+        pending = self._send_pipelined(
+            arm1_angle, arm2_angle, base_height, 1 if gripper_closed else 0, speed
+        )
+        if pending is None:
+            return None
+        started = time.perf_counter()
+        self.current_gripper_state = gripper_closed
+        target = {
+            'arm1': arm1_angle,
+            'arm2': arm2_angle,
+            'base': base_height,
+            'gripper': gripper_closed,
+            'speed': speed
+        }
+
+        def on_done(result):
+            if result:
+                self.last_position = target
+                metrics.COMMAND_ROUND_TRIP.observe(time.perf_counter() - started, robot=self.name)
+            metrics.DONE_WAIT.observe(time.perf_counter() - started, robot=self.name)
+            metrics.COMMANDS.inc(robot=self.name, protocol='pipeline', result='done' if result else 'failed')
+            self._notify_status()
+
+        pending.add_done_callback(on_done)
+        return pending
+
+    def pipeline_outstanding(self):
+        """Comandos enviados en modo pipeline que aún no tienen DONE."""
+        return len(self._inflight)
+
+    def _encode_command(self, arm1_angle, arm2_angle, base_height, gripper_code, speed):
+        """Arma el comando según el protocolo activo. Retorna (bytes, seq o None)."""
+        if self.protocol_mode == 'binary':
+            self._seq = (self._seq + 1) & 0xFF
+            frame = protocol.encode_command(
+                self._seq, arm1_angle, arm2_angle, base_height, gripper_code, speed
+            )
+            return frame, self._seq
+        # Comando formateado: “arm1,arm2,base_cm,grip,speed\n”
+        command = f"{arm1_angle},{arm2_angle},{base_height},{gripper_code},{speed}\n"
+        return command.encode('utf-8'), None
+
+    def _fail_pending(self):
+        """Libera al comando en espera cuando se pierde el puerto."""
+        pending = self._pending
+        if pending is not None:
+            pending.complete(False)
+        with self._stream_cond:
+            inflight = list(self._inflight.values())
+            self._inflight.clear()
+            self._stream_cond.notify_all()
+        for pending in inflight:
+            pending.complete(False)
 
     def _wait_for_ready(self, timeout=10):
         """Espera a que Arduino envíe 'DONE' o el mensaje inicial."""
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            if self.serial_conn and self.serial_conn.in_waiting > 0:
-                try:
-                    response = self.serial_conn.readline().decode('utf-8').strip()
-                    if response:
-                        print(f"[ArduinoController] Arduino: {response}")
-                        if "DONE" in response or "iniciado" in response:
-                            return True
-                except:
-                    pass
-            time.sleep(0.1)
-        return False
-
-    def _wait_for_confirmation(self):
+        return self._ready_event.wait(timeout)
+
+    def _wait_for_confirmation(self, pending):
         """Espera la confirmación 'DONE' del Arduino."""
         if not self.serial_conn or not self.serial_conn.is_open:
             return False
-            
-        start_time = time.time()
+
         self.waiting_for_done = True
-        
+        started = time.perf_counter()
         try:
-            while time.time() - start_time < self.response_timeout:
-                if self.serial_conn.in_waiting > 0:
-                    response = self.serial_conn.readline().decode('utf-8').strip()
-                    if response:
-                        print(f"[ArduinoController] Arduino respuesta: {response}")
-                        if "DONE" in response:
-                            print("[ArduinoController] ✅ Confirmación DONE recibida")
-                            self.waiting_for_done = False
-                            return True
-                        elif "ERROR" in response:
-                            print(f"[ArduinoController] ❌ Error reportado por Arduino: {response}")
-                            self.waiting_for_done = False
-                            return False
-                time.sleep(0.05)  # Polling cada 50 ms
-            # Timeout sin recibir DONE
-            print("[ArduinoController] ⚠️ Timeout esperando confirmación DONE")
-            self.waiting_for_done = False
-            return False
-        except Exception as e:
-            print(f"[ArduinoController] Error esperando confirmación: {e}")
+            if not pending.event.wait(self.response_timeout):
+                # Timeout sin recibir DONE
+                metrics.DONE_TIMEOUTS.inc(robot=self.name)
+                print("[ArduinoController] ⚠️ Timeout esperando confirmación DONE")
+                return False
+            return pending.result
+        finally:
+            metrics.DONE_WAIT.observe(time.perf_counter() - started, robot=self.name)
+            self._pending = None
             self.waiting_for_done = False
-            return False
 
     def is_robot_busy(self):
         """Verifica si el robot está ocupado ejecutando un movimiento."""
-        return self.is_busy or self.waiting_for_done
+        return self.is_busy or self.waiting_for_done or bool(self._inflight)
 
     def send_position(self, arm1_angle, arm2_angle, base_height, gripper_state, speed=500):
         """
@@ -113,42 +556,58 @@ class ArduinoController:
                gripper_state (bool o 0/1)
                speed       (100…2000 pasos/s)
         """
+        started = time.perf_counter()
+        result = False
+        try:
+            result = self._send_position(arm1_angle, arm2_angle, base_height, gripper_state, speed)
+            return result
+        finally:
+            if not self.pipeline_window:
+                # En pipeline lo registra send_position_async al llegar el DONE
+                if result:
+                    metrics.COMMAND_ROUND_TRIP.observe(time.perf_counter() - started, robot=self.name)
+                metrics.COMMANDS.inc(robot=self.name, protocol=self.protocol_mode, result='done' if result else 'failed')
+            self._notify_status()
+
+    def _send_position(self, arm1_angle, arm2_angle, base_height, gripper_state, speed):
+        if self.pipeline_window:
+            # En pipeline el firmware encola: no hace falta rechazar por ocupado
+            return self._send_position_pipelined(arm1_angle, arm2_angle, base_height, gripper_state, speed)
+
         # Si ya está ocupado, no enviamos nada
         if self.is_robot_busy():
+            metrics.BUSY_REJECTIONS.inc(robot=self.name)
             print("[ArduinoController] ⚠️ Robot ocupado, comando rechazado")
             return False
             
         try:
-            # Validar rangos de ángulos
-            arm1_angle = max(-90, min(90, arm1_angle))
-            arm2_angle = max(-120, min(60, arm2_angle))
-            # Validar rango de Z: ±12.5 cm
-            base_height = max(-12.5, min(12.5, base_height))
-            speed = max(100, min(2000, speed))
-
-            # Gripper: aceptar bool o número
-            if isinstance(gripper_state, bool):
-                gripper_closed = gripper_state
-            elif isinstance(gripper_state, (int, float)):
-                gripper_closed = bool(gripper_state)
-            else:
-                gripper_closed = False
-            
+            # Validar rangos de ángulos, Z (±12.5 cm) y velocidad
+            arm1_angle, arm2_angle, base_height, speed = clamp_position(
+                arm1_angle, arm2_angle, base_height, speed
+            )
+            gripper_closed = gripper_to_bool(gripper_state)
             arduino_gripper_code = 1 if gripper_closed else 0
             self.current_gripper_state = gripper_closed
             
-            # Comando formateado: “arm1,arm2,base_cm,grip,speed\n”
-            command = f"{arm1_angle},{arm2_angle},{base_height},{arduino_gripper_code},{speed}\n"
+            command, seq = self._encode_command(
+                arm1_angle, arm2_angle, base_height, arduino_gripper_code, speed
+            )
 
             if self.serial_conn and self.serial_conn.is_open:
                 # Marcar ocupado antes de mandar
                 self.is_busy = True
-                print(f"[ArduinoController] Enviando comando: {command.strip()}")
-                self.serial_conn.write(command.encode('utf-8'))
-                self.serial_conn.flush()
+                self._notify_status()
+                # Registrar la espera antes de escribir para no perder un DONE rápido
+                pending = _PendingCommand(seq)
+                self._pending = pending
+                print(f"[ArduinoController] Enviando comando ({self.protocol_mode}): "
+                      f"{arm1_angle},{arm2_angle},{base_height},{arduino_gripper_code},{speed}")
+                with self._write_lock:
+                    self._write_serial(command)
+                    self.serial_conn.flush()
 
-                # Esperar “DONE”
-                confirmation_received = self._wait_for_confirmation()
+                # Esperar “DONE” (lo señala el hilo lector)
+                confirmation_received = self._wait_for_confirmation(pending)
                 self.is_busy = False
 
                 if confirmation_received:
@@ -176,9 +635,85 @@ class ArduinoController:
                 return False
         except Exception as e:
             print(f"[ArduinoController] Error enviando comando: {e}")
+            self._pending = None
             self.is_busy = False
             return False
 
+    def _send_position_pipelined(self, arm1_angle, arm2_angle, base_height, gripper_state, speed):
+        pending = self.send_position_async(arm1_angle, arm2_angle, base_height, gripper_state, speed)
+        if pending is None:
+            print("[ArduinoController] ❌ No se pudo enviar el comando (pipeline)")
+            return False
+        self.waiting_for_done = True
+        try:
+            if not pending.event.wait(self.response_timeout + self.ack_timeout * self.max_retries):
+                metrics.DONE_TIMEOUTS.inc(robot=self.name)
+                print("[ArduinoController] ⚠️ Timeout esperando confirmación DONE")
+                return False
+        finally:
+            self.waiting_for_done = False
+        return pending.result
+
+    def stream_position(self, arm1_angle, arm2_angle, base_height, gripper_state, speed=500):
+        """
+        Envía un punto de trayectoria sin esperar su DONE (streaming).
+        Lo usa trajectory.stream_trajectory; el último punto debe mandarse con
+        send_position para confirmar la llegada.
+        """
+        if not (self.serial_conn and self.serial_conn.is_open):
+            return False
+        arm1_angle, arm2_angle, base_height, speed = clamp_position(
+            arm1_angle, arm2_angle, base_height, speed
+        )
+        gripper_closed = gripper_to_bool(gripper_state)
+        if self.pipeline_window:
+            # La ventana del pipeline limita y retransmite los puntos
+            if self._send_pipelined(arm1_angle, arm2_angle, base_height,
+                                    1 if gripper_closed else 0, speed) is None:
+                return False
+            self.current_gripper_state = gripper_closed
+            return True
+        command, seq = self._encode_command(
+            arm1_angle, arm2_angle, base_height, 1 if gripper_closed else 0, speed
+        )
+        try:
+            with self._stream_cond:
+                if seq is None:
+                    self._stream_unacked += 1
+                else:
+                    self._stream_seqs.add(seq)
+                with self._write_lock:
+                    self._write_serial(command)
+        except Exception as e:
+            print(f"[ArduinoController] Error en streaming: {e}")
+            return False
+        self.current_gripper_state = gripper_closed
+        return True
+
+    def stream_outstanding(self):
+        """Puntos enviados en streaming (o en pipeline) que aún no confirmó el Arduino."""
+        return self._stream_unacked + len(self._stream_seqs) + len(self._inflight)
+
+    def wait_for_stream(self, max_outstanding=0, timeout=None):
+        """
+        Espera hasta que queden como mucho `max_outstanding` puntos de
+        streaming sin confirmar. Retorna False si vence `timeout` o se
+        pierde la conexión.
+        """
+        timeout = self.response_timeout if timeout is None else timeout
+        with self._stream_cond:
+            ok = self._stream_cond.wait_for(
+                lambda: self.stream_outstanding() <= max_outstanding or not self.is_connected,
+                timeout,
+            )
+        return ok and self.is_connected
+
+    def _reset_stream(self):
+        with self._stream_cond:
+            self._stream_unacked = 0
+            self._stream_seqs.clear()
+            self._stream_cond.notify_all()
+
     # Alias para compatibilidad antigua
     def send_command(self, q1, q2, z, grip, speed=500):
         return self.send_position(q1, q2, z, grip, speed)
@@ -254,6 +789,8 @@ class ArduinoController:
             'connected': self.is_connected_status(),
             'busy': self.is_robot_busy(),
             'waiting_confirmation': self.waiting_for_done,
+            'protocol': self.protocol_mode,
+            'pipeline_window': self.pipeline_window,
             'last_position': self.get_last_position(),
             'gripper_state': self.get_gripper_state_text()
         }
@@ -267,19 +804,73 @@ class ArduinoController:
     def close(self):
         """Cierra la conexión serial."""
         if self.serial_conn and self.serial_conn.is_open:
+            self._stop_reader.set()
             self.serial_conn.close()
+            self._fail_pending()
             self.is_connected = False
+            self.pipeline_window = 0
+            self._reset_stream()
             self.is_busy = False
             self.waiting_for_done = False
             print("[ArduinoController] Conexión serial cerrada")
+            self._notify_status()
             
             
-USE_FAKE_ARDUINO = False  # Cambia esto a False cuando tengas el Arduino
+class LazyController:
+    """
+    Proxy del controlador de un robot: lo crea en el primer uso, no al importar,
+    para que manage.py, migraciones, tests y el arranque de cada worker no
+    esperen al hardware. La conexión real se hace en segundo plano.
+    """
+
+    def __init__(self, factory):
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_instance', None)
+        object.__setattr__(self, '_instance_lock', threading.Lock())
+
+    def is_created(self):
+        return self._instance is not None
+
+    def get_instance(self):
+        if self._instance is None:
+            with self._instance_lock:
+                if self._instance is None:
+                    object.__setattr__(self, '_instance', self._factory())
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self.get_instance(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.get_instance(), name, value)
+
+
+def build_controller(robot_id=None):
+    """
+    Crea el controlador de un robot del registro (por defecto el principal)
+    según su configuración: SCARA_ROBOTS o, con un solo robot,
+    SCARA_USE_FAKE_ARDUINO, SCARA_SERIAL_PORT, SCARA_BAUD_RATE,
+    SCARA_PROTOCOL y SCARA_PIPELINE_WINDOW.
+    """
+    from .robots import default_robot_id, robot_config
+
+    robot_id = robot_id or default_robot_id()
+    config = robot_config(robot_id)
+    if config['fake']:
+        print(f"[ArduinoController] {robot_id}: usando Arduino simulado (MockArduinoController)")
+        # El simulado no negocia: 'auto' y 'csv' van por líneas
+        protocol_mode = 'binary' if config['protocol'] == 'binary' else 'csv'
+        controller = MockArduinoController(protocol_mode=protocol_mode, name=robot_id)
+    else:
+        controller = ArduinoController(port=config['port'], baud=config['baud'], name=robot_id)
+        controller.protocol_preference = config['protocol']
+        controller.pipeline_request = config['pipeline']
+        controller.motion_log = motion_log.open_from_settings(config['motion_log'])
+        controller.connect_in_background()
+    metrics.CONNECTED.set_function(lambda: int(controller.is_connected_status()), robot=robot_id)
+    metrics.INFLIGHT.set_function(controller.stream_outstanding, robot=robot_id)
+    return controller
 
 
-if USE_FAKE_ARDUINO:
-    arduino_controller = MockArduinoController()
-else:
-    arduino_controller = ArduinoController()
-# Instancia global
-#arduino_controller = ArduinoController()
+# Instancia global (perezosa)
+arduino_controller = LazyController(build_controller)
@@ -0,0 +1,163 @@
+"""
+Benchmarks del controlador contra el Arduino virtual (simulator.VirtualArduino).
+
+Cada benchmark retorna un dict serializable a JSON para poder comparar
+resultados entre versiones (ver el comando `benchmark_controller`).
+"""
+import math
+import platform
+import statistics
+import time
+
+from .motion_queue import MotionQueue
+from .sequence_runner import SequenceRunner
+
+
+def percentile(samples, pct):
+    """Percentil por interpolación lineal (pct entre 0 y 100)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    k = (len(ordered) - 1) * pct / 100.0
+    lower, upper = math.floor(k), math.ceil(k)
+    if lower == upper:
+        return ordered[int(k)]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+def summarize(samples):
+    """Resumen de latencias en milisegundos."""
+    ms = [s * 1000.0 for s in samples]
+    return {
+        'count': len(ms),
+        'mean_ms': statistics.fmean(ms) if ms else None,
+        'min_ms': min(ms) if ms else None,
+        'p50_ms': percentile(ms, 50),
+        'p95_ms': percentile(ms, 95),
+        'p99_ms': percentile(ms, 99),
+        'max_ms': max(ms) if ms else None,
+    }
+
+
+def bench_round_trip(controller, iterations=200):
+    """Latencia comando → DONE con movimientos pequeños alternados."""
+    samples = []
+    failures = 0
+    for i in range(iterations):
+        arm1 = 1 if i % 2 else 0
+        start = time.perf_counter()
+        ok = controller.send_position(arm1, 0, 0, False, 2000)
+        samples.append(time.perf_counter() - start)
+        failures += 0 if ok else 1
+    result = summarize(samples)
+    result['failures'] = failures
+    return result
+
+
+def bench_throughput(controller, duration=5.0):
+    """Comandos por segundo sostenidos durante `duration` segundos."""
+    sent = 0
+    failures = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        ok = controller.send_position(sent % 2, 0, 0, False, 2000)
+        sent += 1
+        failures += 0 if ok else 1
+    elapsed = time.perf_counter() - start
+    return {
+        'commands': sent,
+        'failures': failures,
+        'elapsed_s': elapsed,
+        'commands_per_s': sent / elapsed if elapsed else None,
+    }
+
+
+def bench_queue_burst(controller, count=200, timeout=600.0):
+    """
+    Ráfaga de movimientos por la MotionQueue (como varios /send-command/
+    seguidos): con pipeline se envían sin esperar el DONE del anterior.
+    """
+    motion = MotionQueue(controller)
+    start = time.perf_counter()
+    jobs = [motion.submit_position(i % 2, 0, 0, False, 2000) for i in range(count)]
+    for job in jobs:
+        job.wait(max(0.0, timeout - (time.perf_counter() - start)))
+    elapsed = time.perf_counter() - start
+    return {
+        'commands': count,
+        'failures': sum(1 for job in jobs if job.state != 'done'),
+        'elapsed_s': elapsed,
+        'commands_per_s': count / elapsed if elapsed else None,
+    }
+
+
+def bench_gripper(controller, iterations=50):
+    """Costo de comandos que solo cambian la pinza (incluye el delay del servo)."""
+    samples = []
+    failures = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        ok = controller.toggle_gripper(2000)
+        samples.append(time.perf_counter() - start)
+        failures += 0 if ok else 1
+    result = summarize(samples)
+    result['failures'] = failures
+    return result
+
+
+def synthetic_steps(count=20, delay=0.0):
+    """Secuencia de prueba: vaivén de J1/J2 con cambios de pinza cada 5 pasos."""
+    return [
+        {
+            'order': i,
+            'arm1': (i % 4) * 10.0,
+            'arm2': -(i % 3) * 10.0,
+            'base': 0.0,
+            'gripper': (i // 5) % 2,
+            'delay': delay,
+        }
+        for i in range(count)
+    ]
+
+
+def bench_sequence(controller, steps, timeout=600.0):
+    """Tiempo de punta a punta de una secuencia completa por el SequenceRunner."""
+    runner = SequenceRunner(MotionQueue(controller))
+    start = time.perf_counter()
+    run = runner.start_steps(None, 'benchmark', steps)
+    while run.is_active() and time.perf_counter() - start < timeout:
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    return {
+        'steps': len(steps),
+        'state': run.state,
+        'elapsed_s': elapsed,
+        'per_step_ms': elapsed / len(steps) * 1000.0 if steps else None,
+    }
+
+
+def environment_info(controller, simulator):
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'protocol': controller.protocol_mode,
+        'pipeline_window': getattr(controller, 'pipeline_window', 0),
+        'baud': simulator.baud,
+        'time_scale': simulator.time_scale,
+    }
+
+
+def compare(current, baseline):
+    """
+    Diferencias relativas (%) contra un resultado anterior, para cada
+    métrica numérica presente en ambos.
+    """
+    deltas = {}
+    for name, metrics in current.get('results', {}).items():
+        previous = baseline.get('results', {}).get(name, {})
+        for key, value in metrics.items():
+            old = previous.get(key)
+            if isinstance(value, (int, float)) and isinstance(old, (int, float)) and old:
+                deltas[f"{name}.{key}"] = (value - old) / old * 100.0
+    return deltas
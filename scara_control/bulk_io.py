@@ -0,0 +1,343 @@
+"""
+Importación y exportación masiva de posiciones y secuencias.
+
+Formatos (uno por línea, para poder leer y escribir en streaming):
+
+- JSON lines: posiciones como {"name", "arm1_angle", "arm2_angle",
+  "base_height", "gripper_state"}; secuencias como {"name", "positions":
+  [{"order", "delay_seconds", "position": {...}}]} (la forma de la API).
+- CSV con cabecera: posiciones con esas mismas columnas; secuencias con una
+  fila por paso (sequence_id, sequence, order, delay_seconds + columnas de
+  posición). Las filas con el mismo sequence_id son una secuencia (el id
+  de la exportación; al importar solo agrupa, no se conserva); una
+  secuencia sin pasos es una fila con sequence_id y sequence y el resto
+  vacío. Sin sequence_id (archivos anteriores) se agrupan las filas
+  consecutivas con el mismo "sequence".
+
+La importación inserta con bulk_create dentro de una sola transacción, de
+a BATCH_SIZE registros: nunca tiene el archivo entero en memoria. La única
+excepción es el CSV de secuencias con sequence_id, cuyas filas de una misma
+secuencia pueden no estar juntas: ese archivo se agrupa completo antes de
+insertar (la exportación escribe cada secuencia en filas contiguas). Las
+posiciones de las secuencias se reutilizan si ya existe una con el mismo
+nombre y valores (redondeados, no por igualdad exacta de floats).
+"""
+import csv
+import io
+import itertools
+import json
+
+from django.db import transaction
+
+from . import api_cache
+from .api_cache import response_cache
+from .models import RobotPosition, RobotSequence, SequencePosition
+
+FORMATS = ('jsonl', 'csv')
+
+POSITION_FIELDS = ('name', 'arm1_angle', 'arm2_angle', 'base_height', 'gripper_state')
+STEP_CSV_FIELDS = ('order', 'delay_seconds') + POSITION_FIELDS
+SEQUENCE_CSV_FIELDS = ('sequence_id', 'sequence') + STEP_CSV_FIELDS
+
+BATCH_SIZE = 1000
+KEY_DECIMALS = 4        # Precisión para considerar iguales dos posiciones
+
+
+class BulkImportError(ValueError):
+    """Registro inválido en un archivo de importación (incluye el número de línea)."""
+
+
+def guess_format(filename, default='jsonl'):
+    if filename and filename.lower().endswith('.csv'):
+        return 'csv'
+    if filename and filename.lower().endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    return default
+
+
+def _text_lines(lines):
+    """Acepta líneas en bytes o str (request, archivos) y las entrega como str."""
+    for line in lines:
+        yield line.decode('utf-8-sig') if isinstance(line, bytes) else line
+
+
+# ----------------------------------------------------------------------------------------------------
+# Lectura
+# ----------------------------------------------------------------------------------------------------
+
+def _position_from(data, line):
+    if not isinstance(data, dict):
+        raise BulkImportError(f"Línea {line}: la posición debe ser un objeto")
+    try:
+        return {
+            'name': str(data.get('name') or 'Sin nombre')[:100],
+            'arm1_angle': float(data['arm1_angle']),
+            'arm2_angle': float(data['arm2_angle']),
+            'base_height': float(data['base_height']),
+            'gripper_state': int(float(data.get('gripper_state') or 0)),
+        }
+    except (KeyError, TypeError, ValueError) as e:
+        raise BulkImportError(f"Línea {line}: posición inválida ({e})")
+
+
+def read_positions(lines, fmt='jsonl'):
+    """Genera dicts de posición desde un iterable de líneas."""
+    lines = _text_lines(lines)
+    if fmt == 'csv':
+        for line, row in enumerate(csv.DictReader(lines), start=2):
+            yield _position_from(row, line)
+        return
+    for line, text in enumerate(lines, start=1):
+        if text.strip():
+            try:
+                yield _position_from(json.loads(text), line)
+            except json.JSONDecodeError as e:
+                raise BulkImportError(f"Línea {line}: JSON inválido ({e})")
+
+
+def read_sequences(lines, fmt='jsonl'):
+    """Genera dicts {'name', 'positions': [{'order', 'delay_seconds', 'position'}]}."""
+    lines = _text_lines(lines)
+    if fmt == 'csv':
+        yield from _csv_sequences(csv.DictReader(lines))
+        return
+    for line, text in enumerate(lines, start=1):
+        if not text.strip():
+            continue
+        try:
+            data = json.loads(text)
+            yield normalize_sequence(data, line)
+        except json.JSONDecodeError as e:
+            raise BulkImportError(f"Línea {line}: JSON inválido ({e})")
+
+
+def _csv_sequences(rows):
+    """
+    Arma las secuencias de un CSV, en el orden en que aparece cada una. Las
+    filas con sequence_id se agrupan por ese id aunque no estén juntas, así
+    que esas secuencias se entregan al terminar el archivo. Las que no lo
+    traen se agrupan por filas consecutivas con el mismo nombre y, si no hay
+    ninguna por id pendiente, se entregan al cerrarse (en streaming).
+    """
+    sequences = {}
+    run, previous = 0, None
+    for line, row in enumerate(rows, start=2):
+        name = str(row.get('sequence') or 'Sin nombre')[:100]
+        if (row.get('sequence_id') or '').strip():
+            key, previous = ('id', row['sequence_id'].strip()), None
+        else:
+            if name != previous:
+                run += 1
+            key, previous = ('run', run), name
+        if key not in sequences and len(sequences) == 1 and next(iter(sequences))[0] == 'run':
+            yield sequences.popitem()[1]
+        steps = sequences.setdefault(key, {'name': name, 'positions': []})['positions']
+        if not any(row.get(field) for field in STEP_CSV_FIELDS):
+            continue        # Fila de una secuencia sin pasos
+        try:
+            steps.append({
+                'order': int(row.get('order') or len(steps)),
+                'delay_seconds': float(row.get('delay_seconds') or 1.0),
+                'position': _position_from(row, line),
+            })
+        except ValueError as e:
+            raise BulkImportError(f"Línea {line}: paso inválido ({e})")
+    yield from sequences.values()
+
+
+def normalize_sequence(data, line=1):
+    """Valida una secuencia con la forma de la API (también la usa sequences_list POST)."""
+    if not isinstance(data, dict):
+        raise BulkImportError(f"Línea {line}: la secuencia debe ser un objeto")
+    positions = data.get('positions', [])
+    if not isinstance(positions, list):
+        raise BulkImportError(f"Línea {line}: 'positions' debe ser una lista")
+    steps = []
+    for index, item in enumerate(positions):
+        if not isinstance(item, dict):
+            raise BulkImportError(f"Línea {line}: paso {index} inválido (debe ser un objeto)")
+        try:
+            steps.append({
+                'order': int(item.get('order', index)),
+                'delay_seconds': float(item.get('delay_seconds', 1.0)),
+                'position': _position_from(item.get('position', {}), line),
+            })
+        except (TypeError, ValueError) as e:
+            raise BulkImportError(f"Línea {line}: paso inválido ({e})")
+    return {'name': str(data.get('name') or 'Sin nombre')[:100], 'positions': steps}
+
+
+# ----------------------------------------------------------------------------------------------------
+# Importación
+# ----------------------------------------------------------------------------------------------------
+
+def _position_key(p):
+    return (
+        p['name'],
+        round(p['arm1_angle'], KEY_DECIMALS),
+        round(p['arm2_angle'], KEY_DECIMALS),
+        round(p['base_height'], KEY_DECIMALS),
+        p['gripper_state'],
+    )
+
+
+def _invalidate_caches():
+    # bulk_create no emite post_save: invalidar a mano lo que harían las señales
+    response_cache.bump(api_cache.POSITIONS, api_cache.SEQUENCES)
+
+
+def import_positions(records):
+    """Inserta todas las posiciones en una transacción. Retorna cuántas creó."""
+    created = 0
+    with transaction.atomic():
+        batch = []
+        for record in records:
+            batch.append(RobotPosition(**record))
+            if len(batch) >= BATCH_SIZE:
+                created += len(RobotPosition.objects.bulk_create(batch))
+                batch = []
+        if batch:
+            created += len(RobotPosition.objects.bulk_create(batch))
+    _invalidate_caches()
+    return created
+
+
+def import_sequences(records):
+    """
+    Inserta secuencias con sus pasos en una transacción, de a BATCH_SIZE
+    secuencias (ver _import_batch).
+    Retorna (secuencias creadas, posiciones creadas, pasos creados).
+    """
+    created = [0, 0, 0]
+    records = iter(records)
+    with transaction.atomic():
+        while batch := list(itertools.islice(records, BATCH_SIZE)):
+            sequences, positions, steps = _import_batch(batch)
+            created[0] += len(sequences)
+            created[1] += positions
+            created[2] += steps
+    _invalidate_caches()
+    return tuple(created)
+
+
+def create_sequence(record):
+    """Crea una sola secuencia (ya normalizada) y la retorna."""
+    with transaction.atomic():
+        sequences, _, _ = _import_batch([record])
+    _invalidate_caches()
+    return sequences[0]
+
+
+def _existing_positions(keys):
+    """Clave → id de las posiciones ya guardadas con alguna de esas claves."""
+    names = sorted({key[0] for key in keys})
+    known = {}
+    for i in range(0, len(names), BATCH_SIZE):
+        rows = (RobotPosition.objects.filter(name__in=names[i:i + BATCH_SIZE])
+                .order_by('id').values_list('id', *POSITION_FIELDS))
+        for row in rows.iterator(chunk_size=BATCH_SIZE):
+            key = _position_key(dict(zip(POSITION_FIELDS, row[1:])))
+            if key in keys:
+                known.setdefault(key, row[0])
+    return known
+
+
+def _import_batch(records):
+    """
+    Inserta un bloque de secuencias. Las posiciones se reutilizan si ya
+    existen (misma clave redondeada, también las creadas por bloques
+    anteriores); las nuevas, las secuencias y los pasos se crean con
+    bulk_create. Retorna (secuencias, posiciones creadas, pasos creados).
+    """
+    keys = {_position_key(step['position']) for record in records for step in record['positions']}
+    known = _existing_positions(keys)
+
+    new_positions = {}
+    for record in records:
+        for step in record['positions']:
+            key = _position_key(step['position'])
+            if key not in known and key not in new_positions:
+                new_positions[key] = RobotPosition(**step['position'])
+    RobotPosition.objects.bulk_create(list(new_positions.values()), batch_size=BATCH_SIZE)
+    known.update((key, position.id) for key, position in new_positions.items())
+
+    sequences = RobotSequence.objects.bulk_create(
+        [RobotSequence(name=record['name']) for record in records], batch_size=BATCH_SIZE
+    )
+    steps = [
+        SequencePosition(
+            sequence_id=sequence.id,
+            position_id=known[_position_key(step['position'])],
+            order=step['order'],
+            delay_seconds=step['delay_seconds'],
+        )
+        for sequence, record in zip(sequences, records)
+        for step in record['positions']
+    ]
+    SequencePosition.objects.bulk_create(steps, batch_size=BATCH_SIZE)
+    return sequences, len(new_positions), len(steps)
+
+
+# ----------------------------------------------------------------------------------------------------
+# Exportación (generadores: memoria constante)
+# ----------------------------------------------------------------------------------------------------
+
+def _csv_line(values):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+
+def export_positions(fmt='jsonl'):
+    """Genera el archivo de posiciones línea a línea."""
+    rows = RobotPosition.objects.order_by('id').values_list(*POSITION_FIELDS).iterator(chunk_size=BATCH_SIZE)
+    if fmt == 'csv':
+        yield _csv_line(POSITION_FIELDS)
+        for row in rows:
+            yield _csv_line(row)
+        return
+    for row in rows:
+        yield json.dumps(dict(zip(POSITION_FIELDS, row))) + '\n'
+
+
+def _sequence_groups():
+    """
+    (id, nombre, pasos) de cada secuencia en orden de id, incluidas las que
+    no tienen pasos: las secuencias y los pasos se recorren a la par, por
+    bloques, sin cargar todo en memoria.
+    """
+    sequences = RobotSequence.objects.order_by('id').values_list('id', 'name').iterator(chunk_size=BATCH_SIZE)
+    steps = (
+        SequencePosition.objects.order_by('sequence_id', 'order')
+        .values_list('sequence_id', 'order', 'delay_seconds',
+                     *(f'position__{field}' for field in POSITION_FIELDS))
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    groups = itertools.groupby(steps, key=lambda row: row[0])
+    current = next(groups, None)
+    for sequence_id, name in sequences:
+        rows = []
+        if current is not None and current[0] == sequence_id:
+            rows = [row[1:] for row in current[1]]
+            current = next(groups, None)
+        yield sequence_id, name, rows
+
+
+def export_sequences(fmt='jsonl'):
+    """Genera el archivo de secuencias línea a línea (pasos precargados por bloques)."""
+    if fmt == 'csv':
+        yield _csv_line(SEQUENCE_CSV_FIELDS)
+        for sequence_id, name, rows in _sequence_groups():
+            if not rows:
+                yield _csv_line((sequence_id, name) + ('',) * len(STEP_CSV_FIELDS))
+            for row in rows:
+                yield _csv_line((sequence_id, name) + row)
+        return
+    for _, name, rows in _sequence_groups():
+        yield json.dumps({
+            'name': name,
+            'positions': [
+                {'order': row[0], 'delay_seconds': row[1], 'position': dict(zip(POSITION_FIELDS, row[2:]))}
+                for row in rows
+            ],
+        }) + '\n'
@@ -0,0 +1,35 @@
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from . import telemetry
+from .robots import RobotNotFound
+
+
+class TelemetryConsumer(AsyncJsonWebsocketConsumer):
+    """
+    WebSocket /ws/telemetry/ (robot por defecto) o /ws/telemetry/<robot>/:
+    envía el estado del robot al conectar y luego cada cambio (conexión,
+    busy, cola, posición).
+    """
+
+    async def connect(self):
+        try:
+            self.robot_id = telemetry.install(self.scope['url_route']['kwargs'].get('robot_id'))
+        except RobotNotFound:
+            await self.close()
+            return
+        self.group = telemetry.group_name(self.robot_id)
+        await self.channel_layer.group_add(self.group, self.channel_name)
+        await self.accept()
+        await self.send_json({'type': 'status', 'status': telemetry.status_snapshot(self.robot_id)})
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group'):
+            await self.channel_layer.group_discard(self.group, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        # El cliente puede pedir el estado actual en cualquier momento
+        if content.get('type') == 'get_status':
+            await self.send_json({'type': 'status', 'status': telemetry.status_snapshot(self.robot_id)})
+
+    async def telemetry_status(self, event):
+        await self.send_json({'type': 'status', 'status': event['status']})
@@ -0,0 +1,93 @@
+"""
+Protocolo local entre los workers web y el daemon dueño de los puertos
+serie (robot_daemon): mensajes msgpack con prefijo de longitud (u4 big
+endian) sobre un socket Unix.
+
+Petición:  {'id': n, 'op': 'submit_position', 'robot': 'default', 'args': [...]}
+Respuesta: {'id': n, 'ok': True, 'result': ...}
+           {'id': n, 'ok': False, 'error': 'texto', 'kind': 'RobotNotFound'}
+Evento:    {'event': 'status', 'robot': 'default', 'status': {...}}
+           (solo en una conexión que pidió 'subscribe')
+"""
+import asyncio
+import struct
+
+import msgpack
+import numpy as np
+
+LENGTH = struct.Struct('>I')
+MAX_MESSAGE = 16 * 1024 * 1024
+
+
+class IPCError(Exception):
+    """Daemon inalcanzable, conexión cortada o respuesta inválida."""
+
+
+class RemoteError(IPCError):
+    """El daemon respondió con un error al ejecutar la operación."""
+
+    def __init__(self, message, kind=''):
+        super().__init__(message)
+        self.kind = kind
+
+
+def _default(value):
+    # Escalares y arrays de numpy (pasos compilados, posiciones) → tipos de Python
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"No serializable: {type(value).__name__}")
+
+
+def pack(message):
+    body = msgpack.packb(message, default=_default, use_bin_type=True)
+    if len(body) > MAX_MESSAGE:
+        raise IPCError(f"Mensaje demasiado grande ({len(body)} bytes)")
+    return LENGTH.pack(len(body)) + body
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 65536))
+        if not chunk:
+            raise IPCError("Conexión cerrada")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def send_message(sock, message):
+    try:
+        sock.sendall(pack(message))
+    except OSError as e:
+        raise IPCError(str(e)) from e
+
+
+def recv_message(sock):
+    """Siguiente mensaje del socket (bloquea). IPCError si se cortó."""
+    try:
+        (size,) = LENGTH.unpack(_recv_exact(sock, LENGTH.size))
+        if size > MAX_MESSAGE:
+            raise IPCError(f"Mensaje demasiado grande ({size} bytes)")
+        return msgpack.unpackb(_recv_exact(sock, size), raw=False, strict_map_key=False)
+    except OSError as e:
+        raise IPCError(str(e)) from e
+    except (ValueError, msgpack.UnpackException) as e:
+        raise IPCError(f"Mensaje inválido: {e}") from e
+
+
+async def arecv_message(reader):
+    """recv_message sobre un asyncio.StreamReader."""
+    try:
+        (size,) = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+        if size > MAX_MESSAGE:
+            raise IPCError(f"Mensaje demasiado grande ({size} bytes)")
+        return msgpack.unpackb(await reader.readexactly(size), raw=False, strict_map_key=False)
+    except asyncio.IncompleteReadError as e:
+        raise IPCError("Conexión cerrada") from e
+    except OSError as e:
+        raise IPCError(str(e)) from e
+    except (ValueError, msgpack.UnpackException) as e:
+        raise IPCError(f"Mensaje inválido: {e}") from e
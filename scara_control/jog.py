@@ -0,0 +1,251 @@
+"""
+Jog desde el control PS4.
+
+JogController (botones): los incrementos se acumulan en un objetivo
+pendiente y un hilo propio manda solo el más reciente en cuanto termina el
+movimiento anterior (por la cola de movimientos), nunca más rápido que
+`max_rate`. Los handlers del gamepad solo tocan memoria: no esperan al
+puerto serie ni se pierden pulsaciones por "Robot ocupado".
+
+StickJog (sticks analógicos): control en velocidad. Mientras haya un stick
+desviado corre una sesión en la cola que integra la velocidad a `rate` Hz
+y envía el objetivo en streaming, sin DONE por punto pero con como mucho
+`window` puntos sin confirmar (igual que trajectory.stream_trajectory).
+"""
+import threading
+import time
+
+from django.conf import settings
+
+from . import motion_model
+from .arduino_communication import SPEED_LIMITS, clamp_position
+from .motion_queue import motion_queue
+
+DEFAULT_MAX_RATE = 10.0     # Movimientos por segundo
+
+DEFAULT_STICK_RATE = 25.0                       # Hz
+DEFAULT_STICK_VELOCITY = (45.0, 45.0, 0.5)      # grados/s, grados/s, cm/s a fondo
+STICK_MAX = 32767                               # Rango de los ejes de pyPS4Controller
+
+
+class JogController:
+    def __init__(self, queue, max_rate=None):
+        self.queue = queue
+        self.max_rate = max_rate or getattr(settings, 'SCARA_JOG_MAX_RATE', DEFAULT_MAX_RATE)
+        self._pending = None            # Objetivo aún no enviado
+        self._inflight = None           # Objetivo enviado, esperando su DONE
+        self._cond = threading.Condition()
+        self._worker = None
+        self._last_sent = 0.0
+        self.sent = 0
+        self.coalesced = 0              # Actualizaciones absorbidas por otra más nueva
+
+    # ------------------------------------------------------------------
+    # Entradas (desde el hilo del gamepad; no bloquean)
+    # ------------------------------------------------------------------
+    def jog(self, d_arm1=0, d_arm2=0, d_base=0, speed=None):
+        """Suma incrementos al objetivo pendiente."""
+        with self._cond:
+            target = self._base_target()
+            arm1, arm2, base, _ = clamp_position(
+                target['arm1'] + d_arm1, target['arm2'] + d_arm2, target['base'] + d_base
+            )
+            target.update(arm1=arm1, arm2=arm2, base=base)
+            if speed is not None:
+                target['speed'] = speed
+            self._set_pending(target)
+            return dict(target)
+
+    def set_target(self, arm1=None, arm2=None, base=None, gripper=None, speed=None):
+        """Fija valores absolutos del objetivo (los que no son None)."""
+        with self._cond:
+            target = self._base_target()
+            for key, value in (('arm1', arm1), ('arm2', arm2), ('base', base),
+                               ('gripper', gripper), ('speed', speed)):
+                if value is not None:
+                    target[key] = value
+            target['arm1'], target['arm2'], target['base'], _ = clamp_position(
+                target['arm1'], target['arm2'], target['base']
+            )
+            self._set_pending(target)
+            return dict(target)
+
+    def cancel(self):
+        """Descarta el objetivo pendiente (p. ej. antes de ir a home)."""
+        with self._cond:
+            self._pending = None
+
+    def current_target(self):
+        """Último objetivo conocido: pendiente, en curso o la posición del robot."""
+        with self._cond:
+            return self._base_target()
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _base_target(self):
+        if self._pending is not None:
+            return dict(self._pending)
+        if self._inflight is not None:
+            return dict(self._inflight)
+        pos = self.queue.controller.get_last_position()
+        return {
+            'arm1': pos['arm1'],
+            'arm2': pos['arm2'],
+            'base': pos['base'],
+            'gripper': pos['gripper'],
+            'speed': pos.get('speed', 500),
+        }
+
+    def _set_pending(self, target):
+        if self._pending is not None:
+            self.coalesced += 1
+        self._pending = target
+        self._ensure_worker()
+        self._cond.notify()
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="jog", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        min_interval = 1.0 / self.max_rate
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+            # Límite de frecuencia: mientras tanto siguen llegando incrementos
+            delay = self._last_sent + min_interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            with self._cond:
+                target = self._pending
+                if target is None:
+                    continue
+                self._pending = None
+                self._inflight = target
+            self._last_sent = time.monotonic()
+            try:
+                job = self.queue.submit_position(
+                    target['arm1'], target['arm2'], target['base'], target['gripper'], target['speed']
+                )
+                job.wait()
+                self.sent += 1
+            except Exception as e:
+                print(f"[Jog] Error enviando objetivo: {e}")
+            finally:
+                with self._cond:
+                    self._inflight = None
+
+
+class StickJog:
+    """
+    Jog en velocidad con los sticks: la desviación (-1..1, con zona muerta)
+    escala la velocidad de cada eje. Una sesión de streaming por la cola de
+    movimientos integra el objetivo a `rate` Hz y termina, confirmando la
+    posición final con send_position, cuando los sticks vuelven al reposo.
+    """
+
+    AXES = ('arm1', 'arm2', 'base')
+
+    def __init__(self, queue, rate=None, max_velocity=DEFAULT_STICK_VELOCITY,
+                 deadzone=0.12, idle_timeout=0.25, window=2):
+        self.queue = queue
+        self.window = window
+        self.rate = rate or getattr(settings, 'SCARA_STICK_RATE', DEFAULT_STICK_RATE)
+        self.max_velocity = max_velocity
+        self.deadzone = deadzone
+        self.idle_timeout = idle_timeout
+        self.enabled = True
+        self._deflection = [0.0, 0.0, 0.0]
+        self._lock = threading.Lock()
+        self._active = False            # Hay una sesión encolada o corriendo
+        self.sessions = 0
+        self.points = 0                 # Puntos enviados en streaming
+
+    def set_axis(self, axis, value):
+        """Valor crudo del eje (±32767) para 'arm1', 'arm2' o 'base'."""
+        if not self.enabled:
+            return
+        deflection = max(-1.0, min(1.0, value / STICK_MAX))
+        if abs(deflection) < self.deadzone:
+            deflection = 0.0
+        with self._lock:
+            self._deflection[self.AXES.index(axis)] = deflection
+            if deflection and not self._active:
+                self._active = True
+                self.sessions += 1
+                self.queue.submit(self._session, description='jog analógico')
+
+    def release(self, axis):
+        with self._lock:
+            self._deflection[self.AXES.index(axis)] = 0.0
+
+    def _session(self):
+        try:
+            return self._stream()
+        except Exception:
+            with self._lock:
+                self._active = False
+            raise
+
+    def _stream(self):
+        controller = self.queue.controller
+        # El firmware atiende las líneas de a una: el resto se descarta pegado
+        window = getattr(controller, 'pipeline_window', 0) or self.window
+        pos = controller.get_last_position()
+        target = [pos['arm1'], pos['arm2'], pos['base']]
+        gripper = pos['gripper']
+        period = 1.0 / self.rate
+        speed = SPEED_LIMITS[0]
+        next_tick = time.monotonic()
+        idle_since = None
+
+        while True:
+            with self._lock:
+                deflection = list(self._deflection)
+                if any(deflection):
+                    idle_since = None
+                else:
+                    idle_since = idle_since or time.monotonic()
+                    if time.monotonic() - idle_since >= self.idle_timeout:
+                        # Decidido bajo el lock: un stick que se mueva ahora abre otra sesión
+                        self._active = False
+                        break
+
+            if any(deflection):
+                velocity = [d * v for d, v in zip(deflection, self.max_velocity)]
+                target = list(clamp_position(*(t + v * period for t, v in zip(target, velocity))))[:3]
+                joint_speed = max(abs(velocity[0]), abs(velocity[1])) * motion_model.Q_STEPS_PER_DEGREE * 1.2
+                speed = int(max(SPEED_LIMITS[0], min(SPEED_LIMITS[1], joint_speed)))
+                if not controller.wait_for_stream(window - 1):
+                    return self._abort("Timeout esperando confirmaciones del streaming del stick")
+                if not controller.stream_position(target[0], target[1], target[2], gripper, speed):
+                    return self._abort("Streaming del stick interrumpido")
+                self.points += 1
+
+            # Calendario absoluto a `rate` Hz
+            next_tick += period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()
+
+        # Confirmar dónde quedó el brazo
+        if not controller.wait_for_stream(window - 1):
+            print("[Jog] Timeout esperando confirmaciones del streaming del stick")
+            return False
+        return controller.send_position(target[0], target[1], target[2], gripper, speed)
+
+    def _abort(self, reason):
+        with self._lock:
+            self._active = False
+        print(f"[Jog] {reason}")
+        return False
+
+
+# Instancias globales
+jog_controller = JogController(motion_queue)
+stick_jog = StickJog(motion_queue)
@@ -0,0 +1,98 @@
+"""
+Cinemática directa e inversa del SCARA, vectorizada con NumPy.
+
+Convención (la misma que scara_2d.module.js): arm1 es el ángulo del primer
+eslabón respecto al eje X y arm2 es relativo a arm1, así que el segundo
+eslabón apunta a arm1 + arm2. base es la altura Z en cm y pasa sin cambios.
+x, y están en las mismas unidades que las longitudes de los eslabones
+(settings.SCARA_LINK_LENGTHS, por defecto L1=80, L2=60).
+
+Todas las funciones aceptan escalares o arrays y operan punto a punto sin
+bucles de Python.
+"""
+import numpy as np
+from django.conf import settings
+
+from .arduino_communication import ARM1_LIMITS, ARM2_LIMITS, BASE_LIMITS
+
+DEFAULT_LINK_LENGTHS = (80.0, 60.0)
+
+ELBOW_CHOICES = ('auto', 'up', 'down')
+
+
+def link_lengths():
+    """(L1, L2) configurados en settings.SCARA_LINK_LENGTHS."""
+    l1, l2 = getattr(settings, 'SCARA_LINK_LENGTHS', DEFAULT_LINK_LENGTHS)
+    return float(l1), float(l2)
+
+
+def forward(arm1, arm2, l1=None, l2=None):
+    """Ángulos (grados) → posición (x, y) del extremo."""
+    if l1 is None or l2 is None:
+        l1, l2 = link_lengths()
+    q1 = np.radians(np.asarray(arm1, dtype=float))
+    q12 = q1 + np.radians(np.asarray(arm2, dtype=float))
+    x = l1 * np.cos(q1) + l2 * np.cos(q12)
+    y = l1 * np.sin(q1) + l2 * np.sin(q12)
+    return x, y
+
+
+def inverse_both(x, y, l1=None, l2=None):
+    """
+    Las dos soluciones de (x, y). Retorna (arm1_up, arm2_up, arm1_down,
+    arm2_down, reachable). "up" es la solución con arm2 > 0. Donde el punto
+    está fuera del anillo alcanzable los ángulos son NaN.
+    """
+    if l1 is None or l2 is None:
+        l1, l2 = link_lengths()
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    cos_q2 = (x * x + y * y - l1 * l1 - l2 * l2) / (2 * l1 * l2)
+    reachable = np.abs(cos_q2) <= 1.0 + 1e-9
+    q2 = np.arccos(np.where(reachable, np.clip(cos_q2, -1.0, 1.0), np.nan))
+    heading = np.arctan2(y, x)
+
+    def shoulder(q2_sign):
+        return heading - np.arctan2(l2 * np.sin(q2_sign), l1 + l2 * np.cos(q2_sign))
+
+    arm1_up, arm2_up = np.degrees(shoulder(q2)), np.degrees(q2)
+    arm1_down, arm2_down = np.degrees(shoulder(-q2)), -np.degrees(q2)
+    return arm1_up, arm2_up, arm1_down, arm2_down, reachable
+
+
+def within_limits(arm1, arm2, base=None):
+    """Máscara de los puntos dentro del rango de las articulaciones."""
+    arm1 = np.asarray(arm1, dtype=float)
+    arm2 = np.asarray(arm2, dtype=float)
+    ok = ((arm1 >= ARM1_LIMITS[0]) & (arm1 <= ARM1_LIMITS[1])
+          & (arm2 >= ARM2_LIMITS[0]) & (arm2 <= ARM2_LIMITS[1]))
+    if base is not None:
+        base = np.asarray(base, dtype=float)
+        ok &= (base >= BASE_LIMITS[0]) & (base <= BASE_LIMITS[1])
+    return ok
+
+
+def inverse(x, y, z=None, elbow='auto', l1=None, l2=None):
+    """
+    Posición cartesiana → ángulos. `elbow` elige la solución: 'up', 'down'
+    o 'auto' (la primera que respete los límites de las articulaciones,
+    prefiriendo 'up'). Retorna (arm1, arm2, base, valid); valid es False
+    donde el punto no es alcanzable o queda fuera de los límites.
+    """
+    if elbow not in ELBOW_CHOICES:
+        raise ValueError(f"elbow debe ser uno de {ELBOW_CHOICES}")
+    arm1_up, arm2_up, arm1_down, arm2_down, reachable = inverse_both(x, y, l1, l2)
+    base = np.zeros_like(arm1_up) if z is None else np.broadcast_to(np.asarray(z, dtype=float), arm1_up.shape)
+
+    up_ok = reachable & within_limits(arm1_up, arm2_up, base)
+    down_ok = reachable & within_limits(arm1_down, arm2_down, base)
+    if elbow == 'up':
+        use_up, valid = np.ones_like(up_ok), up_ok
+    elif elbow == 'down':
+        use_up, valid = np.zeros_like(down_ok), down_ok
+    else:
+        use_up, valid = up_ok | ~down_ok, up_ok | down_ok
+
+    arm1 = np.where(use_up, arm1_up, arm1_down)
+    arm2 = np.where(use_up, arm2_up, arm2_down)
+    return arm1, arm2, base, valid
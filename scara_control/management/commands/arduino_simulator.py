@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from scara_control.simulator import VirtualArduino
+
+
+class Command(BaseCommand):
+    help = "Levanta un Arduino virtual sobre un PTY para probar sin el robot."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--time-scale', type=float, default=1.0,
+                            help="Factor de tiempo (1.0 = real, 0 = instantáneo)")
+        parser.add_argument('--baud', type=int, default=9600,
+                            help="Baudios a modelar en el enlace")
+        parser.add_argument('--binary', action='store_true',
+                            help="Aceptar la negociación del protocolo binario")
+        parser.add_argument('--pipeline', type=int, default=0,
+                            help="Capacidad del buffer circular (modo pipeline, requiere --binary)")
+        parser.add_argument('--verbose', action='store_true',
+                            help="Mostrar las líneas que envía el firmware")
+
+    def handle(self, *args, **options):
+        simulator = VirtualArduino(
+            time_scale=options['time_scale'],
+            baud=options['baud'],
+            binary=options['binary'],
+            verbose=options['verbose'],
+            pipeline=options['pipeline'],
+        )
+        port = simulator.start()
+        self.stdout.write(self.style.SUCCESS(f"Arduino virtual en {port}"))
+        self.stdout.write(f"Usa SCARA_SERIAL_PORT={port} para conectar el servidor. Ctrl+C para salir.")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            simulator.stop()
+            self.stdout.write(f"Comandos recibidos: {simulator.commands_received}")
@@ -0,0 +1,107 @@
+import contextlib
+import io
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scara_control import benchmarks
+from scara_control.arduino_communication import ArduinoController
+from scara_control.models import RobotSequence
+from scara_control.sequence_runner import load_steps
+from scara_control.simulator import VirtualArduino
+
+
+class Command(BaseCommand):
+    help = ("Mide latencia y throughput del ArduinoController contra el Arduino "
+            "virtual y escribe los resultados en JSON (por defecto en stdout).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='-',
+                            help="Archivo JSON de resultados ('-' para stdout)")
+        parser.add_argument('--compare', help="JSON de una corrida anterior para comparar")
+        parser.add_argument('--time-scale', type=float, default=0.0,
+                            help="Factor de tiempo del simulador (0 = solo costo host/enlace)")
+        parser.add_argument('--baud', type=int, default=9600)
+        parser.add_argument('--protocol', choices=['auto', 'csv', 'binary'], default='csv')
+        parser.add_argument('--pipeline', type=int, default=0,
+                            help="Ventana del modo pipeline (buffer circular del simulador; requiere binario)")
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--duration', type=float, default=5.0,
+                            help="Segundos del benchmark de throughput")
+        parser.add_argument('--sequence-id', type=int,
+                            help="RobotSequence a medir (por defecto una secuencia sintética)")
+        parser.add_argument('--sequence-steps', type=int, default=20)
+        parser.add_argument('--show-output', action='store_true',
+                            help="No silenciar los logs del controlador")
+
+    def handle(self, *args, **options):
+        if options['sequence_id'] is not None:
+            try:
+                sequence = RobotSequence.objects.get(id=options['sequence_id'])
+            except RobotSequence.DoesNotExist:
+                raise CommandError("Secuencia no encontrada")
+            steps = load_steps(sequence)
+            sequence_name = sequence.name
+        else:
+            steps = benchmarks.synthetic_steps(options['sequence_steps'])
+            sequence_name = 'sintética'
+
+        simulator = VirtualArduino(
+            time_scale=options['time_scale'],
+            baud=options['baud'],
+            binary=options['protocol'] != 'csv',
+            boot_delay=0.2,
+            pipeline=options['pipeline'],
+        )
+
+        silence = io.StringIO() if not options['show_output'] else None
+        with contextlib.redirect_stdout(silence) if silence else contextlib.nullcontext():
+            simulator.start()
+            controller = ArduinoController(port=simulator.port, baud=options['baud'], name='benchmark')
+            controller.protocol_preference = options['protocol']
+            controller.pipeline_request = options['pipeline']
+            controller.connect()
+            if not controller.is_connected_status():
+                simulator.stop()
+                raise CommandError("No se pudo conectar al Arduino virtual")
+
+            results = {}
+            self.stderr.write("round_trip...")
+            results['round_trip'] = benchmarks.bench_round_trip(controller, options['iterations'])
+            self.stderr.write("throughput...")
+            results['throughput'] = benchmarks.bench_throughput(controller, options['duration'])
+            self.stderr.write("gripper...")
+            results['gripper'] = benchmarks.bench_gripper(controller, max(1, options['iterations'] // 4))
+            self.stderr.write("queue burst...")
+            results['queue_burst'] = benchmarks.bench_queue_burst(controller, options['iterations'])
+            self.stderr.write(f"sequence ({sequence_name})...")
+            results['sequence'] = benchmarks.bench_sequence(controller, steps)
+
+            report = {
+                'environment': benchmarks.environment_info(controller, simulator),
+                'results': results,
+            }
+            controller.close()
+        simulator.stop()
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                report['delta_pct'] = benchmarks.compare(report, json.load(f))
+
+        text = json.dumps(report, indent=2, ensure_ascii=False)
+        summary = self.stdout
+        if options['output'] == '-':
+            self.stdout.write(text)
+            summary = self.stderr   # stdout queda como JSON válido
+        else:
+            with open(options['output'], 'w') as f:
+                f.write(text + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {options['output']}"))
+
+        rt = results['round_trip']
+        summary.write(
+            f"round-trip p50={rt['p50_ms']:.2f} ms p95={rt['p95_ms']:.2f} ms p99={rt['p99_ms']:.2f} ms | "
+            f"{results['throughput']['commands_per_s']:.1f} cmd/s | "
+            f"cola {results['queue_burst']['commands_per_s']:.1f} cmd/s | "
+            f"secuencia {results['sequence']['elapsed_s']:.2f} s"
+        )
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from scara_control import kinematics, workspace
+
+
+class Command(BaseCommand):
+    help = ("Precalcula el mapa de alcanzabilidad del espacio de trabajo "
+            "(rejilla XY con la solución de cinemática inversa) en un .npy.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="Ruta del .npy (por defecto settings.SCARA_WORKSPACE_MAP)")
+        parser.add_argument('--resolution', type=float, default=workspace.DEFAULT_RESOLUTION,
+                            help="Tamaño de celda en unidades de los eslabones")
+        parser.add_argument('--elbow', choices=kinematics.ELBOW_CHOICES, default='auto')
+
+    def handle(self, *args, **options):
+        path = options['output'] or workspace.default_path()
+        start = time.perf_counter()
+        meta = workspace.build_map(path, resolution=options['resolution'], elbow=options['elbow'])
+        workspace.reset_map()
+        rows, cols = meta['shape']
+        self.stdout.write(self.style.SUCCESS(
+            f"Mapa {rows}x{cols} ({meta['reachable_cells']} celdas alcanzables) "
+            f"guardado en {path} en {time.perf_counter() - start:.2f} s"
+        ))
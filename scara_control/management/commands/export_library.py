@@ -0,0 +1,32 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from scara_control import bulk_io
+
+
+class Command(BaseCommand):
+    help = "Exporta posiciones o secuencias a JSON lines o CSV en streaming."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=['positions', 'sequences'])
+        parser.add_argument('path', nargs='?', default='-', help="Archivo de salida ('-' para stdout)")
+        parser.add_argument('--format', choices=bulk_io.FORMATS,
+                            help="Por defecto se deduce de la extensión")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or bulk_io.guess_format(path)
+        generator = bulk_io.export_positions if options['kind'] == 'positions' else bulk_io.export_sequences
+
+        stream = sys.stdout if path == '-' else open(path, 'w', encoding='utf-8', newline='')
+        lines = 0
+        try:
+            for line in generator(fmt):
+                stream.write(line)
+                lines += 1
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+        if path != '-':
+            self.stdout.write(self.style.SUCCESS(f"{lines} líneas escritas en {path}"))
@@ -0,0 +1,41 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scara_control import bulk_io
+
+
+class Command(BaseCommand):
+    help = ("Importa posiciones o secuencias desde JSON lines o CSV "
+            "(bulk_create en una sola transacción).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=['positions', 'sequences'])
+        parser.add_argument('path', help="Archivo a importar ('-' para stdin)")
+        parser.add_argument('--format', choices=bulk_io.FORMATS,
+                            help="Por defecto se deduce de la extensión")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or bulk_io.guess_format(path)
+        start = time.perf_counter()
+        try:
+            stream = sys.stdin if path == '-' else open(path, encoding='utf-8-sig', newline='')
+        except OSError as e:
+            raise CommandError(str(e))
+
+        try:
+            with stream:
+                if options['kind'] == 'positions':
+                    created = bulk_io.import_positions(bulk_io.read_positions(stream, fmt))
+                    summary = f"{created} posiciones"
+                else:
+                    sequences, positions, steps = bulk_io.import_sequences(bulk_io.read_sequences(stream, fmt))
+                    summary = f"{sequences} secuencias, {steps} pasos, {positions} posiciones nuevas"
+        except bulk_io.BulkImportError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Importadas {summary} en {time.perf_counter() - start:.2f} s"
+        ))
@@ -0,0 +1,93 @@
+import json
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from scara_control import motion_log
+
+
+class Command(BaseCommand):
+    help = "Muestra o filtra el log binario de la E/S serial (comandos y respuestas)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help="Archivo del log (por defecto SCARA_MOTION_LOG)")
+        parser.add_argument('--direction', choices=sorted(motion_log.DIRECTIONS))
+        parser.add_argument('--kind', choices=sorted(motion_log.KINDS))
+        parser.add_argument('--seq', type=int, help="Solo frames con este número de secuencia")
+        parser.add_argument('--grep', help="Solo registros cuyo contenido incluya este texto")
+        parser.add_argument('--since', type=float,
+                            help="Segundos relativos al último registro (p. ej. -10)")
+        parser.add_argument('--until', type=float)
+        parser.add_argument('--limit', type=int, help="Mostrar solo los últimos N")
+        parser.add_argument('--format', choices=['text', 'jsonl'], default='text')
+        parser.add_argument('--latency', action='store_true',
+                            help="Tiempo de cada comando hasta su DONE/ERROR y resumen")
+        parser.add_argument('--reset', action='store_true',
+                            help="Rotar el log a <archivo>.1 para empezar uno nuevo (no debe estar en uso)")
+
+    def handle(self, *args, **options):
+        path = options['path'] or motion_log.default_path()
+        if options['reset']:
+            try:
+                motion_log.reset(path)
+            except OSError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f"Log rotado: {path} → {path}.1"))
+            return
+        try:
+            reader = motion_log.MotionLogReader(path)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        records = reader.records()
+
+        if options['latency']:
+            self._latency(reader, records, options)
+            return
+
+        records = motion_log.filter_records(
+            records,
+            direction=options['direction'],
+            kind=options['kind'],
+            seq=options['seq'],
+            contains=options['grep'],
+            since=options['since'],
+            until=options['until'],
+        )
+        if options['limit']:
+            records = records[-options['limit']:]
+        for record in records:
+            self.stdout.write(self._format(reader, record, options['format']))
+
+    def _format(self, reader, record, fmt, **extra):
+        wall = float(reader.wall_time(record['t_ns']))
+        direction = 'TX' if record['direction'] == motion_log.TX else 'RX'
+        text = motion_log.describe(record)
+        if fmt == 'jsonl':
+            return json.dumps({
+                'index': int(record['index']),
+                't_ns': int(record['t_ns']),
+                'time': wall,
+                'direction': direction.lower(),
+                'kind': 'frame' if record['kind'] == motion_log.KIND_FRAME else 'text',
+                'seq': int(record['seq']),
+                'status': int(record['status']),
+                'text': text,
+                **extra,
+            }, ensure_ascii=False)
+        stamp = time.strftime('%H:%M:%S', time.localtime(wall)) + f".{int(wall * 1e6) % 1000000:06d}"
+        suffix = ''.join(f" {key}={value}" for key, value in extra.items())
+        return f"{stamp} {direction} {text}{suffix}"
+
+    def _latency(self, reader, records, options):
+        pairs = motion_log.round_trips(records)
+        if options['limit']:
+            pairs = pairs[-options['limit']:]
+        for record, seconds in pairs:
+            self.stdout.write(self._format(reader, record, options['format'], latency_ms=round(seconds * 1000, 3)))
+        if pairs and options['format'] == 'text':
+            ms = np.array([seconds for _, seconds in pairs]) * 1000
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            self.stdout.write(self.style.SUCCESS(
+                f"{len(ms)} comandos: p50={p50:.2f} ms p95={p95:.2f} ms p99={p99:.2f} ms max={ms.max():.2f} ms"
+            ))
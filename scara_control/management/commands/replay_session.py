@@ -0,0 +1,96 @@
+import contextlib
+import io
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scara_control import motion_log, replay
+from scara_control.arduino_communication import ArduinoController
+from scara_control.simulator import VirtualArduino
+
+
+class Command(BaseCommand):
+    help = ("Reproduce una sesión grabada en el motion log contra el Arduino virtual "
+            "(o un puerto real) y reporta desvío de tiempos y throughput.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?',
+                            help="Log grabado (por defecto SCARA_MOTION_LOG)")
+        speed = parser.add_mutually_exclusive_group()
+        speed.add_argument('--speed', type=float, default=1.0, help="Factor de velocidad (1 = tiempo real)")
+        speed.add_argument('--max', action='store_true', help="Tan rápido como sea posible")
+        parser.add_argument('--port', help="Puerto serie real (por defecto un Arduino virtual)")
+        parser.add_argument('--baud', type=int, default=9600)
+        parser.add_argument('--protocol', choices=['auto', 'csv', 'binary'], default='auto')
+        parser.add_argument('--pipeline', type=int, default=0,
+                            help="Ventana del modo pipeline (y buffer del simulador)")
+        parser.add_argument('--limit', type=int, help="Solo los primeros N comandos")
+        parser.add_argument('--record', help="Grabar la reproducción en otro motion log")
+        parser.add_argument('--output', default='-', help="JSON del reporte ('-' para stdout)")
+        parser.add_argument('--show-output', action='store_true',
+                            help="No silenciar los logs del controlador")
+
+    def handle(self, *args, **options):
+        path = options['path'] or motion_log.default_path()
+        try:
+            records = motion_log.MotionLogReader(path).records()
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        commands = replay.load_session(records)
+        if options['limit']:
+            commands = commands[:options['limit']]
+        if not commands:
+            raise CommandError("El log no contiene comandos")
+        speed = None if options['max'] or options['speed'] <= 0 else options['speed']
+        self.stderr.write(
+            f"{len(commands)} comandos, {sum(not c.blocking for c in commands)} en streaming, "
+            f"{'máxima velocidad' if speed is None else f'{speed}×'}"
+        )
+
+        simulator = None
+        port = options['port']
+        if port is None:
+            simulator = VirtualArduino(
+                time_scale=1.0 / speed if speed else 0.0,
+                baud=options['baud'],
+                binary=options['protocol'] != 'csv',
+                boot_delay=0.2,
+                pipeline=options['pipeline'],
+            )
+            port = simulator.start()
+
+        silence = io.StringIO() if not options['show_output'] else None
+        try:
+            with contextlib.redirect_stdout(silence) if silence else contextlib.nullcontext():
+                controller = ArduinoController(port=port, baud=options['baud'], name='replay')
+                controller.protocol_preference = options['protocol']
+                controller.pipeline_request = options['pipeline']
+                controller.motion_log = motion_log.MotionLog(options['record'], reset=True) if options['record'] else None
+                controller.connect()
+                if not controller.is_connected_status():
+                    raise CommandError(f"No se pudo conectar a {port}")
+                report = replay.SessionReplay(commands, controller, speed).run()
+                report['protocol'] = controller.protocol_mode
+                controller.close()
+                if controller.motion_log is not None:
+                    controller.motion_log.close()
+        finally:
+            if simulator is not None:
+                simulator.stop()
+
+        text = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output'] == '-':
+            self.stdout.write(text)
+        else:
+            with open(options['output'], 'w') as f:
+                f.write(text + "\n")
+
+        lag = report['schedule_lag']
+        ratio = report['latency_ratio']
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['commands']} comandos en {report['elapsed_s']:.2f} s "
+            f"({report['commands_per_s']:.1f} cmd/s, grabado {report['recorded_s']:.2f} s)"
+            + (f" | desvío p95={lag['p95_ms']:.1f} ms" if lag else "")
+            + (f" | latencia/grabada p50={ratio['p50']:.2f}" if ratio else "")
+            + (f" | {report['failures']} fallidos" if report['failures'] else "")
+        ))
@@ -0,0 +1,36 @@
+import signal
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from scara_control.robot_daemon import RobotDaemon
+from scara_control.robots import RobotRegistry
+
+
+class Command(BaseCommand):
+    help = ("Proceso dueño de los puertos serie: conecta los robots de SCARA_ROBOTS y "
+            "atiende a los workers web por un socket Unix (SCARA_DAEMON_SOCKET).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--socket', help="Ruta del socket (por defecto SCARA_DAEMON_SOCKET)")
+
+    def handle(self, *args, **options):
+        path = (options['socket'] or getattr(settings, 'SCARA_DAEMON_SOCKET', '')
+                or str(Path(settings.BASE_DIR) / 'scara_robot.sock'))
+        # Registro local aunque SCARA_DAEMON_SOCKET esté definido: este proceso es el daemon
+        registry = RobotRegistry()
+        for robot in registry.all():
+            robot.controller.is_connected_status()      # Crea el controlador y conecta en segundo plano
+        daemon = RobotDaemon(path, registry)
+        # shutdown() espera al bucle del servidor: se llama desde otro hilo
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=daemon.shutdown).start())
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for robot in registry.all():
+                robot.controller.close()
+            self.stdout.write("Daemon detenido")
@@ -0,0 +1,259 @@
+"""
+Métricas del controlador y de la API en formato de texto de Prometheus.
+
+Contadores, gauges e histogramas en memoria, sin dependencias: registrar
+una muestra es un incremento bajo un lock (del orden de un microsegundo),
+así que se puede llamar en el camino de cada comando. Los gauges que
+dependen de otro objeto (profundidad de la cola de cada robot) se calculan recién al
+leer /metrics con set_function.
+"""
+import bisect
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        try:
+            if len(labels) == len(self.labelnames):
+                return tuple([str(labels[name]) for name in self.labelnames])
+        except KeyError:
+            pass
+        raise ValueError(f"{self.name}: se esperaban las etiquetas {self.labelnames}")
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        if not items and not self.labelnames:
+            items = [((), 0)]
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+        self._functions = {}
+
+    def set(self, value, **labels):
+        self._values[self._key(labels)] = value
+
+    def set_function(self, function, **labels):
+        """El valor se obtiene llamando a `function()` al exportar."""
+        self._functions[self._key(labels)] = function
+
+    def _read(self, key):
+        function = self._functions.get(key)
+        if function is not None:
+            try:
+                return function()
+            except Exception:
+                return float('nan')
+        return self._values.get(key, 0)
+
+    def value(self, **labels):
+        return self._read(self._key(labels))
+
+    def _samples(self):
+        keys = sorted(set(self._values) | set(self._functions))
+        if not keys and not self.labelnames:
+            keys = [()]
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(self._read(key))}"
+                for key in keys]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}           # etiquetas → [conteos por bucket..., +Inf], suma
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, **labels):
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrica duplicada: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self, only=None, exclude=()):
+        """
+        Las métricas (todas, solo `only` o todas menos `exclude`, por nombre)
+        en el formato de texto 0.0.4 de Prometheus.
+        """
+        lines = []
+        for metric in self._metrics.values():
+            if (only is not None and metric.name not in only) or metric.name in exclude:
+                continue
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Instancia global
+registry = Registry()
+
+# Controlador (ArduinoController), etiquetadas por robot del registro
+COMMANDS = registry.counter(
+    'scara_commands_total', 'Comandos send_position por resultado.', ('robot', 'protocol', 'result'))
+COMMAND_ROUND_TRIP = registry.histogram(
+    'scara_command_round_trip_seconds', 'Desde send_position hasta la confirmación DONE.', ('robot',))
+DONE_WAIT = registry.histogram(
+    'scara_done_wait_seconds', 'Espera de DONE/ERROR tras escribir el comando.', ('robot',))
+DONE_TIMEOUTS = registry.counter(
+    'scara_done_timeouts_total', 'Comandos sin DONE dentro de response_timeout.', ('robot',))
+ERROR_REPLIES = registry.counter(
+    'scara_error_replies_total', 'Respuestas ERROR del firmware (CSV o frame).', ('robot',))
+BUSY_REJECTIONS = registry.counter(
+    'scara_busy_rejections_total', 'Comandos rechazados por robot ocupado.', ('robot',))
+RECONNECTS = registry.counter(
+    'scara_reconnect_attempts_total', 'Intentos de abrir el puerto serie.', ('robot', 'result'))
+RETRANSMISSIONS = registry.counter(
+    'scara_retransmissions_total', 'Frames reenviados en modo pipeline.', ('robot',))
+CONNECTED = registry.gauge('scara_connected', '1 si el puerto serie está abierto.', ('robot',))
+INFLIGHT = registry.gauge(
+    'scara_commands_inflight', 'Comandos enviados sin DONE (pipeline/streaming).', ('robot',))
+
+# Cola de movimientos
+QUEUE_DEPTH = registry.gauge('scara_queue_depth', 'Trabajos en cola más el que se ejecuta.', ('robot',))
+
+# API
+HTTP_DURATION = registry.histogram(
+    'scara_http_request_duration_seconds', 'Duración de las peticiones por vista.',
+    ('view', 'method', 'status'))
+# Las que mide cada worker web; con daemon, las demás se piden al daemon
+API_METRICS = (HTTP_DURATION.name,)
+
+
+class MetricsMiddleware:
+    """
+    Mide cada petición, etiquetada por nombre de ruta (no por URL: cardinalidad acotada).
+    Soporta sync y async, para no forzar a las vistas async a correr en un hilo.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self._observe(request, response, start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self._observe(request, response, start)
+        return response
+
+    @staticmethod
+    def _observe(request, response, start):
+        match = getattr(request, 'resolver_match', None)
+        view = (match.url_name or match.view_name) if match else 'unmatched'
+        HTTP_DURATION.observe(
+            time.perf_counter() - start,
+            view=view, method=request.method, status=response.status_code,
+        )
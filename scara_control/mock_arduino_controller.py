@@ -1,5 +1,19 @@
+from . import protocol
+
+
 class MockArduinoController:
-    def __init__(self):
+    """
+    Controlador simulado sin hardware. Limita cada comando a los rangos del
+    robot igual que ArduinoController. Con protocol_mode='binary'
+    (SCARA_PROTOCOL=binary) cada comando se codifica en un frame y se vuelve
+    a decodificar, igual que lo haría el firmware, para probar el protocolo
+    binario sin Arduino.
+    """
+
+    def __init__(self, protocol_mode='csv', name='default'):
+        self.name = name
+        self.protocol_mode = protocol_mode
+        self._seq = 0
         self.last_position = {
             'arm1': 0,
             'arm2': 0,
@@ -11,8 +25,33 @@ class MockArduinoController:
         self.is_busy = False
         self.waiting_for_done = False
         self.is_connected = True
+        self._status_listeners = []
+
+    def add_status_listener(self, callback):
+        if callback not in self._status_listeners:
+            self._status_listeners.append(callback)
+
+    def remove_status_listener(self, callback):
+        if callback in self._status_listeners:
+            self._status_listeners.remove(callback)
+
+    def _notify_status(self):
+        for callback in list(self._status_listeners):
+            callback()
 
     def send_position(self, arm1_angle, arm2_angle, base_height, gripper_state, speed=500):
+        try:
+            return self._send_position(arm1_angle, arm2_angle, base_height, gripper_state, speed)
+        finally:
+            self._notify_status()
+
+    def _send_position(self, arm1_angle, arm2_angle, base_height, gripper_state, speed):
+        # Import local: arduino_communication importa este módulo
+        from .arduino_communication import clamp_position
+
+        arm1_angle, arm2_angle, base_height, speed = clamp_position(arm1_angle, arm2_angle, base_height, speed)
+        if self.protocol_mode == 'binary':
+            return self._send_binary(arm1_angle, arm2_angle, base_height, gripper_state, speed)
         print(f"[MOCK] Comando simulado: {arm1_angle},{arm2_angle},{base_height},{gripper_state},{speed}")
         self.last_position = {
             'arm1': arm1_angle,
@@ -24,6 +63,40 @@ class MockArduinoController:
         self.current_gripper_state = gripper_state
         return True
 
+    def _send_binary(self, arm1_angle, arm2_angle, base_height, gripper_state, speed):
+        """Ida y vuelta por el codec binario: frame de comando → decodificar → frame de respuesta."""
+        self._seq = (self._seq + 1) & 0xFF
+        frame = protocol.encode_command(
+            self._seq, arm1_angle, arm2_angle, base_height, 1 if gripper_state else 0, speed
+        )
+        events = protocol.command_decoder(binary=True).feed(frame)
+        if not events or events[0][0] != 'frame':
+            reply = protocol.encode_reply(self._seq, protocol.STATUS_BAD_CRC)
+        else:
+            seq, arm1, arm2, base, grip, speed = events[0][1]
+            print(f"[MOCK] Frame binario decodificado (seq={seq}): {arm1},{arm2},{base},{grip},{speed}")
+            self.last_position = {
+                'arm1': arm1,
+                'arm2': arm2,
+                'base': base,
+                'gripper': bool(grip),
+                'speed': speed
+            }
+            self.current_gripper_state = bool(grip)
+            reply = protocol.encode_reply(seq, protocol.STATUS_DONE)
+        kind, (seq, status) = protocol.reply_decoder(binary=True).feed(reply)[0]
+        return seq == self._seq and status == protocol.STATUS_DONE
+
+    def stream_position(self, arm1_angle, arm2_angle, base_height, gripper_state, speed=500):
+        # Sin handshake real: igual que send_position pero sin notificar
+        return self._send_position(arm1_angle, arm2_angle, base_height, gripper_state, speed)
+
+    def stream_outstanding(self):
+        return 0
+
+    def wait_for_stream(self, max_outstanding=0, timeout=None):
+        return True
+
     def send_command(self, q1, q2, z, grip, speed=500):
         return self.send_position(q1, q2, z, grip, speed)
 
@@ -75,6 +148,7 @@ class MockArduinoController:
             'connected': True,
             'busy': False,
             'waiting_confirmation': False,
+            'protocol': self.protocol_mode,
             'last_position': self.get_last_position(),
             'gripper_state': self.get_gripper_state_text()
         }
@@ -0,0 +1,333 @@
+"""
+Registro binario de todo lo que pasa por el enlace serial.
+
+Cada comando enviado y cada respuesta recibida se guarda como un registro
+de tamaño fijo (64 bytes) con su marca de tiempo monotónica, en un archivo
+mapeado en memoria que funciona como buffer circular: al llenarse se
+sobreescriben los registros más antiguos, así el tamaño queda acotado.
+
+Un solo proceso escribe cada archivo: al abrirlo se toma un lock exclusivo
+(flock) y si otro proceso ya lo tiene, el log queda desactivado en este
+(p. ej. el hijo del autoreloader de runserver o un comando de gestión
+mientras corre el servidor). Un archivo existente con la misma cabecera se
+sigue escribiendo donde quedó; solo se rota a `<archivo>.1`, `.2`... con
+reset explícito (`manage.py motion_log --reset`) o si cambió el formato, la
+capacidad o el reloj monotónico (reinicio del sistema).
+
+Escritura sin locks: el número de registro sale de itertools.count (atómico
+bajo el GIL) y cada hilo escribe su propio slot con un solo
+struct.pack_into. Cada slot guarda su número de registro: el lector ordena
+por él y descarta lo que quedó de vueltas anteriores.
+
+Registro:  t_ns u8 | index u8 | direction u1 | kind u1 | seq u1 | status u1 |
+           length u2 | payload 42 bytes (texto o frame crudo, truncado)
+"""
+import itertools
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:         # Windows: sin lock entre procesos
+    fcntl = None
+
+import numpy as np
+from django.conf import settings
+
+from . import protocol
+
+MAGIC = b'SCARALOG'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sIIQd')       # magic, versión, tamaño de registro, capacidad, epoch
+HEADER_SIZE = 64
+
+PAYLOAD_SIZE = 42
+RECORD = struct.Struct(f'<QQBBBBH{PAYLOAD_SIZE}s')
+RECORD_SIZE = RECORD.size
+RECORD_DTYPE = np.dtype([
+    ('t_ns', '<u8'),
+    ('index', '<u8'),
+    ('direction', 'u1'),
+    ('kind', 'u1'),
+    ('seq', 'u1'),
+    ('status', 'u1'),
+    ('length', '<u2'),
+    ('payload', f'S{PAYLOAD_SIZE}'),
+])
+
+TX = 0
+RX = 1
+KIND_TEXT = 0
+KIND_FRAME = 1
+
+DIRECTIONS = {'tx': TX, 'rx': RX}
+KINDS = {'text': KIND_TEXT, 'frame': KIND_FRAME}
+
+DEFAULT_RECORDS = 65536         # 4 MB
+DEFAULT_BACKUPS = 3
+
+# Diferencia de epoch (hora de pared - monotónico) tolerada al reabrir un
+# log; más que esto es otro arranque del sistema (o un salto del reloj)
+EPOCH_TOLERANCE = 5.0
+
+
+class MotionLogBusy(OSError):
+    """Otro proceso tiene el log abierto para escritura."""
+
+
+def _current_epoch():
+    # Pasar t_ns (monotónico) a hora de pared al leer
+    return time.time() - time.monotonic_ns() / 1e9
+
+
+def _open(path):
+    # Crea sin truncar: el contenido es de quien tenga el lock
+    return os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o644), 'r+b')
+
+
+def _lock(f, path):
+    if fcntl is None:
+        return
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        raise MotionLogBusy(f"{path} está en uso por otro proceso")
+
+
+def reset(path, backups=DEFAULT_BACKUPS):
+    """Rota el log (el próximo MotionLog empieza vacío). Falla si está en uso."""
+    path = Path(path)
+    if not path.exists():
+        return
+    with open(path, 'rb') as f:
+        _lock(f, path)
+        _rotate(path, backups)
+
+
+def _rotate(path, backups):
+    """archivo → archivo.1 → archivo.2 ... descartando el más viejo."""
+    if not path.exists():
+        return
+    for n in range(backups, 0, -1):
+        older = path.with_name(f"{path.name}.{n}")
+        newer = path.with_name(f"{path.name}.{n - 1}") if n > 1 else path
+        if newer.exists():
+            os.replace(newer, older)
+
+
+class MotionLog:
+    """
+    Escritor del buffer circular. Los métodos record_* no bloquean ni toman
+    locks; el lock del archivo (MotionLogBusy si no se obtiene) se mantiene
+    hasta close(). Con `reset` se rota el archivo existente y se empieza
+    vacío; si no, se continúa el que haya si es compatible.
+    """
+
+    def __init__(self, path, capacity=DEFAULT_RECORDS, backups=DEFAULT_BACKUPS, reset=False):
+        self.path = Path(path)
+        self.capacity = int(capacity)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        size = HEADER_SIZE + self.capacity * RECORD_SIZE
+        epoch = _current_epoch()
+
+        self._file = _open(self.path)
+        _lock(self._file, self.path)
+        if not reset and self._compatible(size, epoch):
+            self._mm = mmap.mmap(self._file.fileno(), size)
+            last = np.frombuffer(self._mm, dtype=RECORD_DTYPE, count=self.capacity, offset=HEADER_SIZE)['index']
+            self._counter = itertools.count(int(last.max()))
+            return
+
+        if backups and self._file.seek(0, os.SEEK_END):
+            # El lock sigue en el inodo renombrado hasta cerrarlo
+            locked, self._file = self._file, None
+            _rotate(self.path, backups)
+            self._file = _open(self.path)
+            _lock(self._file, self.path)
+            locked.close()
+        self._file.truncate(0)
+        self._file.truncate(size)
+        self._mm = mmap.mmap(self._file.fileno(), size)
+        HEADER.pack_into(self._mm, 0, MAGIC, FORMAT_VERSION, RECORD_SIZE, self.capacity, epoch)
+        self._counter = itertools.count()
+
+    def _compatible(self, size, epoch):
+        """El archivo abierto es un log de este formato, capacidad y arranque del sistema."""
+        self._file.seek(0)
+        header = self._file.read(HEADER.size)
+        if len(header) < HEADER.size or self._file.seek(0, os.SEEK_END) != size:
+            return False
+        magic, version, record_size, capacity, old_epoch = HEADER.unpack(header)
+        return (magic == MAGIC and version == FORMAT_VERSION and record_size == RECORD_SIZE
+                and capacity == self.capacity and abs(old_epoch - epoch) <= EPOCH_TOLERANCE)
+
+    def record(self, direction, kind, payload=b'', seq=0, status=0):
+        index = next(self._counter)
+        offset = HEADER_SIZE + (index % self.capacity) * RECORD_SIZE
+        try:
+            RECORD.pack_into(
+                self._mm, offset, time.monotonic_ns(), index + 1,   # 0 = slot vacío
+                direction, kind, seq & 0xFF, status & 0xFF, min(len(payload), 0xFFFF), payload,
+            )
+        except (ValueError, TypeError):
+            pass            # Log cerrado: no debe romper el enlace
+
+    def record_tx(self, data):
+        """Bytes escritos al puerto: frame binario o línea de texto."""
+        if data[:1] == bytes([protocol.COMMAND_START]) and len(data) == protocol.COMMAND_SIZE:
+            self.record(TX, KIND_FRAME, data, seq=data[1])
+        else:
+            self.record(TX, KIND_TEXT, data.rstrip(b'\r\n'))
+
+    def record_rx_line(self, line):
+        self.record(RX, KIND_TEXT, line.encode('utf-8', errors='replace'))
+
+    def record_rx_frame(self, seq, status):
+        self.record(RX, KIND_FRAME, seq=seq, status=status)
+
+    def close(self):
+        self._mm.flush()
+        self._mm.close()
+        self._file.close()      # Libera el lock
+
+
+# ----------------------------------------------------------------------------------------------------
+# Lectura
+# ----------------------------------------------------------------------------------------------------
+
+class MotionLogReader:
+    """Lee un log (también mientras se escribe) como array estructurado de numpy."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            header = f.read(HEADER.size)
+        magic, version, record_size, capacity, epoch = HEADER.unpack(header)
+        if magic != MAGIC or record_size != RECORD_SIZE:
+            raise ValueError(f"{self.path} no es un motion log (versión {version})")
+        self.capacity = capacity
+        self.epoch = epoch
+
+    def records(self):
+        """Registros válidos en orden de escritura (los más viejos ya sobreescritos no aparecen)."""
+        data = np.fromfile(self.path, dtype=RECORD_DTYPE, offset=HEADER_SIZE, count=self.capacity)
+        data = data[data['index'] > 0]
+        # Cada slot guarda su número: se ordena por él y se descarta lo que no es de la última vuelta
+        data = data[np.argsort(data['index'], kind='stable')]
+        if len(data):
+            data = data[data['index'] > max(0, int(data['index'][-1]) - self.capacity)]
+        return data
+
+    def wall_time(self, t_ns):
+        return self.epoch + np.asarray(t_ns, dtype=np.float64) / 1e9
+
+
+def filter_records(records, direction=None, kind=None, seq=None, contains=None,
+                   since=None, until=None):
+    """
+    Filtra vectorizado. since/until en segundos relativos al último
+    registro (negativos: p. ej. since=-5 son los últimos 5 s).
+    """
+    mask = np.ones(len(records), dtype=bool)
+    if direction is not None:
+        mask &= records['direction'] == DIRECTIONS.get(direction, direction)
+    if kind is not None:
+        mask &= records['kind'] == KINDS.get(kind, kind)
+    if seq is not None:
+        mask &= (records['kind'] == KIND_FRAME) & (records['seq'] == seq)
+    if len(records) and (since is not None or until is not None):
+        last = records['t_ns'][-1]
+        if since is not None:
+            mask &= records['t_ns'] >= last + since * 1e9
+        if until is not None:
+            mask &= records['t_ns'] <= last + until * 1e9
+    if contains is not None:
+        needle = contains.encode('utf-8')
+        mask &= np.char.find(records['payload'], needle) >= 0
+    return records[mask]
+
+
+def payload(record):
+    """Bytes guardados del registro (hasta PAYLOAD_SIZE)."""
+    # numpy recorta los \x00 finales de los campos S: rellenar hasta length
+    length = min(int(record['length']), PAYLOAD_SIZE)
+    return bytes(record['payload']).ljust(length, b'\0')[:length]
+
+
+def describe(record):
+    """Texto legible de un registro."""
+    data = payload(record)
+    truncated = '…' if record['length'] > PAYLOAD_SIZE else ''
+    if record['kind'] == KIND_TEXT:
+        return data.decode('utf-8', errors='replace') + truncated
+    if record['direction'] == TX:
+        decoded = protocol.decode_command(data) if len(data) == protocol.COMMAND_SIZE else None
+        if decoded is None:
+            return f"frame seq={record['seq']} {data.hex()}"
+        seq, arm1, arm2, base, grip, speed = decoded
+        return f"frame seq={seq} {arm1},{arm2},{base},{grip},{speed}"
+    return f"reply seq={record['seq']} status={record['status']}"
+
+
+def round_trips(records):
+    """
+    Empareja cada comando con su respuesta: por seq en binario (DONE/ERROR,
+    no QUEUED) y en orden FIFO con las líneas DONE/ERROR en CSV.
+    Retorna una lista de (registro del comando, segundos).
+    """
+    pairs = []
+    by_seq = {}
+    text_fifo = []
+    for record in records:
+        if record['direction'] == TX:
+            if record['kind'] == KIND_FRAME:
+                by_seq[int(record['seq'])] = record
+            elif b',' in bytes(record['payload']):
+                text_fifo.append(record)
+            continue
+        if record['kind'] == KIND_FRAME:
+            if record['status'] in (protocol.STATUS_QUEUED, protocol.STATUS_FULL):
+                continue
+            command = by_seq.pop(int(record['seq']), None)
+        else:
+            payload = bytes(record['payload'])
+            if not (payload.startswith(b'DONE') or payload.startswith(b'ERROR')) or not text_fifo:
+                continue
+            command = text_fifo.pop(0)
+        if command is not None:
+            pairs.append((command, (int(record['t_ns']) - int(command['t_ns'])) / 1e9))
+    return pairs
+
+
+def default_path():
+    return getattr(settings, 'SCARA_MOTION_LOG', str(Path(settings.BASE_DIR) / 'motion_log.bin'))
+
+
+def robot_path(path, robot_id):
+    """Log de otro robot junto al principal: motion_log.bin → motion_log-<robot>.bin."""
+    if not path:
+        return path
+    path = Path(path)
+    return str(path.with_name(f"{path.stem}-{robot_id}{path.suffix}"))
+
+
+def open_from_settings(path=None):
+    """
+    MotionLog en `path` (por defecto SCARA_MOTION_LOG) con capacidad
+    SCARA_MOTION_LOG_RECORDS. None si está desactivado.
+    """
+    path = default_path() if path is None else path
+    if not path:
+        return None
+    try:
+        return MotionLog(path, getattr(settings, 'SCARA_MOTION_LOG_RECORDS', DEFAULT_RECORDS))
+    except MotionLogBusy as e:
+        print(f"[MotionLog] Log desactivado en este proceso: {e}")
+        return None
+    except OSError as e:
+        print(f"[MotionLog] No se pudo abrir {path}: {e}")
+        return None
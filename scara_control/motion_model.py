@@ -0,0 +1,92 @@
+"""
+Modelo de movimiento del firmware (ARDUINO.txt).
+
+Reproduce las conversiones a pasos y los perfiles trapezoidales de
+AccelStepper para estimar cuánto tarda el Arduino en completar un comando.
+"""
+import numpy as np
+
+# Conversión de ángulo a pasos de J1/J2: 200 pasos/rev, reducción 62:20
+Q_STEPS_PER_DEGREE = (200.0 / 360.0) * (62.0 / 20.0)
+# Conversión de distancia a pasos de Z: 200 pasos/rev, husillo de 2 cm
+Z_STEPS_PER_CM = 200.0 / 2.0
+
+# AccelStepper: J1/J2 con aceleración fija y velocidad = campo speed del comando
+J_ACCELERATION = 500.0     # pasos/s²
+# Z con velocidad y aceleración fijas
+Z_MAX_SPEED = 50.0         # pasos/s
+Z_ACCELERATION = 100.0     # pasos/s²
+
+# delay(500) tras mover el servo de la pinza
+SERVO_DELAY = 0.5
+
+
+def joint_steps(arm1_angle, arm2_angle, base_height):
+    """
+    Posiciones objetivo en pasos (J1, J2, Z), truncadas a long como el firmware.
+    J2 recibe arm1 + arm2 porque el firmware los suma.
+    """
+    j1 = int(arm1_angle * Q_STEPS_PER_DEGREE)
+    j2 = int((arm2_angle + arm1_angle) * Q_STEPS_PER_DEGREE)
+    z = int(base_height * Z_STEPS_PER_CM)
+    return j1, j2, z
+
+
+def trapezoid_time(distance, max_speed, acceleration):
+    """
+    Duración de un movimiento de `distance` pasos con perfil trapezoidal
+    (o triangular si no llega a velocidad máxima). Acepta escalares o arrays.
+    """
+    distance = np.abs(np.asarray(distance, dtype=float))
+    max_speed = np.asarray(max_speed, dtype=float)
+    acceleration = np.asarray(acceleration, dtype=float)
+    ramp_distance = max_speed * max_speed / acceleration
+    triangular = 2.0 * np.sqrt(distance / acceleration)
+    trapezoidal = distance / max_speed + max_speed / acceleration
+    return np.where(distance <= ramp_distance, triangular, trapezoidal)
+
+
+def move_time(start_steps, target_steps, speed):
+    """
+    Tiempo de un comando: J1, J2 y Z se mueven a la vez, así que manda el
+    eje más lento. `start_steps`/`target_steps` son tuplas (J1, J2, Z).
+    """
+    j1 = trapezoid_time(target_steps[0] - start_steps[0], speed, J_ACCELERATION)
+    j2 = trapezoid_time(target_steps[1] - start_steps[1], speed, J_ACCELERATION)
+    z = trapezoid_time(target_steps[2] - start_steps[2], Z_MAX_SPEED, Z_ACCELERATION)
+    return float(max(j1, j2, z))
+
+
+def joint_steps_array(arm1_angle, arm2_angle, base_height):
+    """joint_steps() sobre arrays: matriz (n, 3) con los pasos J1, J2, Z de cada comando."""
+    arm1_angle = np.asarray(arm1_angle, dtype=float)
+    arm2_angle = np.asarray(arm2_angle, dtype=float)
+    base_height = np.asarray(base_height, dtype=float)
+    return np.stack([
+        np.trunc(arm1_angle * Q_STEPS_PER_DEGREE),
+        np.trunc((arm2_angle + arm1_angle) * Q_STEPS_PER_DEGREE),
+        np.trunc(base_height * Z_STEPS_PER_CM),
+    ], axis=-1)
+
+
+def command_times(targets, speeds, gripper, start_steps=(0, 0, 0), start_gripper=0):
+    """
+    Tiempos de una serie de comandos punto a punto, como los ejecuta loop():
+    primero el servo (SERVO_DELAY si la pinza cambia de estado) y luego el
+    movimiento. `targets` es la matriz (n, 3) de joint_steps_array; cada
+    comando sale de donde terminó el anterior. Retorna (tiempos por eje
+    (n, 3), tiempo de servo (n,)).
+    """
+    targets = np.asarray(targets, dtype=float).reshape(-1, 3)
+    speeds = np.maximum(np.asarray(speeds, dtype=float), 1.0)
+    gripper = np.asarray(gripper, dtype=int)
+    starts = np.vstack([np.asarray(start_steps, dtype=float).reshape(1, 3), targets])[:-1]
+    distance = targets - starts
+    axis_times = np.column_stack([
+        trapezoid_time(distance[:, 0], speeds, J_ACCELERATION),
+        trapezoid_time(distance[:, 1], speeds, J_ACCELERATION),
+        trapezoid_time(distance[:, 2], Z_MAX_SPEED, Z_ACCELERATION),
+    ])
+    previous = np.concatenate([[int(start_gripper)], gripper])[:-1]
+    servo = np.where(gripper != previous, SERVO_DELAY, 0.0)
+    return axis_times, servo
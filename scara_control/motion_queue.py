@@ -0,0 +1,268 @@
+import itertools
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from .arduino_communication import arduino_controller
+
+# Ids de trabajo únicos en el proceso (compartidos por las colas de todos los robots)
+_job_ids = itertools.count(1)
+
+
+class MotionJob:
+    """
+    Trabajo de movimiento encolado. Estados: queued → running → done | failed,
+    o queued → cancelled (MotionQueue.cancel). `future` se resuelve con el
+    resultado cuando el ejecutor termina.
+    """
+
+    def __init__(self, job_id, func, args, kwargs, description=''):
+        self.id = job_id
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.description = description
+        self.state = 'queued'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = Future()
+        self.position = None        # Argumentos de send_position, si es un movimiento simple
+
+    def is_finished(self):
+        return self.state in ('done', 'failed', 'cancelled')
+
+    def wait(self, timeout=None):
+        """Bloquea hasta que el trabajo termine; retorna True si terminó."""
+        try:
+            self.future.result(timeout)
+        except Exception:
+            pass
+        return self.is_finished()
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'description': self.description,
+            'state': self.state,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class MotionQueue:
+    """
+    Cola FIFO de movimientos delante del controlador. Un único hilo ejecutor
+    la drena en orden, así que los comandos ya no se rechazan por "ocupado"
+    y ninguna petición HTTP se queda esperando el DONE.
+
+    Si el controlador negoció el modo pipeline, los movimientos simples
+    (submit_position) se envían sin esperar el DONE del anterior, hasta
+    llenar la ventana del firmware; cada trabajo termina al llegar su DONE.
+    Cualquier otro trabajo espera a que se vacíe el pipeline antes de correr.
+    """
+
+    def __init__(self, controller, max_history=500):
+        self.controller = controller
+        self.max_history = max_history
+        self._queue = queue.Queue()
+        self._jobs = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self.current_job = None
+        self._pending = 0                      # Encolados + en ejecución
+        self._in_pipeline = 0                  # Movimientos enviados sin DONE todavía
+        self._pipeline_cond = threading.Condition()
+        self._status_listeners = []
+
+    def add_status_listener(self, callback):
+        """Registra un callback sin argumentos que se llama al cambiar la cola."""
+        if callback not in self._status_listeners:
+            self._status_listeners.append(callback)
+
+    def remove_status_listener(self, callback):
+        if callback in self._status_listeners:
+            self._status_listeners.remove(callback)
+
+    def _notify_status(self):
+        for callback in list(self._status_listeners):
+            try:
+                callback()
+            except Exception as e:
+                print(f"[MotionQueue] Error en listener de estado: {e}")
+
+    # ------------------------------------------------------------------
+    # Envío de trabajos
+    # ------------------------------------------------------------------
+    def submit(self, func, *args, description='', **kwargs):
+        """Encola `func(*args, **kwargs)` y retorna el MotionJob al instante."""
+        return self._enqueue(MotionJob(next(_job_ids), func, args, kwargs, description))
+
+    def _enqueue(self, job):
+        with self._jobs_lock:
+            self._jobs[job.id] = job
+            self._pending += 1
+            self._trim_history()
+        self._ensure_worker()
+        self._queue.put(job)
+        print(f"[MotionQueue] Trabajo {job.id} encolado: {job.description}")
+        self._notify_status()
+        return job
+
+    def submit_position(self, arm1_angle, arm2_angle, base_height, gripper_state, speed=500):
+        """Encola un movimiento punto a punto (send_position)."""
+        args = (arm1_angle, arm2_angle, base_height, gripper_state, speed)
+        job = MotionJob(
+            next(_job_ids), self.controller.send_position, args, {},
+            f"move {arm1_angle},{arm2_angle},{base_height},{gripper_state},{speed}",
+        )
+        job.position = args
+        return self._enqueue(job)
+
+    def submit_home(self):
+        """Encola el regreso a la posición home."""
+        return self.submit(self.controller.home_position, description='home')
+
+    def cancel(self, job):
+        """
+        Saca de la cola un trabajo que todavía no empezó. Retorna False si ya
+        está corriendo o terminó (un movimiento enviado no se puede retirar).
+        """
+        with self._jobs_lock:
+            if job.state != 'queued':
+                return False
+            job.state = 'cancelled'
+            job.finished_at = time.time()
+            self._pending -= 1
+        job.future.set_result(None)
+        print(f"[MotionQueue] Trabajo {job.id} cancelado")
+        self._notify_status()
+        return True
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    def get_job(self, job_id):
+        with self._jobs_lock:
+            return self._jobs.get(job_id)
+
+    def recent_jobs(self, limit=50):
+        with self._jobs_lock:
+            jobs = list(self._jobs.values())[-limit:]
+        return [job.to_dict() for job in reversed(jobs)]
+
+    def pending_count(self):
+        """Trabajos en cola más el que se está ejecutando."""
+        return self._pending
+
+    def is_idle(self):
+        return self.pending_count() == 0
+
+    # ------------------------------------------------------------------
+    # Ejecutor
+    # ------------------------------------------------------------------
+    def _ensure_worker(self):
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="motion-queue", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            pipelined = job.position is not None and self._pipeline_enabled()
+            if not pipelined:
+                self._wait_pipeline_idle()
+            with self._jobs_lock:
+                cancelled = job.state == 'cancelled'
+                if not cancelled:
+                    job.state = 'running'
+            if cancelled:
+                self._queue.task_done()
+                continue
+            self.current_job = job
+            job.started_at = time.time()
+            if pipelined:
+                self._start_pipelined(job)
+                continue
+            result, error = None, None
+            try:
+                result = job.func(*job.args, **job.kwargs)
+            except Exception as e:
+                print(f"[MotionQueue] Error en trabajo {job.id}: {e}")
+                error = str(e)
+            self._finish(job, result, error)
+
+    def _finish(self, job, result, error=None):
+        job.result = result
+        if error is not None:
+            job.state = 'failed'
+            job.error = error
+        elif result is False:
+            job.state = 'failed'
+            job.error = 'Error enviando comando'
+        else:
+            job.state = 'done'
+        job.finished_at = time.time()
+        if self.current_job is job:
+            self.current_job = None
+        with self._jobs_lock:
+            self._pending -= 1
+        job.future.set_result(job.result)
+        self._queue.task_done()
+        self._notify_status()
+
+    # ------------------------------------------------------------------
+    # Pipeline
+    # ------------------------------------------------------------------
+    def _pipeline_enabled(self):
+        return getattr(self.controller, 'pipeline_window', 0) > 0
+
+    def _start_pipelined(self, job):
+        """Envía el movimiento (bloquea solo si la ventana está llena) y sigue."""
+        try:
+            pending = self.controller.send_position_async(*job.position)
+        except Exception as e:
+            print(f"[MotionQueue] Error en trabajo {job.id}: {e}")
+            self._finish(job, None, str(e))
+            return
+        if pending is None:
+            self._finish(job, False)
+            return
+        with self._pipeline_cond:
+            self._in_pipeline += 1
+        pending.add_done_callback(lambda result: self._finish_pipelined(job, result))
+
+    def _finish_pipelined(self, job, result):
+        self._finish(job, result)
+        with self._pipeline_cond:
+            self._in_pipeline -= 1
+            self._pipeline_cond.notify_all()
+
+    def _wait_pipeline_idle(self):
+        with self._pipeline_cond:
+            self._pipeline_cond.wait_for(lambda: self._in_pipeline == 0)
+
+    def _trim_history(self):
+        """Descarta los trabajos terminados más antiguos por encima de max_history."""
+        if len(self._jobs) <= self.max_history:
+            return
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_history:
+                break
+            if self._jobs[job_id].is_finished():
+                del self._jobs[job_id]
+
+
+# Instancia global
+motion_queue = MotionQueue(arduino_controller)
@@ -0,0 +1,111 @@
+"""
+Estimación del tiempo de ciclo y validación previa de una RobotSequence.
+
+Sobre los pasos tal como están guardados se calcula qué enviaría
+send_position y cuánto tardaría el firmware en ejecutarlo (motion_model):
+servo de la pinza, movimiento de J1/J2/Z y el delay de cada paso, para
+todos los pasos a la vez. Se marcan los pasos que send_position recortaría
+a los límites (el robot no llegaría a la posición guardada) y los que traen
+valores fuera de rango (pinza distinta de 0/1, delay negativo).
+
+Es el tiempo punto a punto del firmware: no incluye el envío por el cable
+ni la espera del DONE, y con blending (SCARA_SEQUENCE_BLENDING) los tramos
+sin delay pueden tardar menos.
+"""
+import numpy as np
+
+from . import motion_model
+from .arduino_communication import (
+    ARM1_LIMITS, ARM2_LIMITS, BASE_LIMITS, SPEED_LIMITS, gripper_to_bool,
+)
+from .sequence_cache import DEFAULT_SPEED, compile_steps
+
+# Campos que send_position recorta, con sus límites
+LIMITS = {'arm1': ARM1_LIMITS, 'arm2': ARM2_LIMITS, 'base': BASE_LIMITS, 'speed': SPEED_LIMITS}
+AXES = ('j1', 'j2', 'z')
+# Posición tras el arranque del firmware: pasos en cero y pinza abierta
+HOME = {'arm1': 0.0, 'arm2': 0.0, 'base': 0.0, 'gripper': 0}
+# Pasos más lentos que se destacan en el reporte
+SLOWEST = 3
+
+
+def estimate(steps, start=None, speed=DEFAULT_SPEED):
+    """
+    `steps`: dicts (order, arm1, arm2, base, gripper, delay[, speed]) como
+    los de sequence_runner.load_steps. `start`: posición de la que parte el
+    primer paso (last_position del robot); por defecto HOME.
+    Retorna los totales, los pasos marcados y el detalle de cada paso.
+    """
+    start = start or HOME
+    compiled = compile_steps(steps, speed)
+    orders = compiled['order'].tolist()
+
+    # Recortes de send_position y valores fuera de rango, por campo
+    raw = {field: np.array([s.get(field, speed) if field == 'speed' else s[field] for s in steps], dtype=float)
+           for field in LIMITS}
+    clamped = {field: (raw[field] < low) | (raw[field] > high) for field, (low, high) in LIMITS.items()}
+    out_of_range = {
+        'gripper': ~np.isin([s['gripper'] for s in steps], (0, 1)),
+        'delay': np.array([s['delay'] for s in steps], dtype=float) < 0,
+    }
+
+    # Tiempos del firmware: servo, movimiento (manda el eje más lento) y delay
+    targets = motion_model.joint_steps_array(compiled['arm1'], compiled['arm2'], compiled['base'])
+    axis_times, servo = motion_model.command_times(
+        targets, compiled['speed'], compiled['gripper'],
+        motion_model.joint_steps(start['arm1'], start['arm2'], start['base']),
+        1 if gripper_to_bool(start['gripper']) else 0,
+    )
+    move = axis_times.max(axis=1)
+    delay = compiled['delay']
+    total = servo + move + delay
+    ends_at = np.cumsum(total)
+    limiting = np.array(AXES)[axis_times.argmax(axis=1)].tolist()
+
+    # Columnas a tipos de Python una sola vez; los marcados solo para los pasos que los tienen
+    servo_l, move_l, total_l, ends_l = (np.round(a, 3).tolist() for a in (servo, move, total, ends_at))
+    step_clamped = [{} for _ in orders]
+    for field in LIMITS:
+        for i in np.flatnonzero(clamped[field]):
+            step_clamped[i][field] = float(raw[field][i])
+    step_out_of_range = [[] for _ in orders]
+    for field, mask in out_of_range.items():
+        for i in np.flatnonzero(mask):
+            step_out_of_range[i].append(field)
+
+    details = [
+        {
+            'order': order,
+            'arm1': arm1,
+            'arm2': arm2,
+            'base': base,
+            'gripper': gripper,
+            'speed': step_speed,
+            'delay': step_delay,
+            'servo_time': servo_l[i],
+            'move_time': move_l[i],
+            'limiting_axis': limiting[i] if move_l[i] > 0 else None,
+            'total_time': total_l[i],
+            'ends_at': ends_l[i],
+            'clamped': step_clamped[i],
+            'out_of_range': step_out_of_range[i],
+        }
+        for i, (order, arm1, arm2, base, gripper, step_speed, step_delay) in enumerate(compiled.tolist())
+    ]
+
+    any_clamped = np.logical_or.reduce(list(clamped.values()))
+    any_out_of_range = np.logical_or.reduce(list(out_of_range.values()))
+    slowest = np.argsort(-total, kind='stable')[:SLOWEST]
+    return {
+        'steps': len(details),
+        'cycle_time': round(float(total.sum()), 3),
+        'move_time': round(float(move.sum()), 3),
+        'servo_time': round(float(servo.sum()), 3),
+        'delay_time': round(float(delay.sum()), 3),
+        'start': {field: start[field] for field in HOME},
+        'valid': not (any_clamped.any() or any_out_of_range.any()),
+        'clamped_steps': [orders[i] for i in np.flatnonzero(any_clamped)],
+        'out_of_range_steps': [orders[i] for i in np.flatnonzero(any_out_of_range)],
+        'slowest_steps': [orders[i] for i in slowest if total[i] > 0],
+        'details': details,
+    }
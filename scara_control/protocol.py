@@ -0,0 +1,199 @@
+"""
+Protocolo binario compacto para el enlace serial con el Arduino.
+
+Comando (host → Arduino), 13 bytes little-endian:
+    0xA5 | seq u8 | arm1 i16 | arm2 i16 | base i16 | grip u8 | speed u16 | crc16
+    arm1/arm2 en centésimas de grado, base en centésimas de cm.
+
+Respuesta (Arduino → host), 5 bytes:
+    0x5A | seq u8 | status u8 | crc16
+    status: 0=DONE, 1=ERROR, 2=CRC inválido, 3=QUEUED, 4=FULL
+
+El modo se negocia al conectar: el host manda PROTO_REQUEST y solo si el
+firmware contesta PROTO_ACCEPT se usa binario; si no, sigue el CSV
+"arm1,arm2,base,grip,speed\\n" de siempre.
+
+Pipeline (opcional, sobre el binario): el host manda "PROTO PIPE <n> <seq>"
+(ventana pedida y seq del próximo frame) y un firmware con buffer circular
+contesta "PROTO PIPE OK <capacidad>". A partir
+de ahí cada comando se confirma dos veces: QUEUED al entrar al buffer y DONE
+al terminar el movimiento. El firmware solo acepta el seq siguiente al
+último aceptado (los demás se descartan y el host los retransmite en orden)
+y responde de nuevo a un seq repetido sin volver a ejecutarlo. FULL indica
+que el buffer estaba lleno y el comando no se guardó.
+"""
+import struct
+
+COMMAND_START = 0xA5
+REPLY_START = 0x5A
+
+STATUS_DONE = 0
+STATUS_ERROR = 1
+STATUS_BAD_CRC = 2
+STATUS_QUEUED = 3
+STATUS_FULL = 4
+
+PROTO_REQUEST = b"PROTO BIN\n"
+PROTO_ACCEPT = "PROTO BIN OK"
+PIPE_REQUEST = "PROTO PIPE"
+PIPE_ACCEPT = "PROTO PIPE OK"
+
+_COMMAND_BODY = struct.Struct('<BBhhhBH')
+_REPLY_BODY = struct.Struct('<BBB')
+_CRC = struct.Struct('<H')
+
+COMMAND_SIZE = _COMMAND_BODY.size + _CRC.size
+REPLY_SIZE = _REPLY_BODY.size + _CRC.size
+
+
+def _make_crc_table():
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return table
+
+
+_CRC_TABLE = _make_crc_table()
+
+
+def pipe_request(window, next_seq):
+    return f"{PIPE_REQUEST} {int(window)} {next_seq & 0xFF}\n".encode()
+
+
+def parse_pipe_request(line):
+    """Seq del próximo frame en "PROTO PIPE <n> <seq>", o None si no lo trae."""
+    fields = line[len(PIPE_REQUEST):].split()
+    try:
+        return int(fields[1]) & 0xFF
+    except (IndexError, ValueError):
+        return None
+
+
+def parse_pipe_accept(line):
+    """Capacidad del buffer anunciada en "PROTO PIPE OK <n>", o None."""
+    if not line.startswith(PIPE_ACCEPT):
+        return None
+    try:
+        return max(1, int(line[len(PIPE_ACCEPT):].strip()))
+    except ValueError:
+        return None
+
+
+def seq_distance(newer, older):
+    """Distancia hacia adelante entre dos seq de 8 bits (con vuelta)."""
+    return (newer - older) & 0xFF
+
+
+def crc16(data):
+    """CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF)."""
+    crc = 0xFFFF
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC_TABLE[((crc >> 8) ^ byte) & 0xFF]
+    return crc
+
+
+def encode_command(seq, arm1_angle, arm2_angle, base_height, gripper_code, speed):
+    """Arma un frame de comando; los valores ya deben venir limitados."""
+    body = _COMMAND_BODY.pack(
+        COMMAND_START,
+        seq & 0xFF,
+        int(round(arm1_angle * 100)),
+        int(round(arm2_angle * 100)),
+        int(round(base_height * 100)),
+        int(gripper_code),
+        int(speed),
+    )
+    return body + _CRC.pack(crc16(body[1:]))
+
+
+def decode_command(frame):
+    """
+    Decodifica un frame de comando. Retorna (seq, arm1, arm2, base, grip, speed)
+    o None si el CRC no coincide.
+    """
+    body, (crc,) = frame[:_COMMAND_BODY.size], _CRC.unpack(frame[_COMMAND_BODY.size:COMMAND_SIZE])
+    if crc16(body[1:]) != crc:
+        return None
+    _, seq, arm1, arm2, base, grip, speed = _COMMAND_BODY.unpack(body)
+    return seq, arm1 / 100.0, arm2 / 100.0, base / 100.0, grip, speed
+
+
+def encode_reply(seq, status):
+    body = _REPLY_BODY.pack(REPLY_START, seq & 0xFF, status)
+    return body + _CRC.pack(crc16(body[1:]))
+
+
+def _decode_reply(frame):
+    body, (crc,) = frame[:_REPLY_BODY.size], _CRC.unpack(frame[_REPLY_BODY.size:REPLY_SIZE])
+    if crc16(body[1:]) != crc:
+        return None
+    _, seq, status = _REPLY_BODY.unpack(body)
+    return seq, status
+
+
+class StreamDecoder:
+    """
+    Separa el flujo de bytes en líneas de texto y frames binarios.
+    Con `binary=False` solo arma líneas (modo CSV). Si un frame no pasa el
+    CRC se descarta solo su byte de inicio y los bytes que le seguían hasta
+    completar el tamaño del frame, salvo que entre ellos aparezca otro byte
+    de inicio: el seq o el CRC pueden valer 0x0A, así que buscar el fin de
+    línea se tragaría los frames válidos que vienen detrás.
+    """
+
+    def __init__(self, frame_start, frame_size, frame_decoder, binary=False):
+        self.frame_start = frame_start
+        self.frame_size = frame_size
+        self.frame_decoder = frame_decoder
+        self.binary = binary
+        self._buffer = bytearray()
+        self._garbage = 0           # Bytes que quedan del último frame corrupto
+
+    def feed(self, data):
+        """Agrega bytes y retorna la lista de ('line', str) / ('frame', tupla) completos."""
+        self._buffer.extend(data)
+        events = []
+        buf = self._buffer
+        while buf:
+            if self.binary and buf[0] == self.frame_start:
+                if len(buf) < self.frame_size:
+                    break
+                decoded = self.frame_decoder(bytes(buf[:self.frame_size]))
+                if decoded is not None:
+                    del buf[:self.frame_size]
+                    self._garbage = 0
+                    events.append(('frame', decoded))
+                else:
+                    del buf[:1]
+                    self._garbage = self.frame_size - 1
+                continue
+            if self._garbage:
+                # Resto del frame corrupto: se salta hasta el próximo inicio
+                skip = min(self._garbage, len(buf))
+                start = buf.find(self.frame_start, 0, skip)
+                if start != -1:
+                    skip = start
+                del buf[:skip]
+                self._garbage = 0 if start != -1 else self._garbage - skip
+                continue
+            newline = buf.find(b'\n')
+            if newline == -1:
+                break
+            line = bytes(buf[:newline]).decode('utf-8', errors='replace').strip()
+            del buf[:newline + 1]
+            if line:
+                events.append(('line', line))
+        return events
+
+
+def reply_decoder(binary=False):
+    """Decodificador del lado host (respuestas del Arduino)."""
+    return StreamDecoder(REPLY_START, REPLY_SIZE, _decode_reply, binary)
+
+
+def command_decoder(binary=False):
+    """Decodificador del lado Arduino/simulador (comandos del host)."""
+    return StreamDecoder(COMMAND_START, COMMAND_SIZE, decode_command, binary)
@@ -1,6 +1,7 @@
 # scara_control/ps4_controller.py - 
 from pyPS4Controller.controller import Controller
-from .arduino_communication import arduino_controller
+from .jog import jog_controller, stick_jog
+from .motion_queue import motion_queue
 import threading
 import time
 
@@ -16,68 +17,55 @@ class SCARAPS4Controller(Controller):
     def on_x_press(self):
         """Botón X: Incrementar arm1"""
         try:
-            pos = arduino_controller.get_last_position()
-            new_arm1 = pos['arm1'] + self.increment
-            arduino_controller.send_position(new_arm1, pos['arm2'], pos['base'], pos['gripper'], self.current_speed)
-            print(f"[PS4] X pressed: arm1 = {new_arm1}")
+            target = jog_controller.jog(d_arm1=+self.increment, speed=self.current_speed)
+            print(f"[PS4] X pressed: arm1 = {target['arm1']}")
         except Exception as e:
             print(f"[PS4] Error en X press: {e}")
 
     def on_triangle_press(self):
         """Botón Triángulo: Decrementar arm1"""
         try:
-            pos = arduino_controller.get_last_position()
-            new_arm1 = pos['arm1'] - self.increment
-            arduino_controller.send_position(new_arm1, pos['arm2'], pos['base'], pos['gripper'], self.current_speed)
-            print(f"[PS4] Triangle pressed: arm1 = {new_arm1}")
+            target = jog_controller.jog(d_arm1=-self.increment, speed=self.current_speed)
+            print(f"[PS4] Triangle pressed: arm1 = {target['arm1']}")
         except Exception as e:
             print(f"[PS4] Error en Triangle press: {e}")
 
     def on_square_press(self):
         """Botón Cuadrado: Incrementar arm2"""
         try:
-            pos = arduino_controller.get_last_position()
-            new_arm2 = pos['arm2'] + self.increment
-            arduino_controller.send_position(pos['arm1'], new_arm2, pos['base'], pos['gripper'], self.current_speed)
-            print(f"[PS4] Square pressed: arm2 = {new_arm2}")
+            target = jog_controller.jog(d_arm2=+self.increment, speed=self.current_speed)
+            print(f"[PS4] Square pressed: arm2 = {target['arm2']}")
         except Exception as e:
             print(f"[PS4] Error en Square press: {e}")
 
     def on_circle_press(self):
         """Botón Círculo: Decrementar arm2"""
         try:
-            pos = arduino_controller.get_last_position()
-            new_arm2 = pos['arm2'] - self.increment
-            arduino_controller.send_position(pos['arm1'], new_arm2, pos['base'], pos['gripper'], self.current_speed)
-            print(f"[PS4] Circle pressed: arm2 = {new_arm2}")
+            target = jog_controller.jog(d_arm2=-self.increment, speed=self.current_speed)
+            print(f"[PS4] Circle pressed: arm2 = {target['arm2']}")
         except Exception as e:
             print(f"[PS4] Error en Circle press: {e}")
 
     def on_up_arrow_press(self):
         """Flecha Arriba: Incrementar base (subir)"""
         try:
-            pos = arduino_controller.get_last_position()
-            new_base = pos['base'] + self.increment
-            arduino_controller.send_position(pos['arm1'], pos['arm2'], new_base, pos['gripper'], self.current_speed)
-            print(f"[PS4] Up arrow pressed: base = {new_base}")
+            target = jog_controller.jog(d_base=+self.increment, speed=self.current_speed)
+            print(f"[PS4] Up arrow pressed: base = {target['base']}")
         except Exception as e:
             print(f"[PS4] Error en Up arrow press: {e}")
 
     def on_down_arrow_press(self):
         """Flecha Abajo: Decrementar base (bajar)"""
         try:
-            pos = arduino_controller.get_last_position()
-            new_base = pos['base'] - self.increment
-            arduino_controller.send_position(pos['arm1'], pos['arm2'], new_base, pos['gripper'], self.current_speed)
-            print(f"[PS4] Down arrow pressed: base = {new_base}")
+            target = jog_controller.jog(d_base=-self.increment, speed=self.current_speed)
+            print(f"[PS4] Down arrow pressed: base = {target['base']}")
         except Exception as e:
             print(f"[PS4] Error en Down arrow press: {e}")
 
     def on_R1_press(self):
         """R1: Cerrar pinza"""
         try:
-            pos = arduino_controller.get_last_position()
-            arduino_controller.send_position(pos['arm1'], pos['arm2'], pos['base'], 100, self.current_speed)
+            jog_controller.set_target(gripper=100, speed=self.current_speed)
             print("[PS4] R1 pressed: gripper closed")
         except Exception as e:
             print(f"[PS4] Error en R1 press: {e}")
@@ -85,8 +73,7 @@ class SCARAPS4Controller(Controller):
     def on_L1_press(self):
         """L1: Abrir pinza"""
         try:
-            pos = arduino_controller.get_last_position()
-            arduino_controller.send_position(pos['arm1'], pos['arm2'], pos['base'], 0, self.current_speed)
+            jog_controller.set_target(gripper=0, speed=self.current_speed)
             print("[PS4] L1 pressed: gripper opened")
         except Exception as e:
             print(f"[PS4] Error en L1 press: {e}")
@@ -106,11 +93,49 @@ class SCARAPS4Controller(Controller):
     def on_options_press(self):
         """Botón Options: Posición home"""
         try:
-            arduino_controller.home_position()
+            # El jog pendiente se descarta para no moverse después de home
+            jog_controller.cancel()
+            motion_queue.submit_home()
             print("[PS4] Options pressed: going home")
         except Exception as e:
             print(f"[PS4] Error en Options press: {e}")
 
+    # Sticks analógicos: jog en velocidad (L3 horizontal = arm1, L3 vertical = base,
+    # R3 horizontal = arm2). Los valores van de -32767 a 32767; arriba es negativo.
+    def on_L3_left(self, value):
+        stick_jog.set_axis('arm1', value)
+
+    def on_L3_right(self, value):
+        stick_jog.set_axis('arm1', value)
+
+    def on_L3_x_at_rest(self):
+        stick_jog.release('arm1')
+
+    def on_L3_up(self, value):
+        stick_jog.set_axis('base', -value)
+
+    def on_L3_down(self, value):
+        stick_jog.set_axis('base', -value)
+
+    def on_L3_y_at_rest(self):
+        stick_jog.release('base')
+
+    def on_R3_left(self, value):
+        stick_jog.set_axis('arm2', value)
+
+    def on_R3_right(self, value):
+        stick_jog.set_axis('arm2', value)
+
+    def on_R3_x_at_rest(self):
+        stick_jog.release('arm2')
+
+    def on_playstation_button_press(self):
+        """Botón PS: Activar/desactivar el jog con sticks"""
+        stick_jog.enabled = not stick_jog.enabled
+        for axis in stick_jog.AXES:
+            stick_jog.release(axis)
+        print(f"[PS4] PS pressed: jog con sticks {'activado' if stick_jog.enabled else 'desactivado'}")
+
     def on_share_press(self):
         """Botón Share: Cambiar incremento"""
         if self.increment == 5:
@@ -0,0 +1,130 @@
+"""
+Reproducción de sesiones seriales grabadas en el motion log.
+
+Se extraen del log los comandos enviados (frames binarios o líneas CSV) con
+su instante relativo y la latencia hasta su DONE/ERROR, y se vuelven a
+mandar por un ArduinoController (normalmente contra simulator.VirtualArduino)
+respetando el calendario original a `speed`× o, con speed=None, tan rápido
+como se pueda.
+
+Un comando que en la grabación recibió su respuesta antes de que saliera el
+siguiente se reproduce con send_position (stop-and-wait); si el siguiente
+salió antes (streaming o pipeline), con stream_position. El reporte compara
+el calendario y las latencias con los grabados (escalados por speed).
+"""
+import time
+from collections import namedtuple
+
+from . import motion_log, protocol
+from .benchmarks import percentile, summarize
+
+ReplayCommand = namedtuple(
+    'ReplayCommand', 'offset arm1 arm2 base gripper speed recorded_latency blocking'
+)
+
+
+def _command_values(record):
+    """(arm1, arm2, base, grip, speed) de un registro TX, o None si no es un comando."""
+    data = motion_log.payload(record)
+    if record['kind'] == motion_log.KIND_FRAME:
+        decoded = protocol.decode_command(data) if len(data) == protocol.COMMAND_SIZE else None
+        return decoded[1:] if decoded else None
+    fields = data.decode('utf-8', errors='replace').split(',')
+    if len(fields) != 5:
+        return None
+    try:
+        arm1, arm2, base, grip, speed = (float(f) for f in fields)
+    except ValueError:
+        return None
+    return arm1, arm2, base, int(grip), int(speed)
+
+
+def load_session(records):
+    """Lista de ReplayCommand a partir de los registros de un motion log."""
+    latencies = {int(record['index']): seconds for record, seconds in motion_log.round_trips(records)}
+    sent = []
+    for record in records:
+        if record['direction'] != motion_log.TX:
+            continue
+        values = _command_values(record)
+        if values is not None:
+            sent.append((record, values))
+    if not sent:
+        return []
+
+    start = int(sent[0][0]['t_ns'])
+    commands = []
+    for i, (record, (arm1, arm2, base, grip, speed)) in enumerate(sent):
+        latency = latencies.get(int(record['index']))
+        t = int(record['t_ns'])
+        blocking = True
+        if i + 1 < len(sent):
+            # Si el siguiente salió antes de esta respuesta, se mandó sin esperar DONE
+            blocking = latency is not None and t + latency * 1e9 <= int(sent[i + 1][0]['t_ns'])
+        commands.append(ReplayCommand(
+            (t - start) / 1e9, arm1, arm2, base, int(grip), int(speed), latency, blocking,
+        ))
+    return commands
+
+
+class SessionReplay:
+    """Reproduce una lista de ReplayCommand sobre `controller`."""
+
+    def __init__(self, commands, controller, speed=1.0):
+        self.commands = commands
+        self.controller = controller
+        self.speed = speed          # None = lo más rápido posible
+        self.results = []
+
+    def run(self):
+        self.results = []
+        start = time.perf_counter()
+        for command in self.commands:
+            if self.speed:
+                delay = start + command.offset / self.speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            sent_at = time.perf_counter() - start
+            args = (command.arm1, command.arm2, command.base, command.gripper, command.speed)
+            if command.blocking:
+                ok = self.controller.send_position(*args)
+                latency = time.perf_counter() - start - sent_at
+            else:
+                ok = self.controller.stream_position(*args)
+                latency = None
+            self.results.append((command, sent_at, latency, ok))
+        drained = self.controller.wait_for_stream(0)
+        elapsed = time.perf_counter() - start
+        return self.report(elapsed, drained)
+
+    def report(self, elapsed, drained=True):
+        commands = self.commands
+        recorded = 0.0
+        if commands:
+            recorded = commands[-1].offset + (commands[-1].recorded_latency or 0.0)
+        lags = []
+        ratios = []
+        for command, sent_at, latency, _ in self.results:
+            if self.speed:
+                lags.append(max(0.0, sent_at - command.offset / self.speed))
+                if latency is not None and command.recorded_latency:
+                    ratios.append(latency / (command.recorded_latency / self.speed))
+        failures = sum(1 for *_, ok in self.results if not ok)
+        return {
+            'commands': len(self.results),
+            'failures': failures,
+            'drained': drained,
+            'speed': self.speed,
+            'recorded_s': recorded,
+            'expected_s': recorded / self.speed if self.speed else None,
+            'elapsed_s': elapsed,
+            'commands_per_s': len(self.results) / elapsed if elapsed else None,
+            # Retraso de cada envío respecto del calendario grabado
+            'schedule_lag': summarize(lags) if lags else None,
+            # Latencia reproducida / grabada (escalada): 1.0 = mismo comportamiento
+            'latency_ratio': {
+                'p50': percentile(ratios, 50),
+                'p95': percentile(ratios, 95),
+                'max': max(ratios),
+            } if ratios else None,
+        }
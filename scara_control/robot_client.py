@@ -0,0 +1,393 @@
+"""
+Cliente del daemon de robots (robot_daemon) para los workers web.
+
+Con SCARA_DAEMON_SOCKET, robots.registry es un RemoteRegistry: sus robots
+tienen la interfaz que usan las vistas y la telemetría (controller, queue,
+runner, status, to_dict...), pero cada operación es una petición al daemon
+por el socket Unix. Cada hilo usa su propia conexión, así una vista que
+espera un DONE ('wait': true) no bloquea a las demás. Si el daemon no
+responde, el robot figura desconectado.
+"""
+import asyncio
+import itertools
+import socket
+import threading
+import time
+
+from . import ipc, metrics
+from .robots import RobotNotFound, default_robot_id, robot_config, robot_ids
+
+
+class DaemonClient:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._ids = itertools.count(1)
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+        except OSError as e:
+            sock.close()
+            raise ipc.IPCError(f"Daemon no disponible en {self.path}: {e}") from e
+        return sock
+
+    def _socket(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is None:
+            sock = self._local.sock = self._connect()
+        return sock
+
+    def _drop(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def call(self, op, robot_id=None, *args):
+        """Ejecuta `op` en el daemon y retorna su resultado."""
+        request = {'id': next(self._ids), 'op': op, 'robot': robot_id, 'args': list(args)}
+        sock = self._socket()
+        try:
+            ipc.send_message(sock, request)
+        except ipc.IPCError:
+            # Conexión de un daemon anterior (reiniciado): no llegó nada, se reintenta una vez
+            self._drop()
+            sock = self._socket()
+            ipc.send_message(sock, request)
+        try:
+            response = ipc.recv_message(sock)
+        except ipc.IPCError:
+            self._drop()
+            raise
+        if response.get('id') != request['id']:
+            self._drop()
+            raise ipc.IPCError("Respuesta fuera de orden")
+        return self._result(response, robot_id)
+
+    async def acall(self, op, robot_id=None, *args):
+        """call() para las vistas async: una conexión por llamada, sin bloquear el event loop."""
+        request = {'id': next(self._ids), 'op': op, 'robot': robot_id, 'args': list(args)}
+        try:
+            reader, writer = await asyncio.open_unix_connection(self.path)
+        except OSError as e:
+            raise ipc.IPCError(f"Daemon no disponible en {self.path}: {e}") from e
+        try:
+            writer.write(ipc.pack(request))
+            await writer.drain()
+            response = await ipc.arecv_message(reader)
+        except OSError as e:
+            raise ipc.IPCError(str(e)) from e
+        finally:
+            writer.close()
+        return self._result(response, robot_id)
+
+    @staticmethod
+    def _result(response, robot_id):
+        if not response.get('ok'):
+            if response.get('kind') == 'RobotNotFound':
+                raise RobotNotFound(robot_id)
+            raise ipc.RemoteError(response.get('error', ''), response.get('kind', ''))
+        return response.get('result')
+
+    def subscribe(self, robot_id, callback):
+        """Llama `callback(status)` con cada evento del robot, en un hilo que se reconecta solo."""
+        threading.Thread(
+            target=self._subscription_loop, args=(robot_id, callback),
+            name=f"daemon-subscription-{robot_id}", daemon=True,
+        ).start()
+
+    def _subscription_loop(self, robot_id, callback):
+        delay = 0.5
+        while True:
+            sock = None
+            try:
+                sock = self._connect()
+                ipc.send_message(sock, {'id': 0, 'op': 'subscribe', 'robot': robot_id, 'args': []})
+                while True:
+                    message = ipc.recv_message(sock)
+                    if message.get('event') == 'status':
+                        delay = 0.5
+                        callback(message['status'])
+                    elif not message.get('ok', True):
+                        print(f"[RobotClient] Suscripción a {robot_id} rechazada: {message.get('error')}")
+                        return
+            except ipc.IPCError as e:
+                print(f"[RobotClient] Suscripción a {robot_id} cortada ({e}), reintentando en {delay:.1f} s")
+            finally:
+                if sock is not None:
+                    sock.close()
+            time.sleep(delay)
+            delay = min(delay * 2, 10.0)
+
+
+class RemoteJob:
+    """Copia local de un MotionJob del daemon."""
+
+    def __init__(self, client, data):
+        self._client = client
+        self._update(data)
+
+    def _update(self, data):
+        self._data = data
+        self.id = data['job_id']
+        self.state = data['state']
+        self.result = data['result']
+        self.error = data['error']
+
+    def is_finished(self):
+        return self.state in ('done', 'failed', 'cancelled')
+
+    def wait(self, timeout=None):
+        data = self._client.call('job_wait', None, self.id, timeout)
+        if data is not None:
+            self._update(data)
+        return self.is_finished()
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class RemoteRun:
+    """Copia local de un SequenceRun del daemon."""
+
+    def __init__(self, data):
+        self._data = data
+        self.id = data['run_id']
+        self.state = data['state']
+
+    def is_active(self):
+        return self.state in ('running', 'paused')
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class RemoteController:
+    def __init__(self, client, robot_id):
+        self._client = client
+        self.robot_id = robot_id
+
+    def is_connected_status(self):
+        try:
+            return self._client.call('is_connected', self.robot_id)
+        except ipc.IPCError:
+            return False
+
+    def connect(self):
+        try:
+            self._client.call('connect', self.robot_id)
+        except ipc.IPCError as e:
+            print(f"[RobotClient] No se pudo conectar {self.robot_id}: {e}")
+
+    def is_robot_busy(self):
+        return self._client.call('is_busy', self.robot_id)
+
+    def get_last_position(self):
+        return self._client.call('last_position', self.robot_id)
+
+
+class RemoteQueue:
+    def __init__(self, client, robot_id):
+        self._client = client
+        self.robot_id = robot_id
+
+    def _job(self, data):
+        return RemoteJob(self._client, data) if data is not None else None
+
+    def submit_position(self, arm1_angle, arm2_angle, base_height, gripper_state, speed=500):
+        return self._job(self._client.call(
+            'submit_position', self.robot_id, arm1_angle, arm2_angle, base_height, gripper_state, speed,
+        ))
+
+    def submit_home(self):
+        return self._job(self._client.call('submit_home', self.robot_id))
+
+    def pending_count(self):
+        return self._client.call('pending_count', self.robot_id)
+
+    def recent_jobs(self, limit=50):
+        return self._client.call('recent_jobs', self.robot_id, limit)
+
+
+class RemoteRunner:
+    def __init__(self, client, robot_id):
+        self._client = client
+        self.robot_id = robot_id
+
+    @staticmethod
+    def _run(data):
+        return RemoteRun(data) if data is not None else None
+
+    def start(self, sequence):
+        """
+        Arranca una secuencia (CompiledSequence, RobotSequence o id). Viaja
+        solo el id: el daemon la compila desde la base, así siempre ejecuta
+        la versión vigente aunque la caché de este worker esté atrasada.
+        """
+        return self._run(self._client.call('start_sequence', self.robot_id, getattr(sequence, 'id', sequence)))
+
+    def active_run(self):
+        return self._run(self._client.call('active_run', self.robot_id))
+
+    def get_run(self, run_id):
+        found = self._client.call('find_run', None, run_id)
+        return self._run(found['run']) if found else None
+
+    def pause(self, run_id):
+        return self._client.call('run_action', None, run_id, 'pause')
+
+    def resume(self, run_id):
+        return self._client.call('run_action', None, run_id, 'resume')
+
+    def cancel(self, run_id):
+        return self._client.call('run_action', None, run_id, 'cancel')
+
+
+class RemoteRobot:
+    """Robot del daemon con la interfaz de robots.Robot."""
+
+    def __init__(self, client, robot_id, config):
+        self._client = client
+        self.id = robot_id
+        self.config = config
+        self.controller = RemoteController(client, robot_id)
+        self.queue = RemoteQueue(client, robot_id)
+        self.runner = RemoteRunner(client, robot_id)
+        self._listeners = []
+        self._subscribed = False
+        self._lock = threading.Lock()
+
+    def status(self):
+        try:
+            return self._client.call('status', self.id)
+        except ipc.IPCError:
+            return {'robot': self.id, 'connected': False, 'busy': False, 'queue_depth': 0, 'last_position': None}
+
+    def last_position(self):
+        return self.status()['last_position']
+
+    def add_status_listener(self, callback):
+        """`callback()` con cada cambio que publica el daemon (una suscripción por robot)."""
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+            if not self._subscribed:
+                self._client.subscribe(self.id, self._on_status)
+                self._subscribed = True
+
+    def remove_status_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _on_status(self, status):
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception as e:
+                print(f"[RobotClient] Error en listener de estado: {e}")
+
+    async def astatus(self):
+        try:
+            return await self._client.acall('status', self.id)
+        except ipc.IPCError:
+            return {'robot': self.id, 'connected': False, 'busy': False, 'queue_depth': 0, 'last_position': None}
+
+    async def aensure_connected(self):
+        try:
+            return await self._client.acall('is_connected', self.id) or await self._client.acall('connect', self.id)
+        except ipc.IPCError as e:
+            print(f"[RobotClient] No se pudo conectar {self.id}: {e}")
+            return False
+
+    async def asubmit_position(self, arm1_angle, arm2_angle, base_height, gripper_state, speed=500):
+        return RemoteJob(self._client, await self._client.acall(
+            'submit_position', self.id, arm1_angle, arm2_angle, base_height, gripper_state, speed,
+        ))
+
+    async def asubmit_home(self):
+        return RemoteJob(self._client, await self._client.acall('submit_home', self.id))
+
+    async def apending_count(self):
+        return await self._client.acall('pending_count', self.id)
+
+    async def astart(self, sequence):
+        data = await self._client.acall('start_sequence', self.id, getattr(sequence, 'id', sequence))
+        return RemoteRun(data) if data is not None else None
+
+    async def aactive_run(self):
+        data = await self._client.acall('active_run', self.id)
+        return RemoteRun(data) if data is not None else None
+
+    async def ajob_wait(self, job, timeout=None):
+        try:
+            data = await self._client.acall('job_wait', None, job.id, timeout)
+        except ipc.IPCError as e:
+            print(f"[RobotClient] Espera del trabajo {job.id} cortada: {e}")
+            return job.is_finished()
+        if data is not None:
+            job._update(data)
+        return job.is_finished()
+
+    def submit_trajectory(self, plan, rate, description=''):
+        data = self._client.call(
+            'submit_trajectory', self.id, plan.times, plan.positions, plan.velocities,
+            plan.gripper, rate, description,
+        )
+        return RemoteJob(self._client, data)
+
+    def to_dict(self):
+        try:
+            return self._client.call('robot', self.id)
+        except ipc.IPCError:
+            return {'id': self.id, **self.config, 'connected': False, 'queue_depth': 0, 'active_run': None}
+
+
+class RemoteRegistry:
+    """
+    Mismo uso que robots.RobotRegistry. Los ids se validan con la
+    configuración local (mismos settings que el daemon), sin ir al socket.
+    """
+
+    def __init__(self, path):
+        self.client = DaemonClient(path)
+        self._robots = {}
+        self._lock = threading.Lock()
+
+    def get(self, robot_id=None):
+        robot_id = robot_id or default_robot_id()
+        with self._lock:
+            robot = self._robots.get(robot_id)
+            if robot is None:
+                robot = self._robots[robot_id] = RemoteRobot(self.client, robot_id, robot_config(robot_id))
+        return robot
+
+    def all(self):
+        return [self.get(robot_id) for robot_id in robot_ids()]
+
+    def ids(self):
+        return [robot.id for robot in self.all()]
+
+    def render_metrics(self):
+        """Métricas HTTP de este worker más las del controlador y la cola, que están en el daemon."""
+        text = metrics.registry.render(only=metrics.API_METRICS)
+        try:
+            return text + self.client.call('metrics')
+        except ipc.IPCError as e:
+            print(f"[RobotClient] Métricas del daemon no disponibles: {e}")
+            return text
+
+    def find_job(self, job_id):
+        found = self.client.call('find_job', None, job_id)
+        if not found:
+            return None, None
+        robot = self.get(found['robot'])
+        return robot, RemoteJob(self.client, found['job'])
+
+    def find_run(self, run_id):
+        found = self.client.call('find_run', None, run_id)
+        if not found:
+            return None, None
+        return self.get(found['robot']), RemoteRun(found['run'])
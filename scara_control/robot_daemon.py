@@ -0,0 +1,224 @@
+"""
+Daemon dueño del hardware: un solo proceso abre los puertos serie de todos
+los robots del registro y los workers web (gunicorn/uvicorn con varios
+workers) le hablan por un socket Unix (ver ipc.py y robot_client.py).
+
+Cada conexión se atiende en su propio hilo y sus peticiones en orden, así
+que un 'job_wait' largo solo ocupa la conexión de quien espera. Una
+conexión que pide 'subscribe' recibe desde entonces un evento 'status' por
+cada cambio del robot; los cambios que llegan mientras se envía uno se
+agrupan en el siguiente, así un cliente lento no frena al hilo lector del
+puerto serie.
+"""
+import os
+import socket
+import socketserver
+import threading
+
+import numpy as np
+
+from . import ipc, metrics
+from .sequence_cache import sequence_cache
+from .trajectory import Trajectory
+
+RUN_ACTIONS = ('pause', 'resume', 'cancel')
+# Operaciones que no van dirigidas a un robot (los ids de trabajos y ejecuciones son únicos)
+GLOBAL_OPS = ('ping', 'robots', 'metrics', 'find_job', 'job_wait', 'find_run', 'run_action')
+
+
+def _job(job):
+    return job.to_dict() if job is not None else None
+
+
+def _run(run):
+    return run.to_dict() if run is not None else None
+
+
+class _Subscription:
+    """Envía el estado de un robot a un suscriptor en su propio hilo."""
+
+    def __init__(self, robot, send):
+        self.robot = robot
+        self._send = send
+        self._changed = threading.Event()
+        self._closed = threading.Event()
+        self._changed.set()                 # Estado inicial al suscribirse
+        robot.add_status_listener(self.notify)
+        threading.Thread(target=self._run, name=f"daemon-subscription-{robot.id}", daemon=True).start()
+
+    def notify(self):
+        self._changed.set()
+
+    def close(self):
+        self._closed.set()
+        self._changed.set()
+        self.robot.remove_status_listener(self.notify)
+
+    def _run(self):
+        last = None
+        while True:
+            self._changed.wait()
+            if self._closed.is_set():
+                return
+            self._changed.clear()
+            try:
+                status = self.robot.status()
+                if status != last:
+                    self._send({'event': 'status', 'robot': self.robot.id, 'status': status})
+                    last = status
+            except ipc.IPCError:
+                self.close()
+                return
+            except Exception as e:
+                print(f"[RobotDaemon] Error enviando estado de {self.robot.id}: {e}")
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def setup(self):
+        self._send_lock = threading.Lock()
+        self._subscriptions = []
+
+    def send(self, message):
+        with self._send_lock:
+            ipc.send_message(self.request, message)
+
+    def handle(self):
+        daemon = self.server.robot_daemon
+        while True:
+            try:
+                request = ipc.recv_message(self.request)
+            except ipc.IPCError:
+                return
+            try:
+                if request.get('op') == 'subscribe':
+                    robot = daemon.registry.get(request.get('robot'))
+                    self._subscriptions.append(_Subscription(robot, self.send))
+                    result = robot.id
+                else:
+                    result = daemon.dispatch(request.get('op'), request.get('robot'), request.get('args') or [])
+                response = {'id': request.get('id'), 'ok': True, 'result': result}
+            except Exception as e:
+                response = {'id': request.get('id'), 'ok': False, 'error': str(e), 'kind': type(e).__name__}
+            try:
+                self.send(response)
+            except ipc.IPCError:
+                return
+
+    def finish(self):
+        for subscription in self._subscriptions:
+            subscription.close()
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    # Los long-polls de las vistas async se despiertan juntos y consultan el estado a la vez
+    request_queue_size = socket.SOMAXCONN
+
+
+class RobotDaemon:
+    """
+    Servidor del socket Unix en `path` sobre un RobotRegistry local. Las
+    operaciones son las que usan las vistas y la telemetría, nada más.
+    """
+
+    def __init__(self, path, registry):
+        self.path = path
+        self.registry = registry
+        self._server = None
+        self._ops = {
+            'ping': self._ping,
+            'robots': lambda: [r.to_dict() for r in self.registry.all()],
+            'metrics': lambda: metrics.registry.render(exclude=metrics.API_METRICS),
+            'robot': lambda robot: robot.to_dict(),
+            'status': lambda robot: robot.status(),
+            'is_connected': lambda robot: robot.controller.is_connected_status(),
+            'connect': self._connect,
+            'is_busy': lambda robot: robot.controller.is_robot_busy(),
+            'last_position': lambda robot: robot.controller.get_last_position(),
+            'pending_count': lambda robot: robot.queue.pending_count(),
+            'recent_jobs': lambda robot, limit=50: robot.queue.recent_jobs(limit),
+            'submit_position': lambda robot, *args: _job(robot.queue.submit_position(*args)),
+            'submit_home': lambda robot: _job(robot.queue.submit_home()),
+            'submit_trajectory': self._submit_trajectory,
+            'find_job': self._find_job,
+            'job_wait': self._job_wait,
+            'start_sequence': self._start_sequence,
+            'active_run': lambda robot: _run(robot.runner.active_run()),
+            'find_run': self._find_run,
+            'run_action': self._run_action,
+        }
+
+    # ------------------------------------------------------------------
+    # Operaciones
+    # ------------------------------------------------------------------
+    def dispatch(self, op, robot_id, args):
+        handler = self._ops.get(op)
+        if handler is None:
+            raise ValueError(f"Operación desconocida: {op}")
+        if op in GLOBAL_OPS:
+            return handler(*args)
+        return handler(self.registry.get(robot_id), *args)
+
+    def _ping(self):
+        return {'pid': os.getpid(), 'robots': self.registry.ids()}
+
+    def _connect(self, robot):
+        robot.controller.connect()
+        return robot.controller.is_connected_status()
+
+    def _submit_trajectory(self, robot, times, positions, velocities, gripper, rate, description=''):
+        plan = Trajectory(np.asarray(times, dtype=float), np.asarray(positions, dtype=float),
+                          np.asarray(velocities, dtype=float), bool(gripper))
+        return _job(robot.submit_trajectory(plan, rate, description))
+
+    def _find_job(self, job_id):
+        robot, job = self.registry.find_job(job_id)
+        return {'robot': robot.id, 'job': job.to_dict()} if job is not None else None
+
+    def _job_wait(self, job_id, timeout=None):
+        _, job = self.registry.find_job(job_id)
+        if job is None:
+            return None
+        job.wait(timeout)
+        return job.to_dict()
+
+    def _start_sequence(self, robot, sequence_id):
+        # Compilada aquí desde la base: la caché de cada worker puede no ser la vigente
+        compiled = sequence_cache.get(sequence_id)
+        if compiled is None:
+            raise LookupError(f"Secuencia no encontrada: {sequence_id}")
+        return _run(robot.runner.start(compiled))
+
+    def _find_run(self, run_id):
+        robot, run = self.registry.find_run(run_id)
+        return {'robot': robot.id, 'run': run.to_dict()} if run is not None else None
+
+    def _run_action(self, run_id, action):
+        if action not in RUN_ACTIONS:
+            raise ValueError(f"Acción desconocida: {action}")
+        robot, run = self.registry.find_run(run_id)
+        if run is None:
+            return False
+        return getattr(robot.runner, action)(run_id)
+
+    # ------------------------------------------------------------------
+    # Servidor
+    # ------------------------------------------------------------------
+    def serve_forever(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)        # Socket de una ejecución anterior
+        self._server = _Server(self.path, _Handler)
+        self._server.robot_daemon = self
+        os.chmod(self.path, 0o660)
+        print(f"[RobotDaemon] Escuchando en {self.path} (robots: {', '.join(self.registry.ids())})")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
@@ -0,0 +1,268 @@
+"""
+Registro de robots: varios brazos SCARA servidos por el mismo proceso.
+
+Cada robot tiene su propio controlador (puerto, baudios, simulado o real),
+con su hilo lector, su cola de movimientos y su runner de secuencias, así
+que un brazo esperando su DONE no frena a los demás. Se configuran con
+SCARA_ROBOTS; sin esa variable hay un solo robot 'default' armado con los
+SCARA_* de siempre. El robot por defecto reutiliza las instancias globales
+(arduino_controller, motion_queue, sequence_runner), que siguen siendo las
+del control PS4 y el jog.
+
+Con SCARA_DAEMON_SOCKET el registro de este proceso es un RemoteRegistry
+(robot_client) y los puertos serie los abre solo el daemon.
+"""
+import asyncio
+import functools
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from . import metrics, motion_log, trajectory
+from .arduino_communication import LazyController, arduino_controller, build_controller
+from .motion_queue import MotionQueue, motion_queue
+from .sequence_runner import SequenceRunner, sequence_runner
+
+DEFAULT_ROBOT = 'default'
+
+
+class RobotNotFound(KeyError):
+    """Id de robot que no está en SCARA_ROBOTS."""
+
+
+def _settings_robots():
+    return getattr(settings, 'SCARA_ROBOTS', None) or {DEFAULT_ROBOT: {}}
+
+
+def robot_ids():
+    return list(_settings_robots())
+
+
+def default_robot_id():
+    robots = _settings_robots()
+    robot_id = getattr(settings, 'SCARA_DEFAULT_ROBOT', '')
+    return robot_id if robot_id in robots else next(iter(robots))
+
+
+def robot_config(robot_id=None):
+    """
+    Configuración completa de un robot: lo que falte en su entrada de
+    SCARA_ROBOTS se toma de los settings de un solo robot.
+    """
+    robot_id = robot_id or default_robot_id()
+    robots = _settings_robots()
+    if robot_id not in robots:
+        raise RobotNotFound(robot_id)
+    config = robots[robot_id]
+    log_path = getattr(settings, 'SCARA_MOTION_LOG', motion_log.default_path())
+    if robot_id != default_robot_id():
+        log_path = motion_log.robot_path(log_path, robot_id)
+    return {
+        'port': config.get('port', getattr(settings, 'SCARA_SERIAL_PORT', 'COM10')),
+        'baud': int(config.get('baud', getattr(settings, 'SCARA_BAUD_RATE', 9600))),
+        'fake': bool(config.get('fake', getattr(settings, 'SCARA_USE_FAKE_ARDUINO', False))),
+        'protocol': config.get('protocol', getattr(settings, 'SCARA_PROTOCOL', 'auto')),
+        # Sin default propio: el de settings.py es el único
+        'pipeline': int(config.get('pipeline', settings.SCARA_PIPELINE_WINDOW)),
+        'motion_log': config.get('motion_log', log_path),
+    }
+
+
+class Robot:
+    """Un brazo del registro: controlador, cola de movimientos y runner de secuencias."""
+
+    def __init__(self, robot_id, config, controller=None, queue=None, runner=None):
+        self.id = robot_id
+        self.config = config
+        if controller is None:
+            controller = LazyController(functools.partial(build_controller, robot_id))
+        self.controller = controller
+        self.queue = MotionQueue(controller) if queue is None else queue
+        self.runner = SequenceRunner(self.queue) if runner is None else runner
+        metrics.QUEUE_DEPTH.set_function(self.queue.pending_count, robot=robot_id)
+
+    def is_connected(self):
+        """Sin crear el controlador: un robot que nadie usó todavía figura desconectado."""
+        if isinstance(self.controller, LazyController) and not self.controller.is_created():
+            return False
+        return self.controller.is_connected_status()
+
+    def last_position(self):
+        """Última posición confirmada, sin crear el controlador; None si no está conectado."""
+        return self.controller.get_last_position() if self.is_connected() else None
+
+    def status(self):
+        """Snapshot de /get-status/ y la telemetría: conexión, busy, cola y última posición."""
+        connected = self.controller.is_connected_status()
+        queue_depth = self.queue.pending_count()
+        busy = False
+        if connected:
+            busy = self.controller.is_robot_busy() or queue_depth > 0
+        return {
+            'robot': self.id,
+            'connected': connected,
+            'busy': busy,
+            'queue_depth': queue_depth,
+            'last_position': self.controller.get_last_position() if connected else None,
+        }
+
+    def add_status_listener(self, callback):
+        """`callback()` ante cada cambio del controlador o de la cola."""
+        self.controller.add_status_listener(callback)
+        self.queue.add_status_listener(callback)
+
+    def remove_status_listener(self, callback):
+        self.controller.remove_status_listener(callback)
+        self.queue.remove_status_listener(callback)
+
+    def submit_trajectory(self, plan, rate=trajectory.DEFAULT_RATE, description=''):
+        """Encola una trayectoria planificada como un único trabajo en streaming."""
+        return self.queue.submit(
+            trajectory.stream_trajectory, self.controller, plan, rate, description=description,
+        )
+
+    # ------------------------------------------------------------------
+    # Variantes async (vistas ASGI): ninguna ocupa un hilo mientras espera
+    # ------------------------------------------------------------------
+    async def astatus(self):
+        return self.status()        # Solo lee estado en memoria
+
+    async def aensure_connected(self):
+        """Reconecta si hace falta; abrir el puerto es lo único que corre en un hilo."""
+        if not self.controller.is_connected_status():
+            print(f"[Robot] {self.id}: Arduino no conectado, intentando reconectar...")
+            await sync_to_async(self.controller.connect, thread_sensitive=False)()
+        return self.controller.is_connected_status()
+
+    async def asubmit_position(self, arm1_angle, arm2_angle, base_height, gripper_state, speed=500):
+        return self.queue.submit_position(arm1_angle, arm2_angle, base_height, gripper_state, speed)
+
+    async def asubmit_home(self):
+        return self.queue.submit_home()
+
+    async def apending_count(self):
+        return self.queue.pending_count()
+
+    async def astart(self, compiled):
+        return self.runner.start(compiled)
+
+    async def aactive_run(self):
+        return self.runner.active_run()
+
+    async def ajob_wait(self, job, timeout=None):
+        """Espera el final del trabajo sobre su Future; retorna True si terminó."""
+        try:
+            # shield: si el cliente se va, no cancelar el Future del trabajo
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), timeout)
+        except Exception:
+            pass
+        return job.is_finished()
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'port': self.config['port'],
+            'baud': self.config['baud'],
+            'fake': self.config['fake'],
+            'protocol': self.config['protocol'],
+            'pipeline': self.config['pipeline'],
+            'connected': self.is_connected(),
+            'queue_depth': self.queue.pending_count(),
+            'active_run': getattr(self.runner.active_run(), 'id', None),
+        }
+
+
+class RobotRegistry:
+    """
+    Robots configurados, creados al primer uso (como el controlador
+    perezoso). Con `robots` (dict id → Robot) se usan esos en lugar de los
+    de la configuración.
+    """
+
+    def __init__(self, robots=None):
+        self._robots = robots
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._robots is None:
+            with self._lock:
+                if self._robots is None:
+                    default_id = default_robot_id()
+                    robots = {}
+                    for robot_id in robot_ids():
+                        if robot_id == default_id:
+                            robots[robot_id] = Robot(
+                                robot_id, robot_config(robot_id),
+                                arduino_controller, motion_queue, sequence_runner,
+                            )
+                        else:
+                            robots[robot_id] = Robot(robot_id, robot_config(robot_id))
+                    self._robots = robots
+        return self._robots
+
+    def get(self, robot_id=None):
+        """Robot por id (None = el por defecto). RobotNotFound si no existe."""
+        robots = self._load()
+        robot_id = robot_id or default_robot_id()
+        if robot_id not in robots:
+            raise RobotNotFound(robot_id)
+        return robots[robot_id]
+
+    def all(self):
+        return list(self._load().values())
+
+    def ids(self):
+        return list(self._load())
+
+    def render_metrics(self):
+        """Texto de /metrics (los gauges de cada robot se registran al cargarlos)."""
+        self._load()
+        return metrics.registry.render()
+
+    def find_job(self, job_id):
+        """(robot, MotionJob) del trabajo con ese id en cualquier cola, o (None, None)."""
+        for robot in self.all():
+            job = robot.queue.get_job(job_id)
+            if job is not None:
+                return robot, job
+        return None, None
+
+    def find_run(self, run_id):
+        """(robot, SequenceRun) de la ejecución con ese id en cualquier runner, o (None, None)."""
+        for robot in self.all():
+            run = robot.runner.get_run(run_id)
+            if run is not None:
+                return robot, run
+        return None, None
+
+
+def _build_registry():
+    """Con SCARA_DAEMON_SOCKET los robots viven en el daemon (manage.py robot_daemon)."""
+    path = getattr(settings, 'SCARA_DAEMON_SOCKET', '')
+    if path:
+        from .robot_client import RemoteRegistry
+
+        return RemoteRegistry(path)
+    return RobotRegistry()
+
+
+def reset_registry():
+    """
+    Vuelve a armar el registro global con los settings actuales (p. ej. tras
+    override_settings en los tests) y cierra los controladores de los robots
+    descartados; el del robot por defecto es el global y sigue abierto.
+    """
+    global registry
+    previous, registry = registry, _build_registry()
+    if isinstance(previous, RobotRegistry) and previous._robots:
+        for robot in previous._robots.values():
+            if robot.controller is arduino_controller:
+                continue
+            if not isinstance(robot.controller, LazyController) or robot.controller.is_created():
+                robot.controller.close()
+    return registry
+
+
+# Instancia global
+registry = _build_registry()
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from . import consumers
+
+websocket_urlpatterns = [
+    path('ws/telemetry/', consumers.TelemetryConsumer.as_asgi()),
+    path('ws/telemetry/<str:robot_id>/', consumers.TelemetryConsumer.as_asgi()),
+]
@@ -0,0 +1,159 @@
+"""
+Caché de secuencias compiladas.
+
+Cada RobotSequence se compila una vez a un array estructurado de NumPy con
+los pasos ya ordenados y limitados (arm1, arm2, base, gripper, speed,
+delay) y se guarda en memoria. Mientras no cambie, arrancarla no toca la
+base de datos. Las señales de signals.py invalidan la entrada cuando cambia
+la secuencia, alguno de sus pasos o alguna de sus RobotPosition; los demás
+procesos (otros workers, el daemon) ven el cambio por la versión compartida
+(shared_versions) y descartan sus secuencias compiladas.
+"""
+import threading
+import time
+
+import numpy as np
+from asgiref.sync import sync_to_async
+
+from . import shared_versions
+from .arduino_communication import ARM1_LIMITS, ARM2_LIMITS, BASE_LIMITS, SPEED_LIMITS
+
+STEP_DTYPE = np.dtype([
+    ('order', 'i4'),
+    ('arm1', 'f8'),
+    ('arm2', 'f8'),
+    ('base', 'f8'),
+    ('gripper', 'u1'),
+    ('speed', 'u2'),
+    ('delay', 'f8'),
+])
+
+DEFAULT_SPEED = 500
+# Versión compartida de las secuencias compiladas (shared_versions)
+SHARED_VERSION = 'sequences:compiled'
+
+
+def compile_steps(steps, speed=DEFAULT_SPEED):
+    """
+    Dicts (order, arm1, arm2, base, gripper, delay) → array estructurado con
+    los rangos de send_position ya aplicados.
+    """
+    compiled = np.zeros(len(steps), dtype=STEP_DTYPE)
+    if not steps:
+        return compiled
+    compiled['order'] = [s['order'] for s in steps]
+    compiled['arm1'] = np.clip([s['arm1'] for s in steps], *ARM1_LIMITS)
+    compiled['arm2'] = np.clip([s['arm2'] for s in steps], *ARM2_LIMITS)
+    compiled['base'] = np.clip([s['base'] for s in steps], *BASE_LIMITS)
+    compiled['gripper'] = [1 if s['gripper'] else 0 for s in steps]
+    compiled['speed'] = np.clip([s.get('speed', speed) for s in steps], *SPEED_LIMITS)
+    compiled['delay'] = np.maximum([s['delay'] for s in steps], 0.0)
+    return compiled
+
+
+class CompiledSequence:
+    """Secuencia lista para ejecutar: id, nombre y el buffer de pasos."""
+
+    def __init__(self, sequence_id, name, steps, position_ids=()):
+        self.id = sequence_id
+        self.name = name
+        self.steps = steps
+        self.position_ids = frozenset(position_ids)
+        self.compiled_at = time.time()
+
+    def __len__(self):
+        return len(self.steps)
+
+
+class SequenceCache:
+    """Secuencias compiladas por id; cada una recuerda qué RobotPosition usa."""
+
+    def __init__(self):
+        self._compiled = {}
+        self._lock = threading.Lock()
+        self._generation = 0        # Cambia con cada invalidación
+        self._shared_version = None
+        self.hits = 0
+        self.misses = 0
+
+    def _sync_shared(self):
+        """Si otro proceso invalidó algo, descartar todo lo compilado aquí (con el lock tomado)."""
+        version = shared_versions.current(SHARED_VERSION)
+        if version != self._shared_version:
+            if self._shared_version is not None:
+                self._generation += 1
+                self._compiled.clear()
+            self._shared_version = version
+
+    def get(self, sequence_id):
+        """CompiledSequence de `sequence_id`, compilándola si hace falta; None si no existe."""
+        with self._lock:
+            self._sync_shared()
+            compiled = self._compiled.get(sequence_id)
+            if compiled is not None:
+                self.hits += 1
+                return compiled
+            self.misses += 1
+            generation = self._generation
+        compiled = self._compile(sequence_id)
+        if compiled is not None:
+            with self._lock:
+                # Si algo se invalidó mientras compilábamos, no guardar
+                if generation == self._generation:
+                    self._compiled[sequence_id] = compiled
+        return compiled
+
+    async def aget(self, sequence_id):
+        """get() para vistas async: un acierto no sale del event loop; compilar va a un hilo (ORM)."""
+        with self._lock:
+            self._sync_shared()
+            compiled = self._compiled.get(sequence_id)
+            if compiled is not None:
+                self.hits += 1
+                return compiled
+        return await sync_to_async(self.get)(sequence_id)
+
+    def _compile(self, sequence_id):
+        # Import local: models no puede importarse antes de que cargue la app
+        from .models import RobotSequence, SequencePosition
+
+        name = RobotSequence.objects.filter(id=sequence_id).values_list('name', flat=True).first()
+        if name is None:
+            return None
+        rows = list(
+            SequencePosition.objects.filter(sequence_id=sequence_id).order_by('order').values_list(
+                'order', 'position_id', 'position__arm1_angle', 'position__arm2_angle',
+                'position__base_height', 'position__gripper_state', 'delay_seconds',
+            )
+        )
+        steps = compile_steps([
+            {'order': order, 'arm1': arm1, 'arm2': arm2, 'base': base, 'gripper': gripper, 'delay': delay}
+            for order, _, arm1, arm2, base, gripper, delay in rows
+        ])
+        print(f"[SequenceCache] Secuencia {sequence_id} compilada ({len(steps)} pasos)")
+        return CompiledSequence(sequence_id, name, steps, (row[1] for row in rows))
+
+    def invalidate(self, sequence_id):
+        with self._lock:
+            self._shared_version = shared_versions.bump(SHARED_VERSION)
+            self._generation += 1
+            self._compiled.pop(sequence_id, None)
+
+    def invalidate_position(self, position_id):
+        """Descarta las secuencias compiladas que usan la RobotPosition."""
+        with self._lock:
+            self._shared_version = shared_versions.bump(SHARED_VERSION)
+            self._generation += 1
+            for sequence_id in [sid for sid, c in self._compiled.items() if position_id in c.position_ids]:
+                del self._compiled[sequence_id]
+
+    def clear(self):
+        """Vacía la caché (p. ej. tras un queryset.update(), que no emite señales)."""
+        with self._lock:
+            self._shared_version = shared_versions.bump(SHARED_VERSION)
+            self._generation += 1
+            self._compiled.clear()
+
+
+# Instancia global
+sequence_cache = SequenceCache()
@@ -0,0 +1,300 @@
+import itertools
+import threading
+import time
+
+from django.conf import settings
+
+from . import trajectory
+from .motion_queue import motion_queue
+from .sequence_cache import compile_steps, sequence_cache
+
+# Ids de ejecución únicos en el proceso (compartidos por los runners de todos los robots)
+_run_ids = itertools.count(1)
+
+
+def load_steps(sequence):
+    """Pasos de una RobotSequence como dicts (order, arm1, arm2, base, gripper, delay)."""
+    return [
+        {
+            'order': sp.order,
+            'arm1': sp.position.arm1_angle,
+            'arm2': sp.position.arm2_angle,
+            'base': sp.position.base_height,
+            'gripper': sp.position.gripper_state,
+            'delay': sp.delay_seconds,
+        }
+        for sp in sequence.sequenceposition_set.select_related('position').order_by('order')
+    ]
+
+
+def blend_segments(steps):
+    """
+    Agrupa los pasos en tramos (inicio, fin) con fin exclusivo. Un tramo de
+    un paso es un movimiento punto a punto. Uno de varios pasos sale de la
+    posición del paso anterior y pasa sin detenerse por sus pasos
+    intermedios: todos tienen delay 0 y la misma pinza que el paso anterior
+    (un cambio de pinza o un delay obligan a llegar y parar).
+    """
+    gripper = steps['gripper'].tolist()
+    delay = steps['delay'].tolist()
+    segments = []
+    i = 0
+    while i < len(gripper):
+        end = i + 1
+        if i > 0 and gripper[i] == gripper[i - 1]:
+            while end < len(gripper) and delay[end - 1] == 0 and gripper[end] == gripper[i]:
+                end += 1
+        segments.append((i, end))
+        i = end
+    return segments
+
+
+class SequenceRun:
+    """
+    Ejecución en segundo plano de una RobotSequence.
+    Estados: running, paused, cancelled, done, failed.
+    """
+
+    def __init__(self, run_id, sequence_id, sequence_name, steps):
+        self.id = run_id
+        self.sequence_id = sequence_id
+        self.sequence_name = sequence_name
+        self.steps = steps             # Array estructurado (sequence_cache.STEP_DTYPE)
+        self.state = 'running'
+        self.current_step = 0          # Pasos completados
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+        self._cancel_event = threading.Event()
+        # (trabajo, tramo, pasos) enviados a la cola y todavía sin esperar
+        self._outstanding = []
+
+    def is_active(self):
+        return self.state in ('running', 'paused')
+
+    def elapsed(self):
+        end = self.finished_at or time.time()
+        return end - self.started_at
+
+    def eta(self):
+        """Tiempo restante estimado con la duración media de los pasos hechos."""
+        remaining = len(self.steps) - self.current_step
+        if not self.is_active() or remaining <= 0:
+            return 0.0
+        if self.current_step == 0:
+            return None
+        return self.elapsed() / self.current_step * remaining
+
+    def to_dict(self):
+        return {
+            'run_id': self.id,
+            'sequence_id': self.sequence_id,
+            'sequence_name': self.sequence_name,
+            'state': self.state,
+            'current_step': self.current_step,
+            'total_steps': len(self.steps),
+            'elapsed': round(self.elapsed(), 3),
+            'eta': None if self.eta() is None else round(self.eta(), 3),
+            'error': self.error,
+        }
+
+
+class SequenceRunner:
+    """
+    Ejecuta secuencias fuera de la petición HTTP. Cada paso se manda a la
+    cola de movimientos y se espera su DONE; entre pasos se respeta el
+    delay y se atienden pausa/reanudar/cancelar. Solo una secuencia activa
+    a la vez por runner, porque comparten el mismo brazo (cada robot del
+    registro tiene el suyo).
+
+    Con blending, los pasos consecutivos sin delay ni cambio de pinza se
+    ejecutan como un solo tramo (ver blend_segments); `blend_tolerance`
+    descarta los puntos de paso casi alineados. Con firmware que acepta
+    objetivos en movimiento (`continuous_firmware`) el tramo es una
+    trayectoria continua muestreada; con el firmware actual, que bloquea
+    hasta llegar a cada objetivo, los puntos se encadenan sin esperar DONE.
+    """
+
+    def __init__(self, queue, blending=None, blend_tolerance=None, continuous_firmware=None):
+        self.queue = queue
+        self.blending = getattr(settings, 'SCARA_SEQUENCE_BLENDING', True) if blending is None else blending
+        self.blend_tolerance = (getattr(settings, 'SCARA_BLEND_TOLERANCE', 0.5)
+                                if blend_tolerance is None else blend_tolerance)
+        self.continuous_firmware = (getattr(settings, 'SCARA_CONTINUOUS_FIRMWARE', False)
+                                    if continuous_firmware is None else continuous_firmware)
+        self._runs = {}
+        self._lock = threading.Lock()
+
+    def start(self, sequence):
+        """
+        Arranca la ejecución de una secuencia: una RobotSequence, su id o una
+        CompiledSequence. Los pasos salen de la caché compilada, así que una
+        secuencia ya compilada arranca sin consultas a la base de datos.
+        Retorna el SequenceRun, o None si ya hay otra secuencia activa.
+        """
+        compiled = sequence if hasattr(sequence, 'steps') else sequence_cache.get(getattr(sequence, 'id', sequence))
+        if compiled is None:
+            return None
+        return self.start_steps(compiled.id, compiled.name, compiled.steps)
+
+    def start_steps(self, sequence_id, sequence_name, steps):
+        """
+        Arranca una ejecución a partir de pasos ya cargados: array compilado
+        o dicts con order, arm1, arm2, base, gripper y delay.
+        """
+        if not hasattr(steps, 'dtype'):
+            steps = compile_steps(steps)
+        with self._lock:
+            if self.active_run() is not None:
+                return None
+            run = SequenceRun(next(_run_ids), sequence_id, sequence_name, steps)
+            self._runs[run.id] = run
+        threading.Thread(
+            target=self._execute, args=(run,), name=f"sequence-run-{run.id}", daemon=True
+        ).start()
+        return run
+
+    def get_run(self, run_id):
+        return self._runs.get(run_id)
+
+    def active_run(self):
+        for run in self._runs.values():
+            if run.is_active():
+                return run
+        return None
+
+    def pause(self, run_id):
+        run = self.get_run(run_id)
+        if run is None or run.state != 'running':
+            return False
+        run._resume_event.clear()
+        run.state = 'paused'
+        self._withdraw(run)
+        print(f"[SequenceRunner] Ejecución {run.id} pausada en paso {run.current_step}")
+        return True
+
+    def resume(self, run_id):
+        run = self.get_run(run_id)
+        if run is None or run.state != 'paused':
+            return False
+        run.state = 'running'
+        run._resume_event.set()
+        print(f"[SequenceRunner] Ejecución {run.id} reanudada")
+        return True
+
+    def cancel(self, run_id):
+        run = self.get_run(run_id)
+        if run is None or not run.is_active():
+            return False
+        run._cancel_event.set()
+        run._resume_event.set()     # Despertar si estaba en pausa
+        self._withdraw(run)
+        print(f"[SequenceRunner] Cancelando ejecución {run.id}")
+        return True
+
+    def _withdraw(self, run):
+        """
+        Saca de la cola los tramos enviados por adelantado que aún no
+        empezaron. El que está en curso (o ya en el buffer del firmware)
+        termina igual; al reanudar se vuelven a enviar desde el primero
+        retirado.
+        """
+        for job, _, _ in list(run._outstanding):
+            self.queue.cancel(job)
+
+    def _execute(self, run):
+        print(f"[SequenceRunner] Ejecutando secuencia: {run.sequence_name} ({len(run.steps)} pasos)")
+        try:
+            # tolist() convierte el buffer a tipos de Python una sola vez
+            rows = run.steps.tolist()
+            segments = blend_segments(run.steps) if self.blending else [(i, i + 1) for i in range(len(rows))]
+            # Con pipeline, los pasos sin delay se encolan sin esperar el DONE
+            # del anterior (hasta llenar la ventana del firmware)
+            lookahead = max(1, getattr(self.queue.controller, 'pipeline_window', 0))
+            outstanding = run._outstanding
+            index = 0
+            while index < len(segments):
+                # Pausa entre tramos (cancelar también la despierta)
+                run._resume_event.wait()
+                if run._cancel_event.is_set():
+                    break
+
+                start, end = segments[index]
+                if end - start == 1:
+                    order, arm1, arm2, base, gripper, speed, delay = rows[start]
+                    print(f"   Paso {order}: arm1={arm1}, arm2={arm2}, base={base}, gripper={gripper}")
+                    job = self.queue.submit_position(arm1, arm2, base, gripper, speed)
+                else:
+                    job = self._submit_blended(rows[start - 1:end])
+                outstanding.append((job, index, end - start))
+                index += 1
+                if not run._resume_event.is_set() or run._cancel_event.is_set():
+                    # Pausa o cancelación mientras se encolaba
+                    self._withdraw(run)
+                delay = rows[end - 1][6]
+                if (delay <= 0 and len(outstanding) < lookahead and end < len(rows)
+                        and run._resume_event.is_set()):
+                    continue
+                withdrawn = self._wait_jobs(run, outstanding)
+                if withdrawn is not None:
+                    index = withdrawn
+                    continue
+
+                # Delay del último paso del tramo, interrumpible por cancelación
+                if run._cancel_event.wait(delay):
+                    break
+
+            self._withdraw(run)
+            self._wait_jobs(run, outstanding)
+            run.state = 'cancelled' if run._cancel_event.is_set() else 'done'
+        except Exception as e:
+            print(f"[SequenceRunner] Error ejecutando secuencia: {e}")
+            run.state = 'failed'
+            run.error = str(e)
+        finally:
+            run.finished_at = time.time()
+            print(f"[SequenceRunner] Ejecución {run.id} terminó: {run.state}")
+
+    @staticmethod
+    def _wait_jobs(run, outstanding):
+        """
+        Espera los trabajos enviados por adelantado, en orden. Retorna el
+        tramo del primero que se retiró de la cola (los siguientes también
+        se retiraron), o None si se completaron todos.
+        """
+        while outstanding:
+            job, segment, count = outstanding[0]
+            job.wait()
+            if job.state == 'cancelled':
+                outstanding.clear()
+                return segment
+            outstanding.pop(0)
+            if job.state == 'failed':
+                raise RuntimeError(f"Paso {run.steps['order'][run.current_step]}: {job.error}")
+            run.current_step += count
+        return None
+
+    def _submit_blended(self, rows):
+        """Encola un tramo desde rows[0] (posición actual) por el resto de los pasos."""
+        waypoints = trajectory.simplify_waypoints([row[1:4] for row in rows], self.blend_tolerance)
+        speed = max(row[5] for row in rows[1:])
+        gripper = bool(rows[-1][4])
+        description = f"blend pasos {rows[1][0]}-{rows[-1][0]}"
+        print(f"   Pasos {rows[1][0]}-{rows[-1][0]} combinados: {len(waypoints) - 1} movimientos")
+        if not self.continuous_firmware:
+            return self.queue.submit(
+                trajectory.stream_waypoints, self.queue.controller, waypoints[1:], gripper, speed,
+                description=description,
+            )
+        plan = trajectory.plan_trajectory(
+            waypoints, max_velocity=trajectory.velocity_limits(speed), gripper=gripper
+        )
+        return self.queue.submit(
+            trajectory.stream_trajectory, self.queue.controller, plan, description=description,
+        )
+
+
+# Instancia global
+sequence_runner = SequenceRunner(motion_queue)
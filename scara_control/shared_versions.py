@@ -0,0 +1,41 @@
+"""
+Versiones de las cachés en memoria (api_cache, sequence_cache) compartidas
+entre procesos.
+
+Cada proceso guarda sus cuerpos JSON y secuencias compiladas, pero la
+versión vigente vive en la caché de Django (CACHES): cuando un worker
+cambia una posición, los demás workers y el daemon ven la versión nueva y
+descartan lo suyo. Con varios procesos el backend tiene que ser compartido
+(archivos, Redis, base de datos); ver CACHES en settings.
+
+Las versiones son tokens al azar, no contadores: dos cambios simultáneos en
+procesos distintos nunca dejan la misma versión que antes, y un ETag de
+antes de reiniciar no coincide con datos distintos.
+"""
+import uuid
+
+from django.core.cache import cache
+
+KEY_PREFIX = 'scara:version:'
+
+
+def _token():
+    return uuid.uuid4().hex[:12]
+
+
+def current(name):
+    """Versión vigente de `name` (se crea al primer uso)."""
+    key = KEY_PREFIX + name
+    version = cache.get(key)
+    if version is None:
+        # add(): si otro proceso la creó a la vez, queda la suya
+        cache.add(key, _token(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump(name):
+    """Nueva versión de `name`: invalida lo cacheado en todos los procesos."""
+    version = _token()
+    cache.set(KEY_PREFIX + name, version, timeout=None)
+    return version
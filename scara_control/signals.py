@@ -0,0 +1,38 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import RobotPosition, RobotSequence, SequencePosition
+from . import api_cache
+from .api_cache import response_cache
+from .sequence_cache import sequence_cache
+
+
+# Invalidación de la caché de secuencias compiladas (sequence_cache.py) y de
+# las respuestas cacheadas de la API (api_cache.py)
+
+@receiver([post_save, post_delete], sender=RobotSequence)
+def _sequence_changed(sender, instance, **kwargs):
+    sequence_cache.invalidate(instance.id)
+    response_cache.bump(api_cache.SEQUENCES)
+
+
+@receiver([post_save, post_delete], sender=SequencePosition)
+def _sequence_step_changed(sender, instance, **kwargs):
+    sequence_cache.invalidate(instance.sequence_id)
+    response_cache.bump(api_cache.SEQUENCES)
+
+
+@receiver([post_save, post_delete], sender=RobotPosition)
+def _position_changed(sender, instance, **kwargs):
+    sequence_cache.invalidate_position(instance.id)
+    # Las secuencias incluyen sus posiciones anidadas
+    response_cache.bump(api_cache.POSITIONS, api_cache.SEQUENCES)
+
+
+@receiver(m2m_changed, sender=RobotSequence.positions.through)
+def _sequence_positions_changed(sender, instance, **kwargs):
+    if isinstance(instance, RobotSequence):
+        sequence_cache.invalidate(instance.id)
+    else:
+        sequence_cache.invalidate_position(instance.id)
+    response_cache.bump(api_cache.SEQUENCES)
@@ -0,0 +1,326 @@
+"""
+Arduino virtual sobre un pseudo-terminal (PTY).
+
+Expone un dispositivo serial (/dev/pts/N) que habla el protocolo del
+firmware de ARDUINO.txt, de modo que el ArduinoController real se conecta
+sin cambios. Solo funciona en sistemas POSIX (Linux/macOS).
+"""
+import os
+import select
+import threading
+import time
+from collections import OrderedDict, deque
+
+from . import motion_model
+from . import protocol
+
+# Respuesta de loop() a una línea que no trae exactamente 5 campos
+DISCARDED_LINE = "Línea descartada: número de campos inválido"
+
+
+def _to_float(text):
+    """Como String.toFloat() de Arduino: el prefijo numérico, 0 si no hay."""
+    text = text.strip()
+    for end in range(len(text), 0, -1):
+        try:
+            return float(text[:end])
+        except ValueError:
+            continue
+    return 0.0
+
+
+class VirtualArduino:
+    """
+    Simula el firmware: mensaje inicial, comando CSV de 5 campos, delay del
+    servo, perfiles trapezoidales de AccelStepper y líneas DONE.
+
+    time_scale multiplica todas las esperas (1.0 = tiempo real, 0 = instantáneo).
+    baud modela el tiempo de transmisión por el enlace (10 bits por byte).
+    binary=True acepta la negociación del protocolo binario.
+    pipeline=N (> 0, requiere binary) simula un firmware con buffer circular
+    de N comandos: acepta "PROTO PIPE", confirma cada frame con QUEUED al
+    guardarlo y un hilo aparte los ejecuta en orden mientras se sigue leyendo
+    el puerto. Con 0 se comporta como ARDUINO.txt (bloquea en cada movimiento).
+
+    En modo CSV, como serialEvent() junta en inputString todo lo que llegó
+    mientras loop() movía los motores, dos líneas recibidas durante un
+    movimiento se descartan juntas con una sola "Línea descartada".
+    """
+
+    RECENT_SEQS = 64            # Seqs recordados para detectar retransmisiones
+
+    def __init__(self, time_scale=1.0, baud=9600, binary=False, boot_delay=1.0, verbose=False,
+                 pipeline=0):
+        self.time_scale = time_scale
+        self.baud = baud
+        self.binary = binary
+        self.pipeline = pipeline if binary else 0
+        self.boot_delay = boot_delay
+        self.verbose = verbose
+        self.port = None
+        self.commands_received = 0
+        self.duplicates = 0             # Frames retransmitidos ya aceptados
+        self.dropped = 0                # Frames fuera de orden o con el buffer lleno
+        self.gripper_closed = False
+        self.steps = (0, 0, 0)          # Posición actual (J1, J2, Z) en pasos
+        self._master = None
+        self._slave = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._decoder = protocol.command_decoder()
+        self._backlog = b''             # Bytes llegados durante un movimiento CSV
+        self._boot_at = None
+        self._write_lock = threading.Lock()
+        # Buffer circular del modo pipeline
+        self._pipe_active = False
+        self._ring = deque()
+        self._ring_cond = threading.Condition()
+        self._expected_seq = None
+        self._recent = OrderedDict()    # seq → STATUS_QUEUED / STATUS_DONE
+        self._executor = None
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+    def start(self):
+        """Crea el PTY y arranca el hilo del firmware. Retorna la ruta del puerto."""
+        import pty
+        import tty
+
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self._stop.clear()
+        self.reset()
+        self._thread = threading.Thread(target=self._run, name="virtual-arduino", daemon=True)
+        self._thread.start()
+        if self.pipeline:
+            self._executor = threading.Thread(
+                target=self._run_ring, name="virtual-arduino-ring", daemon=True
+            )
+            self._executor.start()
+        print(f"[VirtualArduino] Puerto virtual disponible en {self.port}")
+        return self.port
+
+    def reset(self):
+        """
+        Simula el reset del Arduino: el mensaje inicial sale boot_delay
+        segundos después (como el bootloader tras abrir el puerto). No se
+        escala con time_scale: es el margen para que el host abra el puerto.
+        """
+        self._decoder = protocol.command_decoder()
+        self._backlog = b''
+        self._boot_at = time.monotonic() + self.boot_delay
+        with self._ring_cond:
+            self._pipe_active = False
+            self._ring.clear()
+            self._expected_seq = None
+            self._recent.clear()
+
+    def stop(self):
+        self._stop.set()
+        with self._ring_cond:
+            self._ring_cond.notify_all()
+        for thread in (self._thread, self._executor):
+            if thread is not None:
+                thread.join(timeout=2)
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._master = self._slave = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Bucle del firmware
+    # ------------------------------------------------------------------
+    def _run(self):
+        while not self._stop.is_set():
+            if self._boot_at is not None and time.monotonic() >= self._boot_at:
+                self._boot_at = None
+                self._println("Sistema iniciado - Pinza ABIERTA (180°)")
+                self._sleep(1.0)    # delay(1000) al final de setup()
+
+            try:
+                ready, _, _ = select.select([self._master], [], [], 0.05)
+            except (OSError, ValueError):
+                break
+            if not ready:
+                continue
+            try:
+                data = os.read(self._master, 1024)
+            except OSError:
+                break
+            if self._boot_at is not None:
+                continue            # Durante el reset se pierde lo recibido
+            glued = False
+            while data:
+                self._sleep(self._wire_time(len(data)))
+                events = self._decoder.feed(data)
+                if glued and len(events) > 1:
+                    # serialEvent() las juntó en una sola línea con más de 4 comas
+                    self._decoder = protocol.command_decoder()
+                    self._println(DISCARDED_LINE)
+                    events = []
+                for kind, value in events:
+                    if kind == 'frame':
+                        self._handle_frame(value)
+                    else:
+                        self._handle_line(value)
+                data, self._backlog = self._backlog, b''
+                glued = True
+
+    def _handle_line(self, line):
+        if line == protocol.PROTO_REQUEST.decode().strip():
+            if self.binary:
+                self._println(protocol.PROTO_ACCEPT)
+                self._decoder.binary = True
+            else:
+                self._println(DISCARDED_LINE)
+            return
+        if line.startswith(protocol.PIPE_REQUEST):
+            if self.pipeline and self._decoder.binary:
+                with self._ring_cond:
+                    # Una nueva negociación resincroniza el seq esperado
+                    self._pipe_active = True
+                    self._expected_seq = protocol.parse_pipe_request(line)
+                    self._recent.clear()
+                self._println(f"{protocol.PIPE_ACCEPT} {self.pipeline}")
+            else:
+                self._println(DISCARDED_LINE)
+            return
+
+        fields = line.split(',')
+        if len(fields) != 5:
+            self._println(DISCARDED_LINE)
+            return
+        self._execute(*(_to_float(f) for f in fields))
+        if not self._decoder.binary:
+            self._backlog += self._read_available()
+        self._println("DONE")
+
+    def _handle_frame(self, decoded):
+        if self._pipe_active:
+            self._enqueue(decoded)
+            return
+        seq, arm1, arm2, base, grip, speed = decoded
+        self._execute(arm1, arm2, base, grip, speed)
+        self._write(protocol.encode_reply(seq, protocol.STATUS_DONE))
+
+    def _enqueue(self, decoded):
+        """Guarda el frame en el buffer circular y contesta sin esperar el movimiento."""
+        seq = decoded[0]
+        with self._ring_cond:
+            if seq in self._recent:
+                # Retransmisión (se perdió nuestra respuesta): repetirla
+                self.duplicates += 1
+                status = self._recent[seq]
+            elif self._expected_seq is not None and seq != self._expected_seq:
+                # Hueco en la secuencia: el host reenvía desde el que falta
+                self.dropped += 1
+                return
+            elif len(self._ring) >= self.pipeline:
+                self.dropped += 1
+                status = protocol.STATUS_FULL
+            else:
+                self._ring.append(decoded)
+                self._remember(seq, protocol.STATUS_QUEUED)
+                self._expected_seq = (seq + 1) & 0xFF
+                self._ring_cond.notify()
+                status = protocol.STATUS_QUEUED
+        self._write(protocol.encode_reply(seq, status))
+
+    def _remember(self, seq, status):
+        self._recent[seq] = status
+        self._recent.move_to_end(seq)
+        while len(self._recent) > self.RECENT_SEQS:
+            self._recent.popitem(last=False)
+
+    def _run_ring(self):
+        """Ejecutor del buffer circular: un movimiento tras otro, en orden."""
+        while not self._stop.is_set():
+            with self._ring_cond:
+                while not self._ring and not self._stop.is_set():
+                    self._ring_cond.wait(0.05)
+                if self._stop.is_set():
+                    break
+                seq, arm1, arm2, base, grip, speed = self._ring[0]
+            self._execute(arm1, arm2, base, grip, speed)
+            with self._ring_cond:
+                if self._ring and self._ring[0][0] == seq:
+                    self._ring.popleft()
+                if seq in self._recent:
+                    self._remember(seq, protocol.STATUS_DONE)
+            self._write(protocol.encode_reply(seq, protocol.STATUS_DONE))
+
+    def _execute(self, arm1, arm2, base, grip, speed):
+        """Aplica un comando con la misma lógica y tiempos que loop() del firmware."""
+        self.commands_received += 1
+        j1, j2, z = motion_model.joint_steps(arm1, arm2, base)
+
+        if grip == 1 and not self.gripper_closed:
+            self._println("Comando recibido: CERRAR pinza")
+            self.gripper_closed = True
+            self._println("Pinza CERRADA a 119°")
+            self._sleep(motion_model.SERVO_DELAY)
+        elif grip == 0 and self.gripper_closed:
+            self._println("Comando recibido: ABRIR pinza")
+            self.gripper_closed = False
+            self._println("Pinza ABIERTA a 180°")
+            self._sleep(motion_model.SERVO_DELAY)
+        elif grip in (0, 1):
+            estado = "cerrada" if self.gripper_closed else "abierta"
+            self._println(f"Pinza ya está {estado} - comando ignorado")
+
+        self._println(
+            f"Datos recibidos: arm1={arm1:.2f}, arm2={arm2:.2f}, base={base:.2f}, "
+            f"gripper={grip:.2f}, speed={speed:.2f}"
+        )
+        duration = motion_model.move_time(self.steps, (j1, j2, z), max(speed, 1.0))
+        self._sleep(duration)
+        self.steps = (j1, j2, z)
+
+    # ------------------------------------------------------------------
+    # E/S
+    # ------------------------------------------------------------------
+    def _read_available(self):
+        """Lo que ya está en el puerto, sin esperar más."""
+        data = b''
+        try:
+            while select.select([self._master], [], [], 0)[0]:
+                chunk = os.read(self._master, 1024)
+                if not chunk:
+                    break
+                data += chunk
+        except (OSError, ValueError):
+            pass
+        return data
+
+    def _wire_time(self, nbytes):
+        return nbytes * 10.0 / self.baud if self.baud else 0.0
+
+    def _sleep(self, seconds):
+        if seconds > 0 and self.time_scale > 0:
+            self._stop.wait(seconds * self.time_scale)
+
+    def _println(self, text):
+        if self.verbose:
+            print(f"[VirtualArduino] {text}")
+        self._write((text + "\r\n").encode('utf-8'))
+
+    def _write(self, data):
+        # El lector y el ejecutor del buffer comparten el puerto
+        with self._write_lock:
+            self._sleep(self._wire_time(len(data)))
+            try:
+                os.write(self._master, data)
+            except OSError:
+                pass
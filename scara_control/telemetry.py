@@ -0,0 +1,168 @@
+"""
+Telemetría en vivo por WebSocket (Django Channels).
+
+El controlador y la cola de movimientos avisan cada cambio de estado;
+aquí se arma el snapshot (mismo formato que /get-status/) y se difunde al
+grupo de Channels de cada robot, así los navegadores no tienen que hacer polling.
+Sin WebSocket, /get-status/ hace long-poll con StatusWatch: cada petición
+en espera es un Future del event loop, no un hilo.
+"""
+import asyncio
+import functools
+import threading
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+TELEMETRY_GROUP = 'scara_telemetry'
+
+_last_snapshots = {}
+_publish_lock = threading.Lock()
+_installed = set()
+_install_lock = threading.Lock()
+# Event loop del servidor ASGI (el del primer suscriptor) y envíos en curso en él
+_loop = None
+_tasks = set()
+
+
+def group_name(robot_id):
+    """Grupo de Channels de un robot del registro."""
+    return f"{TELEMETRY_GROUP}.{robot_id}"
+
+
+def status_snapshot(robot_id=None):
+    """Estado actual de un robot: conexión, busy, profundidad de cola y última posición."""
+    from .robots import registry
+
+    return registry.get(robot_id).status()
+
+
+async def _send_status(layer, robot_id, snapshot):
+    try:
+        await layer.group_send(group_name(robot_id), {
+            'type': 'telemetry.status',
+            'status': snapshot,
+        })
+    except Exception as e:
+        print(f"[telemetry] Error publicando estado: {e}")
+        return
+    # Solo un envío exitoso cuenta como "ya publicado"
+    with _publish_lock:
+        _last_snapshots[robot_id] = snapshot
+
+
+def _forget_task(task):
+    _tasks.discard(task)
+
+
+def publish_status(robot_id):
+    """
+    Difunde el snapshot a los suscriptores del robot solo si cambió respecto
+    al anterior. Se llama desde el hilo lector, el worker de la cola o una
+    vista async: el envío corre siempre en el event loop del servidor.
+    """
+    layer = get_channel_layer()
+    if layer is None:
+        return
+    with _publish_lock:
+        snapshot = status_snapshot(robot_id)
+        if snapshot == _last_snapshots.get(robot_id):
+            return
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is not None:
+        # Vista async: async_to_sync no se puede usar en el hilo del event loop
+        task = running.create_task(_send_status(layer, robot_id, snapshot))
+        _tasks.add(task)
+        task.add_done_callback(_forget_task)
+    elif _loop is not None and _loop.is_running():
+        asyncio.run_coroutine_threadsafe(_send_status(layer, robot_id, snapshot), _loop)
+    else:
+        async_to_sync(_send_status)(layer, robot_id, snapshot)
+
+
+def install(robot_id=None):
+    """
+    Engancha publish_status al controlador y a la cola de movimientos del
+    robot. Se llama con su primer suscriptor, para no crear el controlador antes,
+    y desde su event loop, que es donde se harán los envíos.
+    Retorna el id del robot (RobotNotFound si no existe).
+    """
+    global _loop
+    from .robots import registry
+
+    robot = registry.get(robot_id)
+    with _install_lock:
+        try:
+            _loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        if robot.id not in _installed:
+            robot.add_status_listener(functools.partial(publish_status, robot.id))
+            _installed.add(robot.id)
+    return robot.id
+
+
+# ----------------------------------------------------------------------------------------------------
+# Long-poll de /get-status/
+# ----------------------------------------------------------------------------------------------------
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class StatusWatch:
+    """
+    Versión del estado de un robot, que sube con cada aviso del controlador
+    o de la cola. notify() se llama desde cualquier hilo y despierta a las
+    corrutinas que esperan en wait(), en su propio event loop.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._waiters = set()
+        self._lock = threading.Lock()
+
+    def notify(self):
+        with self._lock:
+            self.version += 1
+            waiters, self._waiters = self._waiters, set()
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+    async def wait(self, version, timeout):
+        """Espera hasta que la versión deje de ser `version` o pasen `timeout` s; retorna la actual."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        entry = (loop, future)
+        with self._lock:
+            if self.version != version:
+                return self.version
+            self._waiters.add(entry)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._waiters.discard(entry)
+        return self.version
+
+
+_watches = {}
+
+
+def status_watch(robot_id=None):
+    """StatusWatch del robot, enganchada a sus avisos de estado al primer uso."""
+    from .robots import registry
+
+    robot = registry.get(robot_id)
+    with _install_lock:
+        watch = _watches.get(robot.id)
+        if watch is None:
+            watch = _watches[robot.id] = StatusWatch()
+            robot.add_status_listener(watch.notify)
+    return watch
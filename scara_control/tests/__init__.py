@@ -0,0 +1,21 @@
+from django.test import override_settings
+
+from scara_control import robots
+
+
+def use_robots(test, config):
+    """
+    Arma el registro global con `config` (SCARA_ROBOTS) solo para `test`;
+    al terminar se vuelve a armar con los settings originales.
+    """
+    # Las limpiezas corren en orden inverso: primero se restauran los settings
+    test.addCleanup(robots.reset_registry)
+    override = override_settings(SCARA_ROBOTS=config, SCARA_DAEMON_SOCKET='', SCARA_DEFAULT_ROBOT='')
+    override.enable()
+    test.addCleanup(override.disable)
+    return robots.reset_registry()
+
+
+def fake_robots(test, *robot_ids):
+    """use_robots() con robots simulados: 'default' más `robot_ids`."""
+    return use_robots(test, {robot_id: {'fake': True} for robot_id in (robots.DEFAULT_ROBOT,) + robot_ids})
@@ -0,0 +1,92 @@
+from django.test import TestCase
+
+from scara_control.models import RobotPosition, RobotSequence, SequencePosition
+
+
+def create_position(i):
+    return RobotPosition.objects.create(name=f'p{i}', arm1_angle=i, arm2_angle=0, base_height=0, gripper_state=0)
+
+
+class ListEtagTests(TestCase):
+
+    def setUp(self):
+        self.position = create_position(1)
+        sequence = RobotSequence.objects.create(name='ciclo')
+        SequencePosition.objects.create(sequence=sequence, position=self.position, order=1)
+
+    def get(self, url, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url, **headers)
+
+    def test_matching_etag_is_answered_without_queries(self):
+        first = self.get('/positions/')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first['Cache-Control'], 'no-cache')
+        with self.assertNumQueries(0):
+            again = self.get('/positions/', first['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], first['ETag'])
+        self.assertEqual(self.get('/positions/', f"W/{first['ETag']}").status_code, 304)
+
+    def test_cached_body_is_reused(self):
+        first = self.get('/positions/')
+        with self.assertNumQueries(0):
+            again = self.get('/positions/')
+        self.assertEqual(again.content, first.content)
+
+    def test_changing_a_position_invalidates_positions_and_sequences(self):
+        positions = self.get('/positions/')
+        sequences = self.get('/sequences/')
+
+        self.position.arm1_angle = 42
+        self.position.save()
+
+        changed = self.get('/positions/', positions['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], positions['ETag'])
+        self.assertEqual(changed.json()[0]['arm1_angle'], 42)
+        nested = self.get('/sequences/', sequences['ETag'])
+        self.assertEqual(nested.status_code, 200)
+        self.assertEqual(nested.json()[0]['positions'][0]['position']['arm1_angle'], 42)
+
+    def test_delete_invalidates(self):
+        first = self.get('/positions/')
+        create_position(2).delete()
+        self.assertEqual(self.get('/positions/', first['ETag']).status_code, 200)
+
+    def test_etag_depends_on_the_query(self):
+        full = self.get('/positions/')
+        page = self.get('/positions/?page_size=1')
+        self.assertNotEqual(full['ETag'], page['ETag'])
+        self.assertEqual(self.get('/positions/?page_size=1', full['ETag']).status_code, 200)
+
+
+class CursorPaginationTests(TestCase):
+
+    def setUp(self):
+        self.ids = [create_position(i).id for i in range(25)]
+
+    def walk(self, url, during=None):
+        ids, pages = [], 0
+        while url:
+            body = self.client.get(url).json()
+            ids.extend(item['id'] for item in body['results'])
+            url = body['next']
+            pages += 1
+            if during and pages == 1:
+                during()
+        return ids, pages
+
+    def test_walks_every_row_once(self):
+        ids, pages = self.walk('/positions/?page_size=7')
+        self.assertEqual(ids, self.ids)
+        self.assertEqual(pages, 4)
+
+    def test_rows_inserted_while_walking(self):
+        added = []
+        ids, _ = self.walk('/positions/?page_size=7', lambda: added.append(create_position(99).id))
+        self.assertEqual(ids, self.ids + added)
+
+    def test_without_pagination_params_returns_the_full_list(self):
+        body = self.client.get('/positions/').json()
+        self.assertEqual([item['id'] for item in body], self.ids)
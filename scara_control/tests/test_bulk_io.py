@@ -0,0 +1,160 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from scara_control import bulk_io
+from scara_control.models import RobotPosition, RobotSequence, SequencePosition
+
+
+def sequence_shapes():
+    """(nombre, [(order, arm1), ...]) de cada secuencia, en orden de id."""
+    return [
+        (sequence.name, [
+            (step.order, step.position.arm1_angle)
+            for step in sequence.sequenceposition_set.select_related('position').order_by('order')
+        ])
+        for sequence in RobotSequence.objects.order_by('id')
+    ]
+
+
+class SequenceCsvTests(TestCase):
+
+    def setUp(self):
+        for name, arm1s in [('pick', [10, 20]), ('vacía', []), ('pick', [30])]:
+            sequence = RobotSequence.objects.create(name=name)
+            for order, arm1 in enumerate(arm1s, start=1):
+                position = RobotPosition.objects.create(
+                    name=f'{name}-{order}', arm1_angle=arm1, arm2_angle=0, base_height=0, gripper_state=0,
+                )
+                SequencePosition.objects.create(sequence=sequence, position=position, order=order)
+
+    def round_trip(self, fmt):
+        expected = sequence_shapes()
+        lines = list(bulk_io.export_sequences(fmt))
+        RobotSequence.objects.all().delete()
+        bulk_io.import_sequences(bulk_io.read_sequences(lines, fmt))
+        self.assertEqual(sequence_shapes(), expected)
+
+    def test_csv_round_trip_keeps_same_named_and_empty_sequences(self):
+        self.round_trip('csv')
+
+    def test_jsonl_round_trip(self):
+        self.round_trip('jsonl')
+
+    def test_empty_sequence_is_one_row(self):
+        lines = list(bulk_io.export_sequences('csv'))
+        empty = RobotSequence.objects.get(name='vacía')
+        self.assertEqual(len(lines), 1 + 4)
+        self.assertEqual(lines[3].strip(), f"{empty.id},vacía" + "," * len(bulk_io.STEP_CSV_FIELDS))
+
+    def test_rows_with_the_same_id_need_not_be_adjacent(self):
+        lines = [
+            'sequence_id,sequence,order,arm1_angle,arm2_angle,base_height\n',
+            '7,a,1,10,0,0\n',
+            '8,a,1,20,0,0\n',
+            '7,a,2,30,0,0\n',
+        ]
+        records = list(bulk_io.read_sequences(lines, 'csv'))
+        self.assertEqual([len(record['positions']) for record in records], [2, 1])
+
+    def test_legacy_csv_groups_consecutive_names(self):
+        lines = [
+            'sequence,order,delay_seconds,arm1_angle,arm2_angle,base_height\n',
+            'a,1,0,10,0,0\n',
+            'a,2,0,20,0,0\n',
+            'b,1,,30,0,0\n',
+            'a,1,0,40,0,0\n',
+        ]
+        records = list(bulk_io.read_sequences(lines, 'csv'))
+        self.assertEqual([record['name'] for record in records], ['a', 'b', 'a'])
+        self.assertEqual([len(record['positions']) for record in records], [2, 1, 1])
+        self.assertEqual(records[1]['positions'][0]['delay_seconds'], 1.0)
+
+    def test_invalid_step_reports_its_line(self):
+        lines = ['sequence_id,sequence,order,arm1_angle,arm2_angle,base_height\n', '1,a,uno,10,0,0\n']
+        with self.assertRaisesMessage(bulk_io.BulkImportError, 'Línea 2'):
+            list(bulk_io.read_sequences(lines, 'csv'))
+
+
+class SequenceImportBatchTests(TestCase):
+
+    def record(self, name, *arm1s):
+        return {'name': name, 'positions': [
+            {'order': order, 'delay_seconds': 0.5,
+             'position': {'name': f'p{arm1}', 'arm1_angle': arm1, 'arm2_angle': 0, 'base_height': 0, 'gripper_state': 0}}
+            for order, arm1 in enumerate(arm1s, start=1)
+        ]}
+
+    def test_positions_are_shared_across_batches(self):
+        RobotPosition.objects.create(name='p10', arm1_angle=10.00001, arm2_angle=0, base_height=0, gripper_state=0)
+        records = [self.record(f's{i}', 10, 20 + i % 2) for i in range(5)] + [self.record('vacía')]
+        with mock.patch.object(bulk_io, 'BATCH_SIZE', 2):
+            created = bulk_io.import_sequences(iter(records))
+
+        self.assertEqual(created, (6, 2, 10))
+        self.assertEqual(RobotPosition.objects.count(), 3)
+        self.assertEqual(SequencePosition.objects.filter(position__name='p10').values('position').distinct().count(), 1)
+        self.assertEqual([name for name, _ in sequence_shapes()], ['s0', 's1', 's2', 's3', 's4', 'vacía'])
+
+    def test_records_are_consumed_batch_by_batch(self):
+        consumed = []
+
+        def records():
+            for i in range(6):
+                consumed.append(i)
+                yield self.record(f's{i}', i)
+
+        inserted = []
+        original = bulk_io._import_batch
+
+        def import_batch(batch):
+            inserted.append(len(consumed))
+            return original(batch)
+
+        with mock.patch.object(bulk_io, 'BATCH_SIZE', 2), mock.patch.object(bulk_io, '_import_batch', import_batch):
+            bulk_io.import_sequences(records())
+        self.assertEqual(inserted, [2, 4, 6])
+
+    def test_legacy_csv_is_read_in_streaming(self):
+        read = []
+
+        def lines():
+            for line in ['sequence,order,arm1_angle,arm2_angle,base_height\n', 'a,1,10,0,0\n',
+                         'b,1,20,0,0\n', 'b,2,30,0,0\n']:
+                read.append(line)
+                yield line
+
+        records = bulk_io.read_sequences(lines(), 'csv')
+        self.assertEqual(next(records)['name'], 'a')
+        self.assertEqual(len(read), 3)
+        self.assertEqual(len(next(records)['positions']), 2)
+
+    def test_create_sequence(self):
+        sequence = bulk_io.create_sequence(self.record('una', 5, 6))
+        self.assertEqual(sequence_shapes(), [('una', [(1, 5), (2, 6)])])
+        self.assertEqual(sequence.name, 'una')
+
+
+class ImportValidationViewTests(TestCase):
+
+    def post(self, url, body):
+        response = self.client.post(url, body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()['success'])
+        return response.json()['error']
+
+    def test_json_lines_that_are_not_objects(self):
+        valid = '{"name": "a", "positions": []}\n'
+        self.assertIn('Línea 2', self.post('/sequences/import/', valid + '[1, 2]\n'))
+        self.assertIn('Línea 1', self.post('/sequences/import/', '3\n'))
+        self.assertIn('Línea 1', self.post('/sequences/import/', '{"name": "a", "positions": [5]}\n'))
+        self.assertIn('Línea 1', self.post('/sequences/import/', '{"name": "a", "positions": {"x": 1}}\n'))
+        self.assertIn('Línea 1', self.post('/sequences/import/', '{"positions": [{"position": [1]}]}\n'))
+        self.assertIn('Línea 2', self.post(
+            '/positions/import/', '{"arm1_angle": 1, "arm2_angle": 2, "base_height": 0}\n"texto"\n'
+        ))
+        self.assertEqual(RobotSequence.objects.count(), 0)
+
+    def test_sequence_post_that_is_not_an_object(self):
+        response = self.client.post('/sequences/', '[1]', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,140 @@
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from scara_control import ipc
+from scara_control.mock_arduino_controller import MockArduinoController
+from scara_control.robot_client import DaemonClient
+from scara_control.robot_daemon import RobotDaemon
+from scara_control.robots import Robot, RobotNotFound, RobotRegistry
+
+CONFIG = {'port': '', 'baud': 9600, 'fake': True, 'protocol': 'csv', 'pipeline': 0, 'motion_log': ''}
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("Condición no alcanzada")
+        time.sleep(0.01)
+
+
+class FramingTests(SimpleTestCase):
+
+    def setUp(self):
+        self.a, self.b = socket.socketpair()
+        self.addCleanup(self.a.close)
+        self.addCleanup(self.b.close)
+
+    def test_message_split_across_writes(self):
+        data = ipc.pack({'id': 1, 'values': np.arange(3), 'point': (1.5, 2)})
+        for i in range(0, len(data), 3):
+            self.a.sendall(data[i:i + 3])
+        self.assertEqual(ipc.recv_message(self.b), {'id': 1, 'values': [0, 1, 2], 'point': [1.5, 2]})
+
+    def test_oversized_messages_are_refused(self):
+        with mock.patch.object(ipc, 'MAX_MESSAGE', 16):
+            with self.assertRaises(ipc.IPCError):
+                ipc.pack({'text': 'x' * 32})
+            self.a.sendall(ipc.LENGTH.pack(17) + b'x' * 17)
+            with self.assertRaisesMessage(ipc.IPCError, 'demasiado grande'):
+                ipc.recv_message(self.b)
+
+    def test_closed_connection(self):
+        self.a.sendall(ipc.LENGTH.pack(10) + b'abc')
+        self.a.close()
+        with self.assertRaisesMessage(ipc.IPCError, 'Conexión cerrada'):
+            ipc.recv_message(self.b)
+
+
+class RobotDaemonTests(SimpleTestCase):
+    """Daemon real en un socket temporal, sobre robots con MockArduinoController."""
+
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, True)
+        self.path = os.path.join(tmp, 'robots.sock')
+        self.robots = {
+            robot_id: Robot(robot_id, CONFIG, MockArduinoController(name=robot_id))
+            for robot_id in ('r1', 'r2')
+        }
+        self.daemon = RobotDaemon(self.path, RobotRegistry(self.robots))
+        thread = threading.Thread(target=self.daemon.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(self.daemon.shutdown)
+        wait_until(lambda: self.daemon._server is not None and os.path.exists(self.path))
+        self.client = DaemonClient(self.path)
+        self.addCleanup(self.client._drop)
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+        sock.settimeout(5)
+        self.addCleanup(sock.close)
+        return sock
+
+    def request(self, sock, op, robot=None, *args):
+        ipc.send_message(sock, {'id': 7, 'op': op, 'robot': robot, 'args': list(args)})
+        return ipc.recv_message(sock)
+
+    def test_submit_position_and_wait(self):
+        job = self.client.call('submit_position', 'r2', 10, 20, 1, 0, 500)
+        self.assertIn(job['state'], ('queued', 'running', 'done'))
+        done = self.client.call('job_wait', None, job['job_id'], 5)
+        self.assertEqual(done['state'], 'done')
+        self.assertEqual(self.client.call('last_position', 'r2')['arm1'], 10)
+        self.assertEqual(self.client.call('last_position', 'r1')['arm1'], 0)
+        # Operaciones globales: sin robot, por id único
+        self.assertEqual(self.client.call('find_job', None, job['job_id'])['robot'], 'r2')
+        self.assertEqual(self.client.call('ping')['robots'], ['r1', 'r2'])
+
+    def test_unknown_op(self):
+        response = self.request(self.connect(), 'fly', 'r1')
+        self.assertEqual(response, {'id': 7, 'ok': False, 'error': 'Operación desconocida: fly', 'kind': 'ValueError'})
+        with self.assertRaises(ipc.RemoteError) as raised:
+            self.client.call('fly', 'r1')
+        self.assertEqual(raised.exception.kind, 'ValueError')
+
+    def test_unknown_robot(self):
+        response = self.request(self.connect(), 'status', 'r9')
+        self.assertFalse(response['ok'])
+        self.assertEqual(response['kind'], 'RobotNotFound')
+        with self.assertRaises(RobotNotFound):
+            self.client.call('status', 'r9')
+        # La conexión sigue sirviendo después de un error
+        self.assertTrue(self.client.call('is_connected', 'r1'))
+
+    def test_oversized_request_closes_only_that_connection(self):
+        sock = self.connect()
+        sock.sendall(ipc.LENGTH.pack(ipc.MAX_MESSAGE + 1))
+        with self.assertRaises(ipc.IPCError):
+            ipc.recv_message(sock)
+        self.assertEqual(self.client.call('ping')['robots'], ['r1', 'r2'])
+
+    def test_subscribe_sends_status_events_until_closed(self):
+        robot = self.robots['r1']
+        sock = self.connect()
+        ipc.send_message(sock, {'id': 1, 'op': 'subscribe', 'robot': 'r1', 'args': []})
+        # Respuesta y estado inicial, en cualquier orden
+        first = [ipc.recv_message(sock), ipc.recv_message(sock)]
+        self.assertIn({'id': 1, 'ok': True, 'result': 'r1'}, first)
+        initial = next(message for message in first if message.get('event') == 'status')
+        self.assertEqual(initial['robot'], 'r1')
+        self.assertEqual(len(robot.queue._status_listeners), 1)
+
+        self.client.call('job_wait', None, self.client.call('submit_position', 'r1', 30, 0, 0, 0, 500)['job_id'], 5)
+        while True:
+            event = ipc.recv_message(sock)
+            if event['status']['last_position']['arm1'] == 30:
+                break
+
+        sock.close()
+        wait_until(lambda: not robot.queue._status_listeners and not robot.controller._status_listeners)
@@ -0,0 +1,175 @@
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from scara_control.arduino_communication import ArduinoController
+from scara_control.jog import STICK_MAX, JogController, StickJog
+from scara_control.motion_queue import MotionQueue
+from scara_control.ps4_controller import SCARAPS4Controller
+from scara_control.simulator import VirtualArduino
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("Condición no alcanzada")
+        time.sleep(0.01)
+
+
+class GatedController:
+    """
+    Controlador de prueba: send_position bloquea hasta que el test abre la
+    compuerta, como un movimiento largo; el streaming se confirma al instante.
+    """
+
+    pipeline_window = 0
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.sent = []          # (arm1, arm2, base) de cada send_position
+        self.streamed = []
+        self.position = {'arm1': 0.0, 'arm2': 0.0, 'base': 0.0, 'gripper': 0, 'speed': 500}
+
+    def send_position(self, arm1, arm2, base, gripper, speed=500):
+        self.sent.append((arm1, arm2, base))
+        self.gate.wait(5)
+        self.position.update(arm1=arm1, arm2=arm2, base=base, gripper=gripper, speed=speed)
+        return True
+
+    def stream_position(self, arm1, arm2, base, gripper, speed=500):
+        self.streamed.append((arm1, arm2, base))
+        return True
+
+    def wait_for_stream(self, max_outstanding=0, timeout=None):
+        return True
+
+    def get_last_position(self):
+        return dict(self.position)
+
+
+class JogControllerTests(SimpleTestCase):
+
+    def setUp(self):
+        self.controller = GatedController()
+        self.queue = MotionQueue(self.controller)
+        self.jog = JogController(self.queue, max_rate=1000)
+        self.addCleanup(self.controller.gate.set)
+
+    def test_only_the_latest_target_is_sent(self):
+        self.jog.jog(d_arm1=1)
+        wait_until(lambda: len(self.controller.sent) == 1)
+        # Mientras el primero se mueve llegan diez pulsaciones más
+        for _ in range(10):
+            self.jog.jog(d_arm1=1)
+        self.assertEqual(self.jog.current_target()['arm1'], 11)
+
+        self.controller.gate.set()
+        wait_until(lambda: self.jog.sent == 2 and self.jog.current_target() == self.controller.get_last_position())
+        self.assertEqual(self.controller.sent, [(1, 0, 0), (11, 0, 0)])
+        self.assertEqual(self.jog.coalesced, 9)
+
+    def test_targets_are_clamped_and_cancel_drops_the_pending_one(self):
+        self.jog.jog(d_arm1=1)
+        wait_until(lambda: len(self.controller.sent) == 1)
+        self.assertEqual(self.jog.jog(d_arm1=500)['arm1'], 90)
+        self.jog.cancel()
+
+        self.controller.gate.set()
+        wait_until(lambda: self.jog.sent == 1)
+        time.sleep(0.05)
+        self.assertEqual(self.controller.sent, [(1, 0, 0)])
+
+    def test_ps4_buttons_feed_the_jog_controller(self):
+        ps4 = SCARAPS4Controller(interface='/dev/null', connecting_using_ds4drv=False)
+        with mock.patch('scara_control.ps4_controller.jog_controller', self.jog):
+            ps4.on_x_press()
+            wait_until(lambda: len(self.controller.sent) == 1)
+            for _ in range(4):
+                ps4.on_x_press()
+            ps4.on_square_press()
+            self.controller.gate.set()
+            wait_until(lambda: self.jog.sent == 2)
+        self.assertEqual(self.controller.sent, [(5, 0, 0), (25, 5, 0)])
+
+
+class StickJogSessionTests(SimpleTestCase):
+
+    def setUp(self):
+        self.controller = GatedController()
+        self.controller.gate.set()
+        self.queue = MotionQueue(self.controller)
+        self.stick = StickJog(self.queue, rate=100.0, idle_timeout=0.1)
+
+    def wait_session_end(self):
+        wait_until(lambda: not self.stick._active and self.queue.is_idle())
+
+    def test_deflection_starts_one_session_until_idle(self):
+        self.stick.set_axis('arm1', STICK_MAX)
+        self.stick.set_axis('arm2', -STICK_MAX)
+        wait_until(lambda: len(self.controller.streamed) >= 5)
+        self.assertEqual(self.stick.sessions, 1)
+
+        self.stick.release('arm1')
+        self.stick.release('arm2')
+        self.wait_session_end()
+        streamed = len(self.controller.streamed)
+        # La posición final se confirma con un send_position
+        self.assertEqual(len(self.controller.sent), 1)
+        arm1, arm2, _ = self.controller.sent[0]
+        self.assertEqual(self.controller.streamed[-1][:2], (arm1, arm2))
+        self.assertGreater(arm1, 0)
+        self.assertLess(arm2, 0)
+        time.sleep(0.05)
+        self.assertEqual(len(self.controller.streamed), streamed)
+
+    def test_new_deflection_after_idle_opens_another_session(self):
+        self.stick.set_axis('arm1', STICK_MAX)
+        wait_until(lambda: self.controller.streamed)
+        self.stick.release('arm1')
+        self.wait_session_end()
+        first = self.controller.sent[0][0]
+
+        self.stick.set_axis('arm1', -STICK_MAX)
+        wait_until(lambda: self.stick.sessions == 2 and self.controller.streamed[-1][0] < first)
+        self.stick.release('arm1')
+        self.wait_session_end()
+        self.assertEqual(len(self.controller.sent), 2)
+        self.assertLess(self.controller.sent[1][0], first)
+
+    def test_deadzone_and_disabled_sticks_do_not_move(self):
+        self.stick.set_axis('arm1', int(STICK_MAX * self.stick.deadzone / 2))
+        self.stick.enabled = False
+        self.stick.set_axis('arm1', STICK_MAX)
+        time.sleep(0.05)
+        self.assertEqual(self.stick.sessions, 0)
+        self.assertEqual(self.controller.streamed, [])
+
+
+class StickJogSimulatorTests(SimpleTestCase):
+    """Stick sostenido contra el simulador en CSV, que descarta las líneas que llegan pegadas."""
+
+    def setUp(self):
+        self.sim = VirtualArduino(time_scale=0.2, baud=0, boot_delay=0.3)
+        self.sim.start()
+        self.addCleanup(self.sim.stop)
+        self.controller = ArduinoController(self.sim.port, name='jog-test')
+        self.controller.connect()
+        self.addCleanup(self.controller.close)
+        self.assertTrue(self.controller.is_connected)
+        self.queue = MotionQueue(self.controller)
+
+    def test_held_stick_does_not_outrun_the_firmware(self):
+        # A 50 Hz el firmware (bloquea en cada punto) queda atrás del envío
+        stick = StickJog(self.queue, rate=50.0, idle_timeout=0.1)
+        stick.set_axis('arm1', STICK_MAX)
+        time.sleep(1.0)
+        stick.release('arm1')
+        wait_until(lambda: not stick._active and self.queue.is_idle(), timeout=10)
+
+        self.assertEqual(stick.sessions, 1)
+        self.assertGreater(stick.points, 0)
+        self.assertEqual(self.sim.commands_received, stick.points + 1)
+        self.assertEqual(self.controller.stream_outstanding(), 0)
@@ -0,0 +1,142 @@
+import json
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from scara_control import kinematics, robots
+from scara_control.arduino_communication import ARM1_LIMITS, ARM2_LIMITS
+from scara_control.tests import fake_robots
+
+L1, L2 = kinematics.DEFAULT_LINK_LENGTHS
+
+
+@override_settings(SCARA_LINK_LENGTHS=kinematics.DEFAULT_LINK_LENGTHS)
+class KinematicsTests(SimpleTestCase):
+
+    def joint_grid(self):
+        """
+        Ángulos que cubren el rango de las articulaciones, medio grado hacia
+        adentro (en el límite exacto el redondeo de la IK puede quedar afuera)
+        y sin el codo estirado.
+        """
+        arm1, arm2 = np.meshgrid(
+            np.linspace(ARM1_LIMITS[0] + 0.5, ARM1_LIMITS[1] - 0.5, 37),
+            np.concatenate([np.linspace(ARM2_LIMITS[0] + 0.5, -1, 30), np.linspace(1, ARM2_LIMITS[1] - 0.5, 15)]),
+        )
+        return arm1.ravel(), arm2.ravel()
+
+    def test_forward_inverse_round_trip(self):
+        arm1, arm2 = self.joint_grid()
+        x, y = kinematics.forward(arm1, arm2)
+
+        for elbow in ('auto', 'up', 'down'):
+            a1, a2, _, valid = kinematics.inverse(x, y, elbow=elbow)
+            self.assertTrue(np.isfinite(a1[valid]).all())
+            fx, fy = kinematics.forward(a1[valid], a2[valid])
+            np.testing.assert_allclose(fx, x[valid], atol=1e-9)
+            np.testing.assert_allclose(fy, y[valid], atol=1e-9)
+
+        # Todo punto alcanzado por ángulos en rango tiene solución en 'auto'
+        self.assertTrue(kinematics.inverse(x, y)[3].all())
+
+    def test_inverse_recovers_the_angles_of_the_matching_elbow(self):
+        arm1, arm2 = self.joint_grid()
+        x, y = kinematics.forward(arm1, arm2)
+        up = arm2 > 0
+
+        a1, a2, _, valid = kinematics.inverse(x[up], y[up], elbow='up')
+        self.assertTrue(valid.all())
+        np.testing.assert_allclose(a1, arm1[up], atol=1e-7)
+        np.testing.assert_allclose(a2, arm2[up], atol=1e-7)
+
+        a1, a2, _, valid = kinematics.inverse(x[~up], y[~up], elbow='down')
+        self.assertTrue(valid.all())
+        np.testing.assert_allclose(a1, arm1[~up], atol=1e-7)
+        np.testing.assert_allclose(a2, arm2[~up], atol=1e-7)
+
+    def test_unreachable_points(self):
+        # Fuera del anillo [L1 - L2, L1 + L2] y detrás del hombro
+        x = np.array([L1 + L2 + 1, 0, (L1 - L2) / 2, -100])
+        y = np.array([0, L1 + L2 + 0.5, 0, 0])
+        *_, reachable = kinematics.inverse_both(x, y)
+        self.assertEqual(reachable.tolist(), [False, False, False, True])
+
+        a1, a2, _, valid = kinematics.inverse(x, y)
+        self.assertFalse(valid.any())   # El último está en el anillo pero fuera de ±90° en arm1
+        self.assertTrue(np.isnan(a1[:3]).all() and np.isnan(a2[:3]).all())
+
+    def test_base_out_of_range_is_invalid(self):
+        x, y = kinematics.forward(10, 20)
+        *_, valid = kinematics.inverse([x, x], [y, y], [0, 20])
+        self.assertEqual(valid.tolist(), [True, False])
+
+    def test_auto_prefers_up_and_falls_back_to_down(self):
+        # Ambos codos dentro de los límites: 'auto' elige 'up' (arm2 > 0)
+        x, y = kinematics.forward(-20, 40)
+        a1, a2, _, valid = kinematics.inverse(x, y)
+        self.assertTrue(valid)
+        self.assertAlmostEqual(float(a1), -20, places=7)
+        self.assertAlmostEqual(float(a2), 40, places=7)
+
+        # 'up' necesitaría arm2 = 100° (> 60): 'auto' usa 'down'
+        x, y = kinematics.forward(50, -100)
+        self.assertFalse(kinematics.inverse(x, y, elbow='up')[3])
+        a1, a2, _, valid = kinematics.inverse(x, y)
+        self.assertTrue(valid)
+        self.assertAlmostEqual(float(a1), 50, places=7)
+        self.assertAlmostEqual(float(a2), -100, places=7)
+
+    def test_invalid_elbow(self):
+        with self.assertRaises(ValueError):
+            kinematics.inverse(100, 0, elbow='left')
+
+
+@override_settings(SCARA_LINK_LENGTHS=kinematics.DEFAULT_LINK_LENGTHS)
+class CartesianMoveViewTests(SimpleTestCase):
+
+    def setUp(self):
+        fake_robots(self, 'kinematics-test')
+
+    def post(self, payload):
+        response = self.client.post(
+            '/cartesian-move/', json.dumps({'robot': 'kinematics-test', **payload}),
+            content_type='application/json',
+        )
+        return response, response.json()
+
+    def test_dry_run_returns_angles_without_queueing(self):
+        queue = robots.registry.get('kinematics-test').queue
+        before = len(queue.recent_jobs())
+        x, y = kinematics.forward(30, -45)
+        response, body = self.post({'x': float(x), 'y': float(y), 'z': 2, 'elbow': 'down', 'dry_run': True})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(body['success'])
+        solution = body['solutions'][0]
+        self.assertAlmostEqual(solution['arm1'], 30, places=3)
+        self.assertAlmostEqual(solution['arm2'], -45, places=3)
+        self.assertEqual(solution['base'], 2)
+        self.assertEqual(len(queue.recent_jobs()), before)
+
+    def test_unreachable_point_queues_nothing(self):
+        queue = robots.registry.get('kinematics-test').queue
+        before = len(queue.recent_jobs())
+        response, body = self.post({'points': [{'x': 100, 'y': 0}, {'x': 500, 'y': 0}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(body['success'])
+        self.assertEqual(body['unreachable'], [1])
+        self.assertEqual(len(queue.recent_jobs()), before)
+
+    def test_points_are_queued_in_order(self):
+        targets = [(10, 20), (-30, 50)]
+        points = [dict(zip('xy', map(float, kinematics.forward(a1, a2)))) for a1, a2 in targets]
+        response, body = self.post({'points': points, 'elbow': 'auto'})
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(body['success'])
+
+        queue = robots.registry.get('kinematics-test').queue
+        jobs = [queue.get_job(job_id) for job_id in body['job_ids']]
+        for job, (arm1, arm2) in zip(jobs, targets):
+            self.assertTrue(job.wait(5))
+            self.assertEqual(job.state, 'done')
+            self.assertAlmostEqual(job.position[0], arm1, places=3)
+            self.assertAlmostEqual(job.position[1], arm2, places=3)
@@ -0,0 +1,118 @@
+import math
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from scara_control import metrics
+from scara_control.robot_client import RemoteRegistry
+from scara_control.robot_daemon import RobotDaemon
+from scara_control.robots import RobotRegistry
+from scara_control.tests import fake_robots
+
+
+class RenderTests(SimpleTestCase):
+
+    def setUp(self):
+        self.registry = metrics.Registry()
+
+    def test_counter_and_gauge(self):
+        plain = self.registry.counter('demo_total', 'Sin etiquetas.')
+        labelled = self.registry.counter('demo_events_total', 'Con etiquetas.', ('robot', 'result'))
+        gauge = self.registry.gauge('demo_depth', 'Calculado al leer.', ('robot',))
+        labelled.inc(robot='b', result='ok')
+        labelled.inc(2, robot='a', result='say "hi"\n')
+        gauge.set(3, robot='a')
+        gauge.set_function(lambda: 1 / 0, robot='b')
+
+        self.assertEqual(self.registry.render().splitlines(), [
+            '# HELP demo_total Sin etiquetas.',
+            '# TYPE demo_total counter',
+            'demo_total 0',
+            '# HELP demo_events_total Con etiquetas.',
+            '# TYPE demo_events_total counter',
+            'demo_events_total{robot="a",result="say \\"hi\\"\\n"} 2',
+            'demo_events_total{robot="b",result="ok"} 1',
+            '# HELP demo_depth Calculado al leer.',
+            '# TYPE demo_depth gauge',
+            'demo_depth{robot="a"} 3',
+            'demo_depth{robot="b"} nan',
+        ])
+        self.assertEqual(plain.value(), 0)
+        self.assertTrue(math.isnan(gauge.value(robot='b')))
+        with self.assertRaises(ValueError):
+            labelled.inc(robot='a')
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.registry.histogram('demo_seconds', 'Duración.', ('view',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, view='x')
+
+        self.assertEqual(self.registry.render().splitlines(), [
+            '# HELP demo_seconds Duración.',
+            '# TYPE demo_seconds histogram',
+            'demo_seconds_bucket{view="x",le="0.1"} 2',
+            'demo_seconds_bucket{view="x",le="1.0"} 3',
+            'demo_seconds_bucket{view="x",le="+Inf"} 4',
+            'demo_seconds_sum{view="x"} 3.65',
+            'demo_seconds_count{view="x"} 4',
+        ])
+        self.assertEqual(histogram.count(view='x'), 4)
+
+    def test_only_exclude_and_duplicates(self):
+        self.registry.counter('a_total', 'A.')
+        self.registry.counter('b_total', 'B.')
+        self.assertNotIn('b_total', self.registry.render(only=('a_total',)))
+        self.assertNotIn('a_total', self.registry.render(exclude=('a_total',)))
+        with self.assertRaises(ValueError):
+            self.registry.counter('a_total', 'Otra vez.')
+
+
+class MetricsViewTests(TestCase):
+
+    def setUp(self):
+        fake_robots(self)
+
+    def sample(self, text, prefix):
+        lines = [line for line in text.splitlines() if line.startswith(prefix)]
+        return float(lines[0].rsplit(' ', 1)[1]) if lines else 0.0
+
+    def test_requests_are_labelled_by_route(self):
+        count = 'scara_http_request_duration_seconds_count{view="positions_list",method="GET",status="200"}'
+        missing = 'scara_http_request_duration_seconds_count{view="unmatched",method="GET",status="404"}'
+        before = self.client.get('/metrics').content.decode()
+
+        self.client.get('/positions/')
+        self.client.get('/no-existe/')
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        text = response.content.decode()
+        self.assertEqual(self.sample(text, count), self.sample(before, count) + 1)
+        self.assertEqual(self.sample(text, missing), self.sample(before, missing) + 1)
+        self.assertIn('# TYPE scara_commands_total counter', text)
+        self.assertIn('scara_queue_depth{robot="default"}', text)
+
+
+class DaemonMetricsTests(SimpleTestCase):
+    """Con daemon, cada worker exporta sus métricas HTTP y el daemon las del hardware."""
+
+    def setUp(self):
+        metrics.HTTP_DURATION.observe(0.01, view='metrics-test', method='GET', status=200)
+
+    def test_daemon_excludes_api_metrics(self):
+        text = RobotDaemon('', RobotRegistry({})).dispatch('metrics', None, [])
+        self.assertNotIn(metrics.HTTP_DURATION.name, text)
+        self.assertIn('# TYPE scara_commands_total counter', text)
+
+    def test_worker_adds_its_api_metrics_once(self):
+        registry = RemoteRegistry('/nonexistent/robots.sock')
+        # Daemon caído: solo las del worker
+        text = registry.render_metrics()
+        self.assertIn('view="metrics-test"', text)
+        self.assertNotIn('scara_commands_total', text)
+
+        daemon_text = RobotDaemon('', RobotRegistry({})).dispatch('metrics', None, [])
+        with mock.patch.object(registry.client, 'call', return_value=daemon_text):
+            text = registry.render_metrics()
+        self.assertEqual(text.count(f'# TYPE {metrics.HTTP_DURATION.name} histogram'), 1)
+        self.assertEqual(text.count('# TYPE scara_commands_total counter'), 1)
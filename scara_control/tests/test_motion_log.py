@@ -0,0 +1,132 @@
+import io
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from scara_control import motion_log, protocol
+
+
+class MotionLogTests(SimpleTestCase):
+
+    def setUp(self):
+        tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp, True)
+        self.path = tmp / 'motion_log.bin'
+
+    def open(self, capacity=8, **kwargs):
+        log = motion_log.MotionLog(self.path, capacity, **kwargs)
+        self.addCleanup(log._file.close)
+        return log
+
+    def texts(self, path=None):
+        records = motion_log.MotionLogReader(path or self.path).records()
+        return [motion_log.describe(record) for record in records]
+
+    def test_ring_keeps_the_newest_records_in_order(self):
+        log = self.open()
+        for i in range(20):
+            log.record_rx_line(f"linea {i}")
+        records = motion_log.MotionLogReader(self.path).records()
+        self.assertEqual(records['index'].tolist(), list(range(13, 21)))
+        self.assertEqual(self.texts(), [f"linea {i}" for i in range(12, 20)])
+
+    def test_reader_decodes_and_filters(self):
+        log = self.open()
+        log.record_tx(b"10,20,0,0,500\n")
+        log.record_tx(protocol.encode_command(7, 12.5, -3, 1, 1, 800))
+        log.record_rx_frame(7, protocol.STATUS_DONE)
+        log.record_rx_line("x" * 50)
+        records = motion_log.MotionLogReader(self.path).records()
+
+        self.assertEqual([motion_log.describe(record) for record in records], [
+            "10,20,0,0,500",
+            "frame seq=7 12.5,-3.0,1.0,1,800",
+            f"reply seq=7 status={protocol.STATUS_DONE}",
+            "x" * motion_log.PAYLOAD_SIZE + "…",
+        ])
+        self.assertEqual(len(motion_log.filter_records(records, direction='rx')), 2)
+        self.assertEqual(len(motion_log.filter_records(records, kind='frame', seq=7)), 2)
+        self.assertEqual(len(motion_log.filter_records(records, contains='10,20')), 1)
+
+    def test_round_trips_pair_by_seq_and_in_csv_order(self):
+        log = self.open(capacity=32)
+        log.record_tx(b"1,0,0,0,500\n")
+        log.record_tx(b"2,0,0,0,500\n")
+        log.record_rx_line("Datos recibidos: arm1=1.00")
+        log.record_rx_line("DONE")
+        log.record_rx_line("ERROR: fuera de rango")
+        log.record_tx(protocol.encode_command(4, 3, 0, 0, 0, 500))
+        log.record_tx(protocol.encode_command(5, 4, 0, 0, 0, 500))
+        log.record_rx_frame(4, protocol.STATUS_QUEUED)
+        log.record_rx_frame(5, protocol.STATUS_DONE)
+        log.record_rx_frame(4, protocol.STATUS_DONE)
+
+        pairs = motion_log.round_trips(motion_log.MotionLogReader(self.path).records())
+        self.assertEqual([motion_log.describe(command) for command, _ in pairs], [
+            "1,0,0,0,500",
+            "2,0,0,0,500",
+            "frame seq=5 4.0,0.0,0.0,0,500",
+            "frame seq=4 3.0,0.0,0.0,0,500",
+        ])
+        self.assertTrue(all(seconds >= 0 for _, seconds in pairs))
+
+    def test_reopening_continues_the_same_file(self):
+        log = self.open()
+        log.record_rx_line("antes")
+        log.close()
+        log = self.open()
+        log.record_rx_line("después")
+        records = motion_log.MotionLogReader(self.path).records()
+        self.assertEqual(records['index'].tolist(), [1, 2])
+        self.assertEqual(self.texts(), ["antes", "después"])
+        self.assertFalse(self.path.with_name('motion_log.bin.1').exists())
+
+    def test_second_writer_is_refused(self):
+        log = self.open()
+        log.record_rx_line("primero")
+        with self.assertRaises(motion_log.MotionLogBusy):
+            motion_log.MotionLog(self.path, 8)
+        self.assertIsNone(motion_log.open_from_settings(self.path))
+        self.assertEqual(self.texts(), ["primero"])
+
+    def test_reset_and_incompatible_files_rotate(self):
+        backup = self.path.with_name('motion_log.bin.1')
+        log = self.open()
+        log.record_rx_line("sesión 1")
+        log.close()
+
+        log = self.open(reset=True)
+        self.assertEqual(self.texts(backup), ["sesión 1"])
+        self.assertEqual(self.texts(), [])
+        log.record_rx_line("sesión 2")
+        log.close()
+
+        # Otra capacidad: no se puede seguir el mismo anillo
+        self.open(capacity=16)
+        self.assertEqual(self.texts(backup), ["sesión 2"])
+        self.assertEqual(self.texts(self.path.with_name('motion_log.bin.2')), ["sesión 1"])
+
+    def test_other_boot_rotates(self):
+        log = self.open()
+        log.record_rx_line("otro arranque")
+        epoch = motion_log.MotionLogReader(self.path).epoch
+        motion_log.HEADER.pack_into(log._mm, 0, motion_log.MAGIC, motion_log.FORMAT_VERSION,
+                                    motion_log.RECORD_SIZE, 8, epoch - 3600)
+        log.close()
+
+        self.open()
+        self.assertEqual(self.texts(self.path.with_name('motion_log.bin.1')), ["otro arranque"])
+
+    def test_reset_command(self):
+        log = self.open()
+        log.record_rx_line("en uso")
+        with self.assertRaises(CommandError):
+            call_command('motion_log', str(self.path), '--reset', stdout=io.StringIO())
+        log.close()
+
+        call_command('motion_log', str(self.path), '--reset', stdout=io.StringIO())
+        self.assertFalse(self.path.exists())
+        self.assertEqual(self.texts(self.path.with_name('motion_log.bin.1')), ["en uso"])
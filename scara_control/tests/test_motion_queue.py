@@ -0,0 +1,103 @@
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from scara_control.motion_queue import MotionQueue
+
+
+class RecordingController:
+    """Registra los movimientos; con `gate` cerrada cada uno bloquea hasta que el test la abre."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.gate.set()
+        self.sent = []
+        self.started = threading.Event()
+
+    def send_position(self, arm1, arm2, base, gripper, speed=500):
+        self.sent.append(arm1)
+        self.started.set()
+        self.gate.wait(5)
+        return arm1 >= 0        # Ángulo negativo = el firmware contesta ERROR
+
+    def home_position(self):
+        self.sent.append('home')
+        return True
+
+
+class MotionQueueTests(SimpleTestCase):
+
+    def setUp(self):
+        self.controller = RecordingController()
+        self.queue = MotionQueue(self.controller)
+        self.addCleanup(self.controller.gate.set)
+
+    def test_jobs_run_in_submission_order(self):
+        jobs = [self.queue.submit_position(arm1, 0, 0, 0) for arm1 in range(20)]
+        jobs.append(self.queue.submit_home())
+        jobs.append(self.queue.submit(lambda: 'listo', description='función'))
+
+        self.assertTrue(jobs[-1].wait(5))
+        self.assertEqual(self.controller.sent, list(range(20)) + ['home'])
+        self.assertEqual([job.state for job in jobs], ['done'] * len(jobs))
+        self.assertEqual(jobs[-1].result, 'listo')
+        self.assertTrue(self.queue.is_idle())
+        self.assertEqual([job['job_id'] for job in self.queue.recent_jobs(3)], [job.id for job in jobs[:-4:-1]])
+
+    def test_failures_do_not_stop_the_queue(self):
+        failed = self.queue.submit_position(-1, 0, 0, 0)
+        raised = self.queue.submit(lambda: 1 / 0)
+        after = self.queue.submit_position(5, 0, 0, 0)
+
+        self.assertTrue(after.wait(5))
+        self.assertEqual((failed.state, failed.error), ('failed', 'Error enviando comando'))
+        self.assertEqual(raised.state, 'failed')
+        self.assertIn('division', raised.error)
+        self.assertEqual(after.state, 'done')
+
+    def test_submit_does_not_wait_for_the_move(self):
+        self.controller.gate.clear()
+        start = time.monotonic()
+        running = self.queue.submit_position(1, 0, 0, 0)
+        queued = self.queue.submit_position(2, 0, 0, 0)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertTrue(self.controller.started.wait(5))
+        self.assertEqual(running.state, 'running')
+        self.assertEqual(queued.state, 'queued')
+        self.assertEqual(self.queue.pending_count(), 2)
+
+    def test_cancel_only_queued_jobs(self):
+        self.controller.gate.clear()
+        running = self.queue.submit_position(1, 0, 0, 0)
+        self.assertTrue(self.controller.started.wait(5))
+        cancelled = self.queue.submit_position(2, 0, 0, 0)
+        kept = self.queue.submit_position(3, 0, 0, 0)
+
+        self.assertFalse(self.queue.cancel(running))
+        self.assertTrue(self.queue.cancel(cancelled))
+        self.assertFalse(self.queue.cancel(cancelled))
+        self.assertTrue(cancelled.wait(0))
+        self.assertEqual(self.queue.pending_count(), 2)
+
+        self.controller.gate.set()
+        self.assertTrue(kept.wait(5))
+        self.assertEqual(self.controller.sent, [1, 3])
+        self.assertEqual(cancelled.state, 'cancelled')
+        self.assertTrue(self.queue.is_idle())
+
+    def test_history_keeps_unfinished_jobs(self):
+        queue = MotionQueue(self.controller, max_history=5)
+        done = [queue.submit_position(arm1, 0, 0, 0) for arm1 in range(5)]
+        self.assertTrue(done[-1].wait(5))
+
+        self.controller.gate.clear()
+        pending = [queue.submit_position(arm1, 0, 0, 0) for arm1 in range(10, 17)]
+        # Solo se descartan terminados: los 7 sin terminar quedan aunque pasen del límite
+        self.assertIsNone(queue.get_job(done[0].id))
+        self.assertEqual([job['job_id'] for job in queue.recent_jobs()], [job.id for job in reversed(pending)])
+
+        self.controller.gate.set()
+        self.assertTrue(pending[-1].wait(5))
+        queue.submit_position(20, 0, 0, 0).wait(5)
+        self.assertEqual(len(queue.recent_jobs()), 5)
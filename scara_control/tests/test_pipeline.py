@@ -0,0 +1,119 @@
+from django.test import SimpleTestCase
+
+from scara_control import protocol
+from scara_control.arduino_communication import ArduinoController
+from scara_control.simulator import VirtualArduino
+
+
+class LossyArduino(VirtualArduino):
+    """
+    Arduino virtual que pierde, una sola vez, los frames con seq en
+    `drop_frames` (no llegan al firmware) y las respuestas con seq en
+    `drop_replies` (hasta que el host retransmite ese seq).
+    """
+
+    def __init__(self, *args, drop_frames=(), drop_replies=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.drop_frames = set(drop_frames)
+        self.drop_replies = set(drop_replies)
+        self.executed = []      # arm1 de cada comando ejecutado, en orden
+        self.frame_seqs = []    # seq de cada frame recibido, en orden
+
+    def _handle_frame(self, decoded):
+        seq = decoded[0]
+        self.frame_seqs.append(seq)
+        if seq in self.drop_frames:
+            self.drop_frames.discard(seq)
+            return
+        if seq in self.drop_replies and seq in self._recent:
+            self.drop_replies.discard(seq)      # Retransmisión: ya contesta
+        super()._handle_frame(decoded)
+
+    def _execute(self, arm1, arm2, base, grip, speed):
+        self.executed.append(round(arm1, 2))
+        super()._execute(arm1, arm2, base, grip, speed)
+
+    def _write(self, data):
+        if (len(data) == protocol.REPLY_SIZE and data[0] == protocol.REPLY_START
+                and data[1] in self.drop_replies):
+            return
+        super()._write(data)
+
+
+class PipelineTests(SimpleTestCase):
+    """Go-back-N del modo pipeline contra el Arduino virtual."""
+
+    WINDOW = 4
+
+    def connect(self, sim):
+        sim.start()
+        self.addCleanup(sim.stop)
+        controller = ArduinoController(sim.port, name='pipeline-test')
+        controller.pipeline_request = self.WINDOW
+        controller.ack_timeout = 0.1
+        controller.connect()
+        self.addCleanup(controller.close)
+        self.assertEqual(controller.pipeline_window, self.WINDOW)
+        return controller
+
+    def send_all(self, controller, count):
+        """Envía `count` comandos distintos y retorna los arm1 enviados."""
+        targets = [round((i % 90) + 0.25, 2) for i in range(count)]
+        pending = [controller.send_position_async(arm1, 10, 0, 0, 500) for arm1 in targets]
+        for job in pending:
+            self.assertIsNotNone(job)
+            self.assertTrue(job.event.wait(10))
+            self.assertTrue(job.result)
+        self.assertEqual(controller.pipeline_outstanding(), 0)
+        return targets
+
+    def test_dropped_frame_is_resent_with_the_ones_after_it(self):
+        sim = LossyArduino(time_scale=0, baud=0, binary=True, pipeline=self.WINDOW,
+                           boot_delay=0.3, drop_frames={2})
+        controller = self.connect(sim)
+
+        targets = self.send_all(controller, 6)
+
+        self.assertEqual(sim.executed, targets)
+        self.assertGreater(sim.dropped, 0)      # Los que llegaron tras el hueco
+        self.assertGreaterEqual(controller.retransmissions, 1)
+        # Go-back-N: tras el 2 perdido se reenvía desde el 2, en orden
+        resent = sim.frame_seqs[sim.frame_seqs.index(2, 2):]
+        self.assertEqual(resent[:3], [2, 3, 4])
+
+    def test_lost_reply_gets_repeated_for_duplicate_seq(self):
+        # Se pierden QUEUED y DONE del último: nada posterior lo confirma
+        sim = LossyArduino(time_scale=0, baud=0, binary=True, pipeline=self.WINDOW,
+                           boot_delay=0.3, drop_replies={3})
+        controller = self.connect(sim)
+
+        targets = self.send_all(controller, 3)
+
+        self.assertEqual(sim.executed, targets)     # Sin ejecutar dos veces
+        self.assertGreaterEqual(sim.duplicates, 1)
+        self.assertGreaterEqual(controller.retransmissions, 1)
+
+    def test_seq_wraps_past_255(self):
+        # Además se pierde el primer frame después de la vuelta
+        sim = LossyArduino(time_scale=0, baud=0, binary=True, pipeline=self.WINDOW,
+                           boot_delay=0.3, drop_frames={0})
+        controller = self.connect(sim)
+
+        targets = self.send_all(controller, 300)
+
+        self.assertEqual(sim.executed, targets)
+        self.assertIn(255, sim.frame_seqs)
+        self.assertEqual(sim.frame_seqs.count(0), 2)    # El perdido y su reenvío
+        self.assertEqual(protocol.seq_distance(sim.frame_seqs[-1], 255), 300 - 255)
+
+    def test_full_buffer_is_retried_in_order(self):
+        sim = LossyArduino(time_scale=0.01, baud=0, binary=True, pipeline=self.WINDOW,
+                           boot_delay=0.3)
+        controller = self.connect(sim)
+        sim.pipeline = 1    # Buffer más chico que la ventana anunciada: contesta FULL
+
+        targets = self.send_all(controller, 8)
+
+        self.assertEqual(sim.executed, targets)
+        self.assertGreater(sim.dropped, 0)
+        self.assertGreaterEqual(controller.retransmissions, 1)
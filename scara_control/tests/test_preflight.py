@@ -0,0 +1,112 @@
+from django.test import SimpleTestCase, TestCase
+
+from scara_control import motion_model, preflight, robots
+from scara_control.models import RobotPosition, RobotSequence, SequencePosition
+from scara_control.tests import fake_robots
+
+
+def step(order, arm1, arm2, base=0, gripper=0, delay=0.0, **extra):
+    return {'order': order, 'arm1': arm1, 'arm2': arm2, 'base': base, 'gripper': gripper, 'delay': delay, **extra}
+
+
+class EstimateTests(SimpleTestCase):
+
+    def test_empty_sequence(self):
+        report = preflight.estimate([])
+        self.assertEqual(report['steps'], 0)
+        self.assertEqual(report['cycle_time'], 0)
+        self.assertTrue(report['valid'])
+        self.assertEqual(report['details'], [])
+        self.assertEqual(report['slowest_steps'], [])
+        self.assertEqual(report['start'], preflight.HOME)
+
+    def test_matches_motion_model(self):
+        steps = [step(1, 30, -20, 2, gripper=1, delay=1.5), step(2, -10, 45, 0, speed=1200), step(3, -10, 45, 0)]
+        report = preflight.estimate(steps)
+
+        # Lo mismo paso a paso con motion_model, como lo ejecuta loop()
+        current, expected = (0, 0, 0), []
+        for s, servo in zip(steps, (motion_model.SERVO_DELAY, motion_model.SERVO_DELAY, 0.0)):
+            target = motion_model.joint_steps(s['arm1'], s['arm2'], s['base'])
+            expected.append(servo + motion_model.move_time(current, target, s.get('speed', 500)) + s['delay'])
+            current = target
+
+        self.assertEqual([d['total_time'] for d in report['details']], [round(t, 3) for t in expected])
+        self.assertAlmostEqual(report['cycle_time'], sum(expected), places=2)
+        self.assertEqual(report['servo_time'], 2 * motion_model.SERVO_DELAY)
+        self.assertEqual(report['delay_time'], 1.5)
+        self.assertEqual(report['details'][2]['move_time'], 0)
+        self.assertIsNone(report['details'][2]['limiting_axis'])
+        self.assertEqual(report['slowest_steps'][0], 1)
+        self.assertTrue(report['valid'])
+
+    def test_out_of_range_steps_are_flagged(self):
+        steps = [
+            step(1, 10, 10),
+            step(2, 120, 10, speed=5000),      # send_position recortaría arm1 y speed
+            step(3, 10, 10, gripper=2, delay=-1),
+        ]
+        report = preflight.estimate(steps)
+
+        self.assertFalse(report['valid'])
+        self.assertEqual(report['clamped_steps'], [2])
+        self.assertEqual(report['out_of_range_steps'], [3])
+        self.assertEqual(report['details'][1]['clamped'], {'arm1': 120.0, 'speed': 5000.0})
+        self.assertEqual(report['details'][1]['arm1'], 90)
+        self.assertEqual(sorted(report['details'][2]['out_of_range']), ['delay', 'gripper'])
+        self.assertEqual(report['details'][2]['delay'], 0)
+
+    def test_start_position(self):
+        steps = [step(1, 30, -20, 2, gripper=1)]
+        start = {'arm1': 30, 'arm2': -20, 'base': 2, 'gripper': True}
+
+        from_home = preflight.estimate(steps)['details'][0]
+        from_start = preflight.estimate(steps, start)['details'][0]
+        self.assertGreater(from_home['move_time'], 0)
+        self.assertEqual(from_home['servo_time'], motion_model.SERVO_DELAY)
+        self.assertEqual(from_start['move_time'], 0)
+        self.assertEqual(from_start['servo_time'], 0)
+
+
+class SequenceDryRunViewTests(TestCase):
+
+    def setUp(self):
+        fake_robots(self, 'preflight-test')
+        self.sequence = RobotSequence.objects.create(name='ciclo')
+        for order, (arm1, arm2) in enumerate([(40, -30), (-20, 50)], start=1):
+            position = RobotPosition.objects.create(
+                name=f'p{order}', arm1_angle=arm1, arm2_angle=arm2, base_height=1, gripper_state=0,
+            )
+            SequencePosition.objects.create(sequence=self.sequence, position=position, order=order, delay_seconds=0.5)
+
+    def dry_run(self, query=''):
+        return self.client.get(f'/sequences/{self.sequence.id}/dry-run/?robot=preflight-test{query}')
+
+    def test_starts_from_robot_position_or_home(self):
+        robot = robots.registry.get('preflight-test')
+        self.assertTrue(robot.queue.submit_position(40, -30, 1, 0, 500).wait(5))
+
+        body = self.dry_run().json()
+        self.assertTrue(body['success'])
+        self.assertEqual(body['robot'], 'preflight-test')
+        self.assertEqual(body['sequence_name'], 'ciclo')
+        self.assertEqual(body['start']['arm1'], 40)
+        self.assertEqual(body['details'][0]['move_time'], 0)
+
+        home = self.dry_run('&from=home').json()
+        self.assertEqual(home['start'], preflight.HOME)
+        self.assertGreater(home['details'][0]['move_time'], 0)
+        self.assertEqual(home['details'][1]['total_time'], body['details'][1]['total_time'])
+        self.assertGreater(home['cycle_time'], body['cycle_time'])
+
+    def test_empty_sequence(self):
+        empty = RobotSequence.objects.create(name='vacía')
+        body = self.client.get(f'/sequences/{empty.id}/dry-run/?robot=preflight-test').json()
+        self.assertTrue(body['success'])
+        self.assertEqual(body['steps'], 0)
+        self.assertEqual(body['cycle_time'], 0)
+
+    def test_unknown_sequence(self):
+        response = self.client.get('/sequences/9999/dry-run/?robot=preflight-test')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.json()['success'])
@@ -0,0 +1,148 @@
+from django.test import SimpleTestCase, override_settings
+
+from scara_control import protocol
+from scara_control.arduino_communication import (
+    ARM1_LIMITS, ARM2_LIMITS, BASE_LIMITS, SPEED_LIMITS, ArduinoController, build_controller,
+)
+from scara_control.simulator import VirtualArduino
+
+
+class Crc16Tests(SimpleTestCase):
+
+    def test_known_vectors(self):
+        # CRC-16/CCITT-FALSE: valor de control estándar y casos borde
+        self.assertEqual(protocol.crc16(b"123456789"), 0x29B1)
+        self.assertEqual(protocol.crc16(b""), 0xFFFF)
+        self.assertEqual(protocol.crc16(b"A"), 0xB915)
+        self.assertEqual(protocol.crc16(bytes(range(256))), 0x3FBD)
+
+
+class FrameTests(SimpleTestCase):
+
+    def test_command_round_trip(self):
+        frame = protocol.encode_command(300, 12.34, -56.78, 3.5, 1, 750)
+        self.assertEqual(len(frame), protocol.COMMAND_SIZE)
+        self.assertEqual(frame[0], protocol.COMMAND_START)
+        self.assertEqual(protocol.decode_command(frame), (300 & 0xFF, 12.34, -56.78, 3.5, 1, 750))
+
+    def test_command_with_bad_crc_is_rejected(self):
+        frame = bytearray(protocol.encode_command(1, 10, 20, 0, 0, 500))
+        frame[3] ^= 0x01
+        self.assertIsNone(protocol.decode_command(bytes(frame)))
+
+    def test_reply_round_trip(self):
+        decoder = protocol.reply_decoder(binary=True)
+        for status in (protocol.STATUS_DONE, protocol.STATUS_ERROR, protocol.STATUS_BAD_CRC,
+                       protocol.STATUS_QUEUED, protocol.STATUS_FULL):
+            frame = protocol.encode_reply(257, status)
+            self.assertEqual(len(frame), protocol.REPLY_SIZE)
+            self.assertEqual(decoder.feed(frame), [('frame', (1, status))])
+
+    def test_seq_distance_wraps(self):
+        self.assertEqual(protocol.seq_distance(2, 254), 4)
+        self.assertEqual(protocol.seq_distance(254, 2), 252)
+        self.assertEqual(protocol.seq_distance(7, 7), 0)
+
+
+class StreamDecoderTests(SimpleTestCase):
+
+    def test_mixed_text_and_frames_byte_by_byte(self):
+        done = protocol.encode_reply(5, protocol.STATUS_DONE)
+        queued = protocol.encode_reply(6, protocol.STATUS_QUEUED)
+        data = b"Sistema iniciado\r\n" + done + b"Datos recibidos\r\n" + queued + b"\r\n"
+        decoder = protocol.reply_decoder(binary=True)
+        events = []
+        for i in range(len(data)):
+            events.extend(decoder.feed(data[i:i + 1]))
+        self.assertEqual(events, [
+            ('line', "Sistema iniciado"),
+            ('frame', (5, protocol.STATUS_DONE)),
+            ('line', "Datos recibidos"),
+            ('frame', (6, protocol.STATUS_QUEUED)),
+        ])
+
+    def corrupted(self, seq):
+        bad = bytearray(protocol.encode_reply(seq, protocol.STATUS_DONE))
+        bad[-1] ^= 0xFF
+        return bytes(bad)
+
+    def test_frames_right_after_a_bad_crc_frame_are_decoded(self):
+        # seq 10 es 0x0A: no debe leerse como fin de línea
+        data = (self.corrupted(9) + protocol.encode_reply(10, protocol.STATUS_DONE)
+                + protocol.encode_reply(11, protocol.STATUS_QUEUED))
+        expected = [('frame', (10, protocol.STATUS_DONE)), ('frame', (11, protocol.STATUS_QUEUED))]
+        self.assertEqual(protocol.reply_decoder(binary=True).feed(data), expected)
+
+        decoder = protocol.reply_decoder(binary=True)
+        events = []
+        for i in range(len(data)):
+            events.extend(decoder.feed(data[i:i + 1]))
+        self.assertEqual(events, expected)
+
+    def test_truncated_frame_resyncs_on_the_next_start_byte(self):
+        data = self.corrupted(3)[:3] + protocol.encode_reply(10, protocol.STATUS_DONE)
+        self.assertEqual(protocol.reply_decoder(binary=True).feed(data), [('frame', (10, protocol.STATUS_DONE))])
+
+    def test_text_after_a_bad_crc_frame_is_kept(self):
+        data = self.corrupted(9) + b"Datos recibidos\r\n" + protocol.encode_reply(4, protocol.STATUS_DONE)
+        self.assertEqual(protocol.reply_decoder(binary=True).feed(data), [
+            ('line', "Datos recibidos"),
+            ('frame', (4, protocol.STATUS_DONE)),
+        ])
+
+    def test_csv_mode_ignores_frames(self):
+        decoder = protocol.command_decoder(binary=False)
+        frame = protocol.encode_command(1, 10, 20, 0, 0, 500)
+        events = decoder.feed(b"10,20,0,0,500\n" + frame)
+        self.assertEqual(events, [('line', "10,20,0,0,500")])
+
+
+class NegotiationTests(SimpleTestCase):
+    """PROTO BIN contra el Arduino virtual, con y sin soporte binario."""
+
+    def connect(self, binary):
+        sim = VirtualArduino(time_scale=0, baud=0, binary=binary, boot_delay=0.3)
+        sim.start()
+        self.addCleanup(sim.stop)
+        controller = ArduinoController(sim.port, name='protocol-test')
+        controller.connect()
+        self.addCleanup(controller.close)
+        self.assertTrue(controller.is_connected)
+        return sim, controller
+
+    def test_firmware_without_binary_falls_back_to_csv(self):
+        sim, controller = self.connect(binary=False)
+        self.assertEqual(controller.protocol_mode, 'csv')
+        self.assertTrue(controller.send_position(10, 20, 0, 0, 500))
+        self.assertEqual(sim.commands_received, 1)
+
+    def test_firmware_with_binary_switches_to_frames(self):
+        sim, controller = self.connect(binary=True)
+        self.assertEqual(controller.protocol_mode, 'binary')
+        self.assertTrue(controller.send_position(10, 20, 0, 0, 500))
+        self.assertEqual(sim.commands_received, 1)
+
+
+@override_settings(SCARA_ROBOTS={
+    'mock-csv': {'fake': True, 'protocol': 'auto'},
+    'mock-binary': {'fake': True, 'protocol': 'binary'},
+})
+class MockControllerTests(SimpleTestCase):
+    """El simulado sigue SCARA_PROTOCOL y limita los comandos como el controlador real."""
+
+    def test_protocol_follows_the_config(self):
+        self.assertEqual(build_controller('mock-csv').protocol_mode, 'csv')
+        self.assertEqual(build_controller('mock-binary').protocol_mode, 'binary')
+
+    def test_both_modes_clamp(self):
+        for robot_id in ('mock-csv', 'mock-binary'):
+            with self.subTest(robot_id):
+                controller = build_controller(robot_id)
+                self.assertTrue(controller.send_position(500, -500, 99, 1, 50000))
+                position = controller.get_last_position()
+                self.assertEqual(
+                    (position['arm1'], position['arm2'], position['base'], position['speed']),
+                    (ARM1_LIMITS[1], ARM2_LIMITS[0], BASE_LIMITS[1], SPEED_LIMITS[1]),
+                )
+                self.assertTrue(controller.send_position(12.5, -3, 1, 0, 800))
+                self.assertEqual(controller.get_last_position()['arm1'], 12.5)
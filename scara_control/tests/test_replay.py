@@ -0,0 +1,68 @@
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from scara_control import motion_log, replay
+from scara_control.arduino_communication import ArduinoController
+from scara_control.simulator import VirtualArduino
+
+TIME_SCALE = 0.2
+
+
+class SessionReplayTests(SimpleTestCase):
+    """Graba una sesión corta contra el simulador y la reproduce acelerada contra otro."""
+
+    def setUp(self):
+        tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp, True)
+        self.tmp = tmp
+
+    def connect(self, time_scale, log_path):
+        sim = VirtualArduino(time_scale=time_scale, baud=0, boot_delay=0.3)
+        sim.start()
+        self.addCleanup(sim.stop)
+        controller = ArduinoController(sim.port, name='replay-test')
+        log = motion_log.MotionLog(log_path, 1024, reset=True)
+        self.addCleanup(log.close)
+        controller.motion_log = log
+        controller.connect()
+        self.addCleanup(controller.close)
+        self.assertTrue(controller.is_connected)
+        return sim, controller
+
+    def record_session(self):
+        _, controller = self.connect(TIME_SCALE, self.tmp / 'session.bin')
+        for arm1 in (10, 20, 30):
+            self.assertTrue(controller.send_position(arm1, 0, 0, 0, 500))
+            time.sleep(0.3)
+        # Tramo en streaming: el siguiente sale antes del DONE del anterior
+        self.assertTrue(controller.stream_position(31, 0, 0, 0, 500))
+        self.assertTrue(controller.wait_for_stream(1))
+        self.assertTrue(controller.stream_position(32, 0, 0, 0, 500))
+        self.assertTrue(controller.wait_for_stream(1))
+        self.assertTrue(controller.send_position(33, 0, 0, 0, 500))
+        return replay.load_session(motion_log.MotionLogReader(self.tmp / 'session.bin').records())
+
+    def test_replays_in_order_at_the_requested_speed(self):
+        commands = self.record_session()
+        self.assertEqual([c.arm1 for c in commands], [10, 20, 30, 31, 32, 33])
+        self.assertEqual([c.blocking for c in commands], [True, True, True, False, False, True])
+        self.assertTrue(all(c.recorded_latency for c in commands))
+
+        speed = 4.0
+        sim, controller = self.connect(TIME_SCALE / speed, self.tmp / 'replay.bin')
+        report = replay.SessionReplay(commands, controller, speed).run()
+
+        self.assertEqual(report['commands'], 6)
+        self.assertEqual(report['failures'], 0)
+        self.assertTrue(report['drained'])
+        self.assertEqual(sim.commands_received, 6)
+        self.assertGreater(report['recorded_s'], 1.0)
+        self.assertGreaterEqual(report['elapsed_s'], commands[-1].offset / speed)
+        self.assertAlmostEqual(report['elapsed_s'], report['expected_s'], delta=0.3 * report['expected_s'])
+
+        replayed = replay.load_session(motion_log.MotionLogReader(self.tmp / 'replay.bin').records())
+        self.assertEqual([c.arm1 for c in replayed], [c.arm1 for c in commands])
@@ -0,0 +1,87 @@
+import json
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from scara_control import robots
+from scara_control.arduino_communication import ArduinoController
+from scara_control.tests import fake_robots, use_robots
+
+
+class LazyConnectTests(SimpleTestCase):
+    """Abrir el puerto (reset del Arduino, negociación) nunca frena una petición."""
+
+    def setUp(self):
+        use_robots(self, {'default': {'fake': True}, 'lazy-test': {'port': 'lazy-port', 'motion_log': ''}})
+        self.connecting = threading.Event()
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+        def slow_connect(controller):
+            self.connecting.set()
+            self.release.wait(5)
+
+        patcher = mock.patch.object(ArduinoController, '_connect', slow_connect)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_listing_robots_does_not_create_controllers(self):
+        listed = {robot['id']: robot for robot in self.client.get('/robots/').json()['robots']}
+        self.assertEqual(list(listed), ['default', 'lazy-test'])
+        self.assertFalse(listed['lazy-test']['connected'])
+        self.assertFalse(robots.registry.get('lazy-test').controller.is_created())
+        self.assertFalse(self.connecting.is_set())
+
+    def test_first_request_does_not_wait_for_the_port(self):
+        start = time.monotonic()
+        response = self.client.get('/get-status/?robot=lazy-test')
+        self.assertLess(time.monotonic() - start, 1.0)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['connected'], response.json()['busy']), (False, False))
+        # La conexión sigue en su hilo
+        self.assertTrue(self.connecting.wait(5))
+        self.assertTrue(robots.registry.get('lazy-test').controller.is_created())
+
+
+class RobotLookupTests(SimpleTestCase):
+
+    def setUp(self):
+        fake_robots(self, 'lookup-test')
+
+    def test_unknown_robot_raises(self):
+        self.assertEqual(robots.registry.get().id, 'default')
+        self.assertEqual(robots.registry.get('lookup-test').id, 'lookup-test')
+        with self.assertRaises(robots.RobotNotFound):
+            robots.registry.get('nope')
+        with self.assertRaises(robots.RobotNotFound):
+            robots.robot_config('nope')
+        self.assertEqual(robots.registry.ids(), ['default', 'lookup-test'])
+
+    def test_unknown_default_falls_back_to_the_first(self):
+        with override_settings(SCARA_DEFAULT_ROBOT='nope'):
+            self.assertEqual(robots.default_robot_id(), 'default')
+        with override_settings(SCARA_DEFAULT_ROBOT='lookup-test'):
+            self.assertEqual(robots.default_robot_id(), 'lookup-test')
+
+    def test_views_answer_404(self):
+        responses = [
+            self.client.get('/get-status/?robot=nope'),
+            self.client.post('/send-command/', json.dumps({'robot': 'nope', 'arm1': 10}), content_type='application/json'),
+        ]
+        for response in responses:
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response.json(), {'success': False, 'error': 'Robot no encontrado: nope'})
+
+
+class RobotConfigTests(SimpleTestCase):
+
+    @override_settings(SCARA_PIPELINE_WINDOW=6, SCARA_ROBOTS={
+        'default': {'fake': True}, 'inherits': {'port': 'COM3'}, 'stop-and-wait': {'pipeline': 0},
+    })
+    def test_robots_inherit_the_pipeline_window(self):
+        self.assertEqual(robots.robot_config()['pipeline'], 6)
+        self.assertEqual(robots.robot_config('inherits')['pipeline'], 6)
+        self.assertEqual(robots.robot_config('stop-and-wait')['pipeline'], 0)
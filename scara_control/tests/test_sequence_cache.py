@@ -0,0 +1,75 @@
+from django.test import TestCase
+
+from scara_control.models import RobotPosition, RobotSequence, SequencePosition
+from scara_control.sequence_cache import sequence_cache
+
+
+def create_position(name, arm1):
+    return RobotPosition.objects.create(name=name, arm1_angle=arm1, arm2_angle=0, base_height=0, gripper_state=0)
+
+
+class SequenceCacheSignalTests(TestCase):
+    """Las señales de signals.py descartan la secuencia compilada cuando cambia algo de lo que usa."""
+
+    def setUp(self):
+        sequence_cache.clear()
+        self.addCleanup(sequence_cache.clear)
+        self.first = create_position('a', 10)
+        self.second = create_position('b', 20)
+        self.sequence = RobotSequence.objects.create(name='ciclo')
+        self.step = SequencePosition.objects.create(sequence=self.sequence, position=self.first, order=1)
+        SequencePosition.objects.create(sequence=self.sequence, position=self.second, order=2, delay_seconds=0.5)
+
+    def arm1(self):
+        return sequence_cache.get(self.sequence.id).steps['arm1'].tolist()
+
+    def test_compiles_once_until_something_changes(self):
+        compiled = sequence_cache.get(self.sequence.id)
+        self.assertEqual((compiled.name, len(compiled)), ('ciclo', 2))
+        self.assertEqual(compiled.steps['delay'].tolist(), [1.0, 0.5])
+        with self.assertNumQueries(0):
+            self.assertIs(sequence_cache.get(self.sequence.id), compiled)
+        self.assertIsNone(sequence_cache.get(self.sequence.id + 1))
+
+    def test_position_change_invalidates(self):
+        self.assertEqual(self.arm1(), [10, 20])
+        self.second.arm1_angle = 25
+        self.second.save()
+        self.assertEqual(self.arm1(), [10, 25])
+
+    def test_unrelated_position_keeps_the_entry(self):
+        compiled = sequence_cache.get(self.sequence.id)
+        create_position('c', 30)
+        self.assertIs(sequence_cache.get(self.sequence.id), compiled)
+
+    def test_step_changes_invalidate(self):
+        self.assertEqual(self.arm1(), [10, 20])
+        self.step.order = 3
+        self.step.save()
+        self.assertEqual(self.arm1(), [20, 10])
+
+        SequencePosition.objects.create(sequence=self.sequence, position=self.first, order=4)
+        self.assertEqual(self.arm1(), [20, 10, 10])
+
+        self.step.delete()
+        self.assertEqual(self.arm1(), [20, 10])
+
+    def test_deleting_a_position_removes_its_steps(self):
+        self.assertEqual(self.arm1(), [10, 20])
+        self.first.delete()
+        self.assertEqual(self.arm1(), [20])
+
+    def test_m2m_changes_invalidate(self):
+        self.assertEqual(self.arm1(), [10, 20])
+        self.sequence.positions.clear()
+        self.assertEqual(self.arm1(), [])
+
+    def test_sequence_rename_and_delete(self):
+        sequence_cache.get(self.sequence.id)
+        self.sequence.name = 'otro'
+        self.sequence.save()
+        self.assertEqual(sequence_cache.get(self.sequence.id).name, 'otro')
+
+        sequence_id = self.sequence.id
+        self.sequence.delete()
+        self.assertIsNone(sequence_cache.get(sequence_id))
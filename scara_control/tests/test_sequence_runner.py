@@ -0,0 +1,196 @@
+import time
+
+from django.test import SimpleTestCase
+
+from scara_control.arduino_communication import _PendingCommand
+from scara_control.motion_queue import MotionQueue
+from scara_control.sequence_cache import compile_steps
+from scara_control.sequence_runner import SequenceRunner, blend_segments
+
+
+def steps(*rows):
+    """Pasos (arm1, gripper, delay); arm2 distinto en cada uno para que no queden alineados."""
+    return compile_steps([
+        {'order': i + 1, 'arm1': arm1, 'arm2': (i % 2) * 30, 'base': 0, 'gripper': gripper, 'delay': delay}
+        for i, (arm1, gripper, delay) in enumerate(rows)
+    ])
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("Condición no alcanzada")
+        time.sleep(0.01)
+
+
+class BlendSegmentsTests(SimpleTestCase):
+
+    def test_empty(self):
+        self.assertEqual(blend_segments(steps()), [])
+
+    def test_first_step_is_always_point_to_point(self):
+        self.assertEqual(blend_segments(steps((0, 0, 0), (10, 0, 0), (20, 0, 0), (30, 0, 0))), [(0, 1), (1, 4)])
+
+    def test_delay_ends_the_segment_after_its_step(self):
+        rows = steps((0, 0, 0), (10, 0, 0), (20, 0, 1), (30, 0, 0), (40, 0, 0))
+        self.assertEqual(blend_segments(rows), [(0, 1), (1, 3), (3, 5)])
+
+    def test_gripper_change_stops_before_and_at_the_step(self):
+        rows = steps((0, 0, 0), (10, 0, 0), (20, 1, 0), (30, 1, 0), (40, 1, 0))
+        self.assertEqual(blend_segments(rows), [(0, 1), (1, 2), (2, 3), (3, 5)])
+
+
+class GatedController:
+    """
+    Controlador en modo pipeline para los tests: los movimientos simples
+    quedan "en el firmware" hasta que el test llama a finish(); el streaming
+    de los tramos combinados se completa al instante.
+    """
+
+    pipeline_window = 3
+
+    def __init__(self):
+        self.inflight = []
+        self.sent = []          # arm1 de cada movimiento simple
+        self.streamed = []      # arm1 de cada punto de un tramo combinado
+
+    def send_position_async(self, arm1, arm2, base, gripper, speed=500):
+        pending = _PendingCommand()
+        self.sent.append(arm1)
+        self.inflight.append(pending)
+        return pending
+
+    def finish(self):
+        while self.inflight:
+            self.inflight.pop(0).complete(True)
+
+    def wait_for_stream(self, max_outstanding=0, timeout=None):
+        return True
+
+    def stream_position(self, arm1, arm2, base, gripper, speed=500):
+        self.streamed.append(arm1)
+        return True
+
+    def send_position(self, arm1, arm2, base, gripper, speed=500):
+        self.streamed.append(arm1)
+        return True
+
+
+class SequenceRunnerWithdrawTests(SimpleTestCase):
+    """
+    Pasos 1 y 2 (cambio de pinza) van por el pipeline; el tramo 3-4 sale
+    por adelantado pero la cola lo retiene hasta que el pipeline se vacía.
+    """
+
+    def setUp(self):
+        self.controller = GatedController()
+        self.queue = MotionQueue(self.controller)
+        self.runner = SequenceRunner(self.queue, blending=True, blend_tolerance=0, continuous_firmware=False)
+        self.steps = steps((10, 0, 0), (20, 1, 0), (30, 1, 0), (40, 1, 0))
+        self.assertEqual(blend_segments(self.steps), [(0, 1), (1, 2), (2, 4)])
+
+    def start(self):
+        run = self.runner.start_steps(1, 'test', self.steps)
+        wait_until(lambda: len(run._outstanding) == 3 and len(self.controller.inflight) == 2)
+        self.blended = run._outstanding[2][0]
+        self.assertEqual(self.blended.state, 'queued')
+        return run
+
+    def test_cancel_withdraws_the_blended_segment(self):
+        run = self.start()
+        self.assertTrue(self.runner.cancel(run.id))
+        self.assertEqual(self.blended.state, 'cancelled')
+
+        self.controller.finish()    # Lo que ya estaba en el firmware termina igual
+        wait_until(lambda: not run.is_active())
+        self.assertEqual(run.state, 'cancelled')
+        self.assertEqual(run.current_step, 2)
+        self.assertEqual(self.controller.streamed, [])
+        wait_until(self.queue.is_idle)
+
+    def test_pause_withdraws_and_resume_sends_it_again(self):
+        run = self.start()
+        self.assertTrue(self.runner.pause(run.id))
+        self.assertEqual(self.blended.state, 'cancelled')
+
+        self.controller.finish()
+        wait_until(lambda: run.current_step == 2 and not run._outstanding)
+        time.sleep(0.05)
+        self.assertEqual(run.state, 'paused')
+        self.assertEqual(self.controller.streamed, [])
+
+        self.assertTrue(self.runner.resume(run.id))
+        wait_until(lambda: not run.is_active())
+        self.assertEqual(run.state, 'done')
+        self.assertEqual(run.current_step, 4)
+        self.assertEqual(self.controller.sent, [10, 20])
+        self.assertEqual(self.controller.streamed, [30, 40])
+
+
+class InstantController:
+    """Movimientos que terminan al instante; un arm1 negativo falla como un ERROR del firmware."""
+
+    def __init__(self):
+        self.sent = []
+
+    def send_position(self, arm1, arm2, base, gripper, speed=500):
+        self.sent.append(arm1)
+        return arm1 >= 0
+
+
+class SequenceRunnerTests(SimpleTestCase):
+
+    def setUp(self):
+        self.controller = InstantController()
+        self.runner = SequenceRunner(MotionQueue(self.controller), blending=False)
+
+    def test_runs_every_step_and_reports_progress(self):
+        run = self.runner.start_steps(7, 'ciclo', steps((10, 0, 0), (20, 1, 0), (30, 0, 0)))
+        wait_until(lambda: not run.is_active())
+
+        self.assertEqual(self.controller.sent, [10, 20, 30])
+        info = run.to_dict()
+        self.assertEqual((info['state'], info['current_step'], info['total_steps']), ('done', 3, 3))
+        self.assertEqual((info['sequence_id'], info['sequence_name'], info['eta']), (7, 'ciclo', 0.0))
+        self.assertIs(self.runner.get_run(run.id), run)
+        self.assertIsNone(self.runner.active_run())
+
+    def test_only_one_active_run(self):
+        run = self.runner.start_steps(1, 'larga', steps((10, 0, 5)))
+        self.assertIsNone(self.runner.start_steps(2, 'otra', steps((20, 0, 0))))
+        self.assertIs(self.runner.active_run(), run)
+        self.runner.cancel(run.id)
+        wait_until(lambda: not run.is_active())
+        self.assertIsNotNone(self.runner.start_steps(2, 'otra', steps((20, 0, 0))))
+
+    def test_cancel_interrupts_the_delay(self):
+        run = self.runner.start_steps(1, 'larga', steps((10, 0, 5), (20, 0, 0)))
+        wait_until(lambda: run.current_step == 1)
+        start = time.monotonic()
+        self.assertTrue(self.runner.cancel(run.id))
+        wait_until(lambda: not run.is_active())
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(run.state, 'cancelled')
+        self.assertEqual(self.controller.sent, [10])
+        self.assertFalse(self.runner.cancel(run.id))
+
+    def test_pause_holds_until_resume(self):
+        run = self.runner.start_steps(1, 'pausa', steps((10, 0, 0.2), (20, 0, 0)))
+        wait_until(lambda: run.current_step == 1)
+        self.assertTrue(self.runner.pause(run.id))
+        time.sleep(0.4)
+        self.assertEqual(self.controller.sent, [10])
+        self.assertEqual(run.state, 'paused')
+
+        self.assertTrue(self.runner.resume(run.id))
+        wait_until(lambda: not run.is_active())
+        self.assertEqual((run.state, self.controller.sent), ('done', [10, 20]))
+
+    def test_failed_step_stops_the_run(self):
+        run = self.runner.start_steps(1, 'falla', steps((10, 0, 0), (-5, 0, 0), (30, 0, 0)))
+        wait_until(lambda: not run.is_active())
+        self.assertEqual(run.state, 'failed')
+        self.assertIn('Paso 2', run.error)
+        self.assertEqual(run.current_step, 1)
+        self.assertEqual(self.controller.sent, [10, -5])
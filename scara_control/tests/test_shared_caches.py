@@ -0,0 +1,62 @@
+import time
+
+from django.test import TestCase, override_settings
+
+from scara_control import api_cache
+from scara_control.models import RobotPosition, RobotSequence, SequencePosition
+from scara_control.robot_daemon import RobotDaemon
+from scara_control.robots import RobotRegistry
+from scara_control.sequence_cache import SequenceCache
+
+
+class SharedVersionTests(TestCase):
+    """Cada instancia hace de un proceso distinto: solo comparten la caché de Django."""
+
+    def setUp(self):
+        self.position = RobotPosition.objects.create(
+            name='p', arm1_angle=10, arm2_angle=5, base_height=1, gripper_state=0,
+        )
+        self.sequence = RobotSequence.objects.create(name='s')
+        SequencePosition.objects.create(sequence=self.sequence, position=self.position, order=1, delay_seconds=0)
+
+    def test_compiled_sequence_invalidated_by_another_process(self):
+        other = SequenceCache()
+        self.assertEqual(other.get(self.sequence.id).steps['arm1'][0], 10)
+
+        # El cambio lo hace "este" proceso: sus señales invalidan solo la instancia global
+        self.position.arm1_angle = 42
+        self.position.save()
+
+        self.assertEqual(other.get(self.sequence.id).steps['arm1'][0], 42)
+
+    def test_api_version_changes_for_another_process(self):
+        other = api_cache.ResponseCache()
+        version = other.version(api_cache.POSITIONS)
+        other.set(api_cache.POSITIONS, version, '', b'[]')
+
+        RobotPosition.objects.create(name='q', arm1_angle=0, arm2_angle=0, base_height=0, gripper_state=0)
+
+        new_version = other.version(api_cache.POSITIONS)
+        self.assertNotEqual(new_version, version)
+        self.assertIsNone(other.get(api_cache.POSITIONS, new_version, ''))
+        self.assertNotEqual(
+            other.etag(api_cache.POSITIONS, version, ''), other.etag(api_cache.POSITIONS, new_version, ''),
+        )
+
+    @override_settings(SCARA_ROBOTS={'default': {'fake': True}, 'daemon-test': {'fake': True}})
+    def test_daemon_compiles_sequence_by_id(self):
+        daemon = RobotDaemon('/tmp/unused.sock', RobotRegistry())
+        self.position.arm1_angle = 33
+        self.position.save()
+
+        run = daemon.dispatch('start_sequence', 'daemon-test', [self.sequence.id])
+        self.assertEqual(run['sequence_id'], self.sequence.id)
+        _, started = daemon.registry.find_run(run['run_id'])
+        self.assertEqual(started.steps['arm1'][0], 33)
+        deadline = time.monotonic() + 5
+        while started.is_active() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(started.state, 'done')
+
+        with self.assertRaises(LookupError):
+            daemon.dispatch('start_sequence', 'daemon-test', [999])
@@ -0,0 +1,62 @@
+import time
+
+import serial
+from django.test import SimpleTestCase
+
+from scara_control.simulator import DISCARDED_LINE, VirtualArduino
+
+
+class VirtualArduinoCsvTests(SimpleTestCase):
+    """Respuestas del simulador en modo CSV frente al texto de ARDUINO.txt."""
+
+    def setUp(self):
+        self.sim = VirtualArduino(time_scale=0.2, baud=0, boot_delay=0.2)
+        self.sim.start()
+        self.addCleanup(self.sim.stop)
+        self.port = serial.Serial(self.sim.port, 9600, timeout=0.1)
+        self.addCleanup(self.port.close)
+        self.read_until(lambda line: line.startswith("Sistema iniciado"))
+
+    def read_until(self, predicate, timeout=5.0):
+        """Lee líneas hasta que `predicate` acepte una; retorna todas las leídas."""
+        lines = []
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            line = self.port.readline().decode('utf-8').strip()
+            if not line:
+                continue
+            lines.append(line)
+            if predicate(line):
+                return lines
+        self.fail(f"Sin respuesta esperada; recibido: {lines}")
+
+    def send(self, text):
+        self.port.write(text.encode('utf-8'))
+        self.port.flush()
+
+    def test_wrong_field_count_uses_firmware_text(self):
+        self.send("1,2,3\n")
+        lines = self.read_until(lambda line: "descartada" in line)
+        self.assertEqual(lines[-1], DISCARDED_LINE)
+        self.assertEqual(self.sim.commands_received, 0)
+
+    def test_proto_request_discarded_without_binary(self):
+        self.send("PROTO BIN\n")
+        lines = self.read_until(lambda line: "descartada" in line)
+        self.assertEqual(lines[-1], DISCARDED_LINE)
+
+    def test_non_numeric_fields_parse_like_to_float(self):
+        self.send("12.5abc,x,0,0,100\n")
+        lines = self.read_until(lambda line: line == "DONE")
+        self.assertIn("Datos recibidos: arm1=12.50, arm2=0.00", "\n".join(lines))
+        self.assertEqual(self.sim.commands_received, 1)
+
+    def test_lines_received_while_moving_are_discarded_together(self):
+        self.send("0,90,0,0,100\n")
+        self.read_until(lambda line: line.startswith("Datos recibidos"))
+        # Llegan durante el movimiento: serialEvent() las junta en inputString
+        self.send("10,0,0,0,100\n20,0,0,0,100\n")
+        self.read_until(lambda line: line == "DONE")
+        lines = self.read_until(lambda line: "descartada" in line)
+        self.assertEqual(lines[-1], DISCARDED_LINE)
+        self.assertEqual(self.sim.commands_received, 1)
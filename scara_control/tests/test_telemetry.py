@@ -0,0 +1,49 @@
+import asyncio
+import contextlib
+import io
+
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.test import AsyncClient, SimpleTestCase
+
+from scara_control import telemetry
+from scara_control.routing import websocket_urlpatterns
+from scara_control.tests import fake_robots
+
+
+class TelemetryPushTests(SimpleTestCase):
+
+    def setUp(self):
+        fake_robots(self, 'telemetry-test')
+
+    async def _receive_until(self, communicator, predicate, timeout=5.0):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            message = await communicator.receive_json_from(timeout=max(deadline - loop.time(), 0.01))
+            if message['type'] == 'status' and predicate(message['status']):
+                return message['status']
+
+    async def test_async_view_pushes_to_subscribed_consumer(self):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), '/ws/telemetry/telemetry-test/')
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        initial = await communicator.receive_json_from()
+        self.assertEqual(initial['status']['robot'], 'telemetry-test')
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            response = await AsyncClient().post(
+                '/send-command/', {'robot': 'telemetry-test', 'arm1': 33, 'arm2': 4, 'wait': True},
+                content_type='application/json',
+            )
+            self.assertEqual(response.status_code, 200)
+            # El encolado (publicado desde el hilo del event loop) y el DONE llegan por el WebSocket
+            status = await self._receive_until(
+                communicator, lambda s: (s['last_position'] or {}).get('arm1') == 33 and not s['busy'],
+            )
+        await communicator.disconnect()
+
+        self.assertEqual(status['last_position']['arm2'], 4)
+        self.assertNotIn('Error publicando estado', output.getvalue())
+        self.assertEqual(telemetry._last_snapshots['telemetry-test'], status)
@@ -0,0 +1,29 @@
+from django.test import SimpleTestCase
+
+from scara_control.arduino_communication import ArduinoController
+from scara_control.simulator import VirtualArduino
+from scara_control.trajectory import plan_trajectory, stream_trajectory
+
+
+class StreamTrajectoryTests(SimpleTestCase):
+    """Streaming contra el simulador en CSV, que descarta las líneas que llegan pegadas."""
+
+    def setUp(self):
+        self.sim = VirtualArduino(time_scale=0.2, baud=0, boot_delay=0.3)
+        self.sim.start()
+        self.addCleanup(self.sim.stop)
+        self.controller = ArduinoController(self.sim.port, name='trajectory-test')
+        self.controller.connect()
+        self.addCleanup(self.controller.close)
+        self.assertTrue(self.controller.is_connected)
+        self.assertEqual(self.controller.protocol_mode, 'csv')
+
+    def test_points_faster_than_the_firmware_are_not_lost(self):
+        trajectory = plan_trajectory([(0, 0, 0), (30, -20, 0), (45, 10, 0)])
+        # A 50 Hz el firmware (bloquea en cada punto) queda atrás del envío
+        rate = 50.0
+        samples = len(trajectory.sample(rate)[0])
+
+        self.assertTrue(stream_trajectory(self.controller, trajectory, rate=rate))
+        self.assertEqual(self.sim.commands_received, samples)
+        self.assertEqual(self.controller.stream_outstanding(), 0)
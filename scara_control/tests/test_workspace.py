@@ -0,0 +1,87 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from scara_control import kinematics, workspace
+
+L1, L2 = kinematics.DEFAULT_LINK_LENGTHS
+
+
+@override_settings(SCARA_LINK_LENGTHS=kinematics.DEFAULT_LINK_LENGTHS)
+class WorkspaceMapTests(SimpleTestCase):
+    """Mapa grueso (celdas de 2 cm) para que el error de la celda más cercana se note."""
+
+    RESOLUTION = 2.0
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmp = Path(tempfile.mkdtemp())
+        cls.path = cls.tmp / 'workspace_map.npy'
+        workspace.build_map(cls.path, resolution=cls.RESOLUTION)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.map = workspace.WorkspaceMap(self.path)
+
+    def test_matches_exact_inverse_kinematics(self):
+        rng = np.random.default_rng(0)
+        x = rng.uniform(-L1 - L2, L1 + L2, 5000)
+        y = rng.uniform(-L1 - L2, L1 + L2, 5000)
+        result = self.map.lookup(x, y)
+        arm1, arm2, _, valid = kinematics.inverse(x, y)
+
+        np.testing.assert_array_equal(result['reachable'], valid)
+        np.testing.assert_array_equal(result['arm1'][valid], arm1[valid])
+        np.testing.assert_array_equal(result['arm2'][valid], arm2[valid])
+        np.testing.assert_allclose(result['margin'][valid], workspace.joint_margin(arm1, arm2)[valid])
+        self.assertTrue(np.isnan(result['arm1'][~valid]).all())
+
+    def test_points_next_to_the_outer_edge(self):
+        # La celda más cercana a los dos puntos es la de x=140 (alcanzable)
+        result = self.map.lookup([L1 + L2 - 0.6, L1 + L2 + 0.6], [0, 0])
+        self.assertEqual(result['reachable'].tolist(), [True, False])
+        x, y = kinematics.forward(result['arm1'][0], result['arm2'][0])
+        self.assertAlmostEqual(float(x), L1 + L2 - 0.6, places=9)
+        self.assertAlmostEqual(float(y), 0, places=9)
+
+    def test_points_outside_the_grid_and_base_limits(self):
+        result = self.map.lookup([500, 100, 100], [0, 0, 0], [0, 0, 20])
+        self.assertEqual(result['reachable'].tolist(), [False, True, False])
+        self.assertTrue(np.isnan(result['arm1'][[0, 2]]).all())
+
+
+@override_settings(SCARA_LINK_LENGTHS=kinematics.DEFAULT_LINK_LENGTHS)
+class WorkspaceCheckViewTests(SimpleTestCase):
+
+    def setUp(self):
+        tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp, True)
+        path = tmp / 'workspace_map.npy'
+        workspace.build_map(path, resolution=2.0)
+        settings_override = override_settings(SCARA_WORKSPACE_MAP=path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        workspace.reset_map()
+        self.addCleanup(workspace.reset_map)
+
+    def test_returns_exact_angles(self):
+        x, y = kinematics.forward(33.3, 22.2)
+        response = self.client.post(
+            '/workspace/check/', json.dumps({'points': [{'x': float(x), 'y': float(y), 'z': 0}, {'x': 0, 'y': 0}]}),
+            content_type='application/json',
+        )
+        body = response.json()
+        self.assertTrue(body['success'])
+        self.assertFalse(body['all_reachable'])
+        self.assertEqual(body['results'][0]['arm1'], 33.3)
+        self.assertEqual(body['results'][0]['arm2'], 22.2)
+        self.assertEqual(body['results'][1], {'reachable': False})
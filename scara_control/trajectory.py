@@ -0,0 +1,238 @@
+"""
+Planificador de trayectorias articulares.
+
+Recibe waypoints (arm1, arm2, base), los limita al rango del robot y arma
+una trayectoria continua parametrizada en tiempo (Hermite cúbico con
+velocidades monótonas, para no pasarse de los waypoints ni de los límites).
+La trayectoria se muestrea a frecuencia fija y se envía al controlador en
+streaming, sin esperar un DONE por punto.
+"""
+import time
+
+import numpy as np
+
+from . import motion_model
+from .arduino_communication import ARM1_LIMITS, ARM2_LIMITS, BASE_LIMITS, SPEED_LIMITS
+
+_LOWER = np.array([ARM1_LIMITS[0], ARM2_LIMITS[0], BASE_LIMITS[0]], dtype=float)
+_UPPER = np.array([ARM1_LIMITS[1], ARM2_LIMITS[1], BASE_LIMITS[1]], dtype=float)
+
+# Límites por defecto derivados del firmware (speed por defecto 500 pasos/s)
+DEFAULT_MAX_VELOCITY = np.array([
+    500.0 / motion_model.Q_STEPS_PER_DEGREE,                 # grados/s
+    500.0 / motion_model.Q_STEPS_PER_DEGREE,                 # grados/s
+    motion_model.Z_MAX_SPEED / motion_model.Z_STEPS_PER_CM,  # cm/s
+])
+DEFAULT_MAX_ACCELERATION = np.array([
+    motion_model.J_ACCELERATION / motion_model.Q_STEPS_PER_DEGREE,   # grados/s²
+    motion_model.J_ACCELERATION / motion_model.Q_STEPS_PER_DEGREE,   # grados/s²
+    motion_model.Z_ACCELERATION / motion_model.Z_STEPS_PER_CM,       # cm/s²
+])
+
+DEFAULT_RATE = 20.0     # Hz
+
+
+class Trajectory:
+    """Trayectoria articular: tiempos de los waypoints, posiciones y velocidades."""
+
+    def __init__(self, times, positions, velocities, gripper=False):
+        self.times = times              # (N,)
+        self.positions = positions      # (N, 3) arm1, arm2, base
+        self.velocities = velocities    # (N, 3)
+        self.gripper = gripper
+
+    @property
+    def duration(self):
+        return float(self.times[-1])
+
+    def evaluate(self, t):
+        """Posiciones y velocidades en los instantes `t` (array), vectorizado."""
+        t = np.clip(np.asarray(t, dtype=float), 0.0, self.duration)
+        idx = np.clip(np.searchsorted(self.times, t, side='right') - 1, 0, len(self.times) - 2)
+        t0, t1 = self.times[idx], self.times[idx + 1]
+        h = (t1 - t0)[:, None]
+        s = ((t - t0) / (t1 - t0))[:, None]
+        p0, p1 = self.positions[idx], self.positions[idx + 1]
+        m0, m1 = self.velocities[idx] * h, self.velocities[idx + 1] * h
+        s2, s3 = s * s, s * s * s
+        pos = ((2 * s3 - 3 * s2 + 1) * p0 + (s3 - 2 * s2 + s) * m0
+               + (-2 * s3 + 3 * s2) * p1 + (s3 - s2) * m1)
+        vel = ((6 * s2 - 6 * s) * p0 + (3 * s2 - 4 * s + 1) * m0
+               + (-6 * s2 + 6 * s) * p1 + (3 * s2 - 2 * s) * m1) / h
+        return pos, vel
+
+    def sample(self, rate=DEFAULT_RATE):
+        """Muestras a frecuencia fija (incluye el punto final). Retorna (t, pos, vel)."""
+        count = int(np.floor(self.duration * rate)) + 1
+        t = np.arange(count) / rate
+        if t[-1] < self.duration:
+            t = np.append(t, self.duration)
+        pos, vel = self.evaluate(t)
+        return t, pos, vel
+
+    def to_dict(self, rate=DEFAULT_RATE):
+        t, pos, _ = self.sample(rate)
+        return {
+            'duration': self.duration,
+            'rate': rate,
+            'samples': len(t),
+            'points': [
+                {'t': round(float(ti), 4), 'arm1': float(p[0]), 'arm2': float(p[1]), 'base': float(p[2])}
+                for ti, p in zip(t, pos)
+            ],
+        }
+
+
+def _monotone_velocities(positions, times):
+    """Velocidades en los waypoints (Fritsch–Carlson): 0 en extremos y en cambios de sentido."""
+    h = np.diff(times)[:, None]
+    slopes = np.diff(positions, axis=0) / h
+    vel = np.zeros_like(positions)
+    if len(slopes) > 1:
+        left, right = slopes[:-1], slopes[1:]
+        hl, hr = h[:-1], h[1:]
+        same_sign = (left * right) > 0
+        # Media armónica ponderada: no genera sobrepaso entre waypoints
+        w1, w2 = 2 * hr + hl, hr + 2 * hl
+        with np.errstate(divide='ignore', invalid='ignore'):
+            harmonic = (w1 + w2) / (w1 / left + w2 / right)
+        vel[1:-1] = np.where(same_sign, harmonic, 0.0)
+    return vel
+
+
+def velocity_limits(speed):
+    """Velocidades máximas por eje para una velocidad de firmware (pasos/s)."""
+    joint = speed / motion_model.Q_STEPS_PER_DEGREE
+    return np.array([joint, joint, DEFAULT_MAX_VELOCITY[2]])
+
+
+def simplify_waypoints(waypoints, tolerance):
+    """
+    Quita waypoints intermedios que se desvían menos de `tolerance` de la
+    recta entre sus vecinos (Ramer–Douglas–Peucker). Los extremos se conservan.
+    """
+    q = np.asarray(waypoints, dtype=float)
+    if tolerance <= 0 or len(q) < 3:
+        return q
+    keep = np.zeros(len(q), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(q) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        chord = q[last] - q[first]
+        rel = q[first + 1:last] - q[first]
+        length = np.linalg.norm(chord)
+        if length == 0:
+            dist = np.linalg.norm(rel, axis=1)
+        else:
+            dist = np.linalg.norm(rel - np.outer(rel @ chord / length ** 2, chord), axis=1)
+        worst = int(np.argmax(dist))
+        if dist[worst] > tolerance:
+            index = first + 1 + worst
+            keep[index] = True
+            stack.extend(((first, index), (index, last)))
+    return q[keep]
+
+
+def plan_trajectory(waypoints, max_velocity=None, max_acceleration=None, gripper=False):
+    """
+    Planifica una trayectoria continua por `waypoints` (N×3: arm1, arm2, base).
+    Los waypoints se limitan al rango del robot; la duración de cada tramo
+    se ajusta para respetar velocidad y aceleración máximas por eje.
+    """
+    q = np.asarray(waypoints, dtype=float).reshape(-1, 3)
+    if len(q) < 2:
+        raise ValueError("Se necesitan al menos 2 waypoints")
+    q = np.clip(q, _LOWER, _UPPER)
+
+    vmax = DEFAULT_MAX_VELOCITY if max_velocity is None else np.asarray(max_velocity, dtype=float)
+    amax = DEFAULT_MAX_ACCELERATION if max_acceleration is None else np.asarray(max_acceleration, dtype=float)
+
+    # Duración inicial de cada tramo: eje más lento con perfil trapezoidal
+    delta = np.abs(np.diff(q, axis=0))
+    seg = motion_model.trapezoid_time(delta, vmax, amax).max(axis=1)
+    seg = np.maximum(seg, 1e-3)
+    times = np.concatenate(([0.0], np.cumsum(seg)))
+
+    # Escalado uniforme del tiempo si alguna muestra excede los límites
+    trajectory = Trajectory(times, q, _monotone_velocities(q, times), gripper)
+    for _ in range(5):
+        t = np.linspace(0.0, trajectory.duration, max(50, 20 * len(q)))
+        _, vel = trajectory.evaluate(t)
+        acc = np.gradient(vel, t, axis=0)
+        ratio = max(
+            float((np.abs(vel) / vmax).max()),
+            float(np.sqrt((np.abs(acc) / amax).max())),
+        )
+        if ratio <= 1.0 + 1e-3:
+            break
+        times = times * ratio
+        trajectory = Trajectory(times, q, _monotone_velocities(q, times), gripper)
+    return trajectory
+
+
+def stream_trajectory(controller, trajectory, rate=DEFAULT_RATE, speed_margin=1.2, window=2):
+    """
+    Envía la trayectoria al controlador a `rate` Hz sin handshake por punto.
+    La velocidad de cada punto (pasos/s) sigue a la de la trayectoria. Como
+    mucho `window` puntos quedan sin confirmar (el firmware atiende las
+    líneas de a una en serialEvent y descarta las que llegan pegadas); si el
+    Arduino va más lento que `rate`, el envío lo espera. El punto final se
+    manda con send_position para esperar su DONE. Si el controlador negoció
+    el modo pipeline se usa su ventana.
+    """
+    window = getattr(controller, 'pipeline_window', 0) or window
+    t, pos, vel = trajectory.sample(rate)
+    joint_speed = np.abs(vel[:, :2]).max(axis=1) * motion_model.Q_STEPS_PER_DEGREE * speed_margin
+    speeds = np.clip(np.round(joint_speed), SPEED_LIMITS[0], SPEED_LIMITS[1]).astype(int)
+
+    print(f"[trajectory] Streaming de {len(t)} puntos a {rate} Hz ({trajectory.duration:.2f} s)")
+    start = time.monotonic()
+    for i in range(len(t) - 1):
+        # Calendario absoluto: no acumula deriva
+        delay = start + t[i] - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        if not controller.wait_for_stream(window - 1):
+            print(f"[trajectory] Timeout esperando confirmaciones del streaming en el punto {i}")
+            return False
+        arm1, arm2, base = pos[i]
+        if not controller.stream_position(float(arm1), float(arm2), float(base),
+                                          trajectory.gripper, int(speeds[i])):
+            print(f"[trajectory] Streaming interrumpido en el punto {i}")
+            return False
+
+    delay = start + t[-1] - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+    if not controller.wait_for_stream(window - 1):
+        print("[trajectory] Timeout esperando confirmaciones del streaming")
+        return False
+    arm1, arm2, base = pos[-1]
+    return controller.send_position(float(arm1), float(arm2), float(base),
+                                    trajectory.gripper, int(speeds[:-1].max(initial=SPEED_LIMITS[0])))
+
+
+def stream_waypoints(controller, waypoints, gripper, speed, window=2):
+    """
+    Envía los waypoints uno tras otro sin esperar el DONE de cada uno, con
+    como mucho `window` comandos sin confirmar (el que se ejecuta más los
+    que esperan en el buffer serie del Arduino, de 64 bytes). Sirve para
+    firmware que bloquea hasta llegar a cada objetivo: el brazo sigue
+    parando en cada punto, pero el siguiente comando ya está esperando.
+    El último punto se manda con send_position para confirmar la llegada.
+    Si el controlador negoció el modo pipeline se usa su ventana.
+    """
+    window = getattr(controller, 'pipeline_window', 0) or window
+    *via, last = [tuple(float(v) for v in point) for point in waypoints]
+    for arm1, arm2, base in via:
+        if not controller.wait_for_stream(window - 1):
+            print("[trajectory] Timeout esperando confirmaciones del streaming")
+            return False
+        if not controller.stream_position(arm1, arm2, base, gripper, speed):
+            return False
+    if not controller.wait_for_stream(window - 1):
+        return False
+    return controller.send_position(last[0], last[1], last[2], gripper, speed)
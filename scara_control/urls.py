@@ -5,18 +5,36 @@ urlpatterns = [
     # Página principal
     path('', views.index, name='index'),
     
-    # Control básico del robot
+    # Control básico del robot (cada endpoint acepta 'robot' / ?robot=)
+    path('robots/', views.robots_list, name='robots_list'),
     path('send-command/', views.send_command, name='send_command'),
     path('get-status/', views.get_status, name='get_status'),
+    path('metrics', views.prometheus_metrics, name='metrics'),
     path('home/', views.home_position, name='home_position'),
+    path('trajectory/', views.run_trajectory, name='run_trajectory'),
+    path('cartesian-move/', views.cartesian_move, name='cartesian_move'),
+    path('workspace/check/', views.workspace_check, name='workspace_check'),
+
+    # Cola de movimientos
+    path('jobs/', views.jobs_list, name='jobs_list'),
+    path('jobs/<int:job_id>/', views.job_status, name='job_status'),
     
     # Gestión de posiciones
     path('positions/', views.positions_list, name='positions_list'),
     path('save-position/', views.save_position, name='save_position'),
+    path('positions/export/', views.positions_export, name='positions_export'),
+    path('positions/import/', views.positions_import, name='positions_import'),
     
     # Gestión de secuencias  
     path('sequences/', views.sequences_list, name='sequences_list'),
+    path('sequences/export/', views.sequences_export, name='sequences_export'),
+    path('sequences/import/', views.sequences_import, name='sequences_import'),
+    path('sequences/<int:sequence_id>/dry-run/', views.sequence_dry_run, name='sequence_dry_run'),
     path('run-sequence/', views.run_sequence, name='run_sequence'),
+    path('sequence-runs/<int:run_id>/', views.sequence_run_status, name='sequence_run_status'),
+    path('sequence-runs/<int:run_id>/pause/', views.pause_sequence_run, name='pause_sequence_run'),
+    path('sequence-runs/<int:run_id>/resume/', views.resume_sequence_run, name='resume_sequence_run'),
+    path('sequence-runs/<int:run_id>/cancel/', views.cancel_sequence_run, name='cancel_sequence_run'),
     
     # Control con PS4
     path('control/', views.control_robot, name='control_robot'),
@@ -1,17 +1,21 @@
 # scara_control/views.py - VERSIÓN CORREGIDA
 
 import threading
-import time
 import json
 
+import numpy as np
+
+from django.db.models import Prefetch
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-from .arduino_communication import arduino_controller
+from . import api_cache, bulk_io, kinematics, metrics, preflight, robots, telemetry, trajectory, workspace
+from .sequence_cache import sequence_cache
+from .sequence_runner import load_steps
 from .models import RobotPosition, RobotSequence, SequencePosition
 from .serializers import RobotPositionSerializer, RobotSequenceSerializer
 from .ps4_controller import iniciar_controlador, ps4_connected
@@ -22,11 +26,49 @@ def index(request):
     """
     return render(request, 'scara_control/index.html')
 
+def _get_robot(request, data=None):
+    """
+    Robot del registro pedido con 'robot' en el JSON o ?robot= en la URL
+    (sin él, el robot por defecto). Retorna (robot, None) o (None, respuesta 404).
+    """
+    robot_id = data.get('robot') if isinstance(data, dict) else None
+    robot_id = robot_id or request.GET.get('robot')
+    try:
+        return robots.registry.get(robot_id), None
+    except robots.RobotNotFound:
+        return None, JsonResponse({'success': False, 'error': f'Robot no encontrado: {robot_id}'}, status=404)
+
+def _request_data(request):
+    """
+    Cuerpo JSON (vacío = {}) o, si viene de un formulario, sus campos.
+    Retorna (data, None) o (None, respuesta 400).
+    """
+    if not request.body:
+        return {}, None
+    if request.content_type in ('application/x-www-form-urlencoded', 'multipart/form-data'):
+        return request.POST.dict(), None
+    try:
+        return json.loads(request.body), None
+    except ValueError:
+        return None, JsonResponse({'success': False, 'error': 'JSON inválido'}, status=400)
+
+def robots_list(request):
+    """
+    Robots del registro (SCARA_ROBOTS) con su puerto, conexión, cola y ejecución activa.
+    """
+    return JsonResponse({
+        'success': True,
+        'default': robots.default_robot_id(),
+        'robots': [robot.to_dict() for robot in robots.registry.all()]
+    })
+
 @csrf_exempt
-def send_command(request):
+async def send_command(request):
     """
-    Recibe un POST con JSON: {'base':..., 'arm1':..., 'arm2':..., 'gripper':..., 'speed':...}
-    y envía ese comando al Arduino (serial).
+    Recibe un POST con JSON: {'base':..., 'arm1':..., 'arm2':..., 'gripper':..., 'speed':..., 'robot':...}
+    y encola ese comando para el Arduino del robot. Responde al instante con
+    el job_id; con 'wait': true espera a que el movimiento termine (sobre el
+    Future del trabajo, sin ocupar un hilo).
     """
     if request.method != 'POST':
         return JsonResponse({'success': False, 'error': 'Método no permitido'}, status=405)
@@ -37,6 +79,10 @@ def send_command(request):
         print(f"[views.send_command] ERROR parseando JSON: {e}")
         return JsonResponse({'success': False, 'error': 'JSON inválido'}, status=400)
 
+    robot, error = _get_robot(request, data)
+    if error:
+        return error
+
     # Obtener valores con valores por defecto
     arm1 = data.get('arm1', 0)
     arm2 = data.get('arm2', 0)
@@ -44,71 +90,278 @@ def send_command(request):
     gripper = data.get('gripper', 0)
     speed = data.get('speed', 500)
 
-    print(f"[views.send_command] Comando recibido: arm1={arm1}, arm2={arm2}, base={base}, gripper={gripper}, speed={speed}")
+    print(f"[views.send_command] Comando recibido ({robot.id}): arm1={arm1}, arm2={arm2}, base={base}, gripper={gripper}, speed={speed}")
 
-    # Verificar conexión
-    if not arduino_controller.is_connected_status():
-        print("[views.send_command] Arduino no conectado, intentando reconectar...")
-        arduino_controller.connect()
-        if not arduino_controller.is_connected_status():
-            return JsonResponse({'success': False, 'error': 'Arduino no conectado'}, status=500)
+    # Verificar conexión (reconecta si hace falta)
+    if not await robot.aensure_connected():
+        return JsonResponse({'success': False, 'error': 'Arduino no conectado'}, status=500)
 
-    # Enviar comando
-    success = arduino_controller.send_position(arm1, arm2, base, gripper, speed)
-    
-    if success:
-        return JsonResponse({'success': True})
+    # Encolar comando
+    job = await robot.asubmit_position(arm1, arm2, base, gripper, speed)
+
+    if not data.get('wait', False):
+        return JsonResponse({
+            'success': True,
+            'robot': robot.id,
+            'job_id': job.id,
+            'queue_depth': await robot.apending_count()
+        }, status=202)
+
+    await robot.ajob_wait(job)
+    if job.state == 'done':
+        return JsonResponse({'success': True, 'robot': robot.id, 'job_id': job.id})
     else:
-        return JsonResponse({'success': False, 'error': 'Error enviando comando'}, status=500)
+        return JsonResponse({'success': False, 'robot': robot.id, 'job_id': job.id, 'error': job.error or 'Error enviando comando'}, status=500)
 
-def get_status(request):
+# Espera máxima de un long-poll de /get-status/ (segundos)
+LONG_POLL_MAX = 60.0
+
+async def get_status(request):
     """
-    Devuelve el estado de conexión, si está ocupado (busy) y la última posición.
+    Devuelve el estado de conexión, si está ocupado (busy) y la última posición
+    del robot (?robot=). Los clientes con WebSocket reciben lo mismo por
+    /ws/telemetry/<robot>/ sin polling; los demás pueden hacer long-poll con
+    ?version=<la recibida>&wait=<segundos>: la respuesta llega cuando el
+    estado cambia, y mientras tanto la petición no ocupa un hilo.
     """
-    connected = arduino_controller.is_connected_status()
-    last_position = arduino_controller.get_last_position() if connected else None
+    robot, error = _get_robot(request)
+    if error:
+        return error
 
-    # <-- AÑADIMOS busy AQUI:
-    busy = False
-    if connected:
-        # is_robot_busy() es True mientras Arduino no haya enviado “DONE”
-        busy = arduino_controller.is_robot_busy()
+    watch = telemetry.status_watch(robot.id)
+    version = watch.version
+    if 'version' in request.GET:
+        try:
+            since = int(request.GET['version'])
+            wait = min(max(float(request.GET.get('wait', 25)), 0.0), LONG_POLL_MAX)
+        except ValueError:
+            return JsonResponse({'success': False, 'error': 'version/wait inválidos'}, status=400)
+        version = await watch.wait(since, wait)
 
-    response = {
-        'connected': connected,
-        'busy': busy,                # <-- este campo es nuevo
-        'last_position': last_position
-    }
+    # busy es True mientras Arduino no haya enviado “DONE” o queden trabajos
+    # en la cola; es el mismo snapshot que se empuja por /ws/telemetry/
+    response = await robot.astatus()
+    response['version'] = version
 
     return JsonResponse(response)
 
 
-@csrf_exempt 
-def home_position(request):
+def prometheus_metrics(request):
+    """Métricas del controlador, la cola y la API en formato de texto de Prometheus."""
+    return HttpResponse(robots.registry.render_metrics(), content_type=metrics.CONTENT_TYPE)
+
+
+@csrf_exempt
+async def home_position(request):
     """
-    Envía el robot a la posición home (0,0,0,0)
+    Envía el robot ({'robot':...} o ?robot=) a la posición home (0,0,0,0)
     """
     if request.method != 'POST':
         return JsonResponse({'success': False, 'error': 'Método no permitido'}, status=405)
-    
+
+    data, error = _request_data(request)
+    if error:
+        return error
+    robot, error = _get_robot(request, data)
+    if error:
+        return error
+
     try:
-        success = arduino_controller.home_position()
-        if success:
-            return JsonResponse({'success': True, 'message': 'Robot en posición home'})
-        else:
-            return JsonResponse({'success': False, 'error': 'Error enviando a home'}, status=500)
+        job = await robot.asubmit_home()
+        return JsonResponse({'success': True, 'message': 'Home encolado', 'robot': robot.id, 'job_id': job.id}, status=202)
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
+@csrf_exempt
+def run_trajectory(request):
+    """
+    Recibe un POST con JSON: {'waypoints': [{'arm1':..., 'arm2':..., 'base':...}, ...] o
+    [[arm1, arm2, base], ...], 'gripper':..., 'rate':..., 'dry_run':..., 'robot':...}.
+    Planifica una trayectoria continua y la encola como un único trabajo que
+    envía los puntos en streaming. Con 'dry_run': true solo devuelve el plan.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Método no permitido'}, status=405)
+
+    try:
+        data = json.loads(request.body)
+        waypoints = [
+            [p.get('arm1', 0), p.get('arm2', 0), p.get('base', 20)] if isinstance(p, dict) else list(p)
+            for p in data.get('waypoints', [])
+        ]
+        rate = float(data.get('rate', trajectory.DEFAULT_RATE))
+        if not 1 <= rate <= 50:
+            raise ValueError("rate debe estar entre 1 y 50 Hz")
+        plan = trajectory.plan_trajectory(waypoints, gripper=bool(data.get('gripper', 0)))
+    except Exception as e:
+        print(f"[views.run_trajectory] ERROR: {e}")
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    robot, error = _get_robot(request, data)
+    if error:
+        return error
+
+    if data.get('dry_run', False):
+        return JsonResponse({'success': True, 'trajectory': plan.to_dict(rate)})
+
+    job = robot.submit_trajectory(
+        plan, rate, description=f"trajectory {len(waypoints)} waypoints, {plan.duration:.2f}s",
+    )
+    return JsonResponse({
+        'success': True,
+        'robot': robot.id,
+        'job_id': job.id,
+        'duration': plan.duration,
+        'samples': len(plan.sample(rate)[0]),
+        'queue_depth': robot.queue.pending_count()
+    }, status=202)
+
+@csrf_exempt
+def cartesian_move(request):
+    """
+    Recibe un POST con JSON: {'x':..., 'y':..., 'z':..., 'gripper':..., 'speed':..., 'elbow':..., 'robot':...}
+    o varios puntos en {'points': [{'x':..., 'y':..., 'z':...}, ...], ...}.
+    Resuelve la cinemática inversa de todos los puntos a la vez y encola un
+    movimiento por punto. Con 'dry_run': true solo devuelve los ángulos.
+    Si algún punto no es alcanzable no se encola nada.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Método no permitido'}, status=405)
+
+    try:
+        data = json.loads(request.body)
+        points = data['points'] if 'points' in data else [data]
+        xyz = np.array(
+            [[p.get('x', 0), p.get('y', 0), p.get('z', 0)] if isinstance(p, dict) else list(p) for p in points],
+            dtype=float,
+        ).reshape(-1, 3)
+        arm1, arm2, base, valid = kinematics.inverse(
+            xyz[:, 0], xyz[:, 1], xyz[:, 2], elbow=data.get('elbow', 'auto')
+        )
+    except Exception as e:
+        print(f"[views.cartesian_move] ERROR: {e}")
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    robot, error = _get_robot(request, data)
+    if error:
+        return error
+
+    solutions = [
+        {'arm1': round(float(a1), 3), 'arm2': round(float(a2), 3), 'base': float(z), 'reachable': bool(ok)}
+        if ok else {'arm1': None, 'arm2': None, 'base': float(z), 'reachable': False}
+        for a1, a2, z, ok in zip(arm1, arm2, base, valid)
+    ]
+    unreachable = np.flatnonzero(~valid).tolist()
+
+    if data.get('dry_run', False):
+        return JsonResponse({'success': not unreachable, 'solutions': solutions, 'unreachable': unreachable})
+    if unreachable:
+        return JsonResponse({
+            'success': False,
+            'error': 'Puntos fuera del espacio de trabajo',
+            'unreachable': unreachable,
+            'solutions': solutions
+        }, status=400)
+
+    gripper = data.get('gripper', 0)
+    speed = data.get('speed', 500)
+    jobs = [
+        robot.queue.submit_position(s['arm1'], s['arm2'], s['base'], gripper, speed)
+        for s in solutions
+    ]
+    return JsonResponse({
+        'success': True,
+        'robot': robot.id,
+        'job_ids': [job.id for job in jobs],
+        'solutions': solutions,
+        'queue_depth': robot.queue.pending_count()
+    }, status=202)
+
+@csrf_exempt
+def workspace_check(request):
+    """
+    Recibe un POST con JSON: {'points': [{'x':..., 'y':..., 'z':...}, ...]} (o un solo x, y, z)
+    y devuelve por punto si es alcanzable, la solución articular y su margen
+    a los límites, consultando el mapa precalculado (build_workspace_map).
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Método no permitido'}, status=405)
+
+    try:
+        data = json.loads(request.body)
+        points = data['points'] if 'points' in data else [data]
+        xyz = np.array(
+            [[p.get('x', 0), p.get('y', 0), p.get('z', 0)] if isinstance(p, dict) else list(p) for p in points],
+            dtype=float,
+        ).reshape(-1, 3)
+    except Exception as e:
+        print(f"[views.workspace_check] ERROR: {e}")
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    try:
+        workspace_map = workspace.get_map()
+    except FileNotFoundError:
+        return JsonResponse({
+            'success': False,
+            'error': 'Mapa de alcanzabilidad no construido (python manage.py build_workspace_map)'
+        }, status=503)
+
+    result = workspace_map.lookup(xyz[:, 0], xyz[:, 1], xyz[:, 2])
+    return JsonResponse({
+        'success': True,
+        'stale': workspace_map.is_stale(),
+        'resolution': workspace_map.resolution,
+        'all_reachable': bool(result['reachable'].all()),
+        'results': [
+            {'reachable': True, 'arm1': round(float(a1), 3), 'arm2': round(float(a2), 3), 'margin': round(float(m), 3)}
+            if ok else {'reachable': False}
+            for ok, a1, a2, m in zip(result['reachable'], result['arm1'], result['arm2'], result['margin'])
+        ]
+    })
+
+def job_status(request, job_id):
+    """
+    Devuelve el estado y resultado de un trabajo de movimiento encolado
+    (los ids son únicos entre robots).
+    """
+    robot, job = robots.registry.find_job(job_id)
+    if job is None:
+        return JsonResponse({'success': False, 'error': 'Trabajo no encontrado'}, status=404)
+    return JsonResponse({'success': True, 'robot': robot.id, 'job': job.to_dict()})
+
+def jobs_list(request):
+    """
+    Lista los trabajos recientes y la profundidad actual de la cola del robot (?robot=).
+    """
+    robot, error = _get_robot(request)
+    if error:
+        return error
+    return JsonResponse({
+        'success': True,
+        'robot': robot.id,
+        'queue_depth': robot.queue.pending_count(),
+        'jobs': robot.queue.recent_jobs()
+    })
+
 # ----------------------------------------------------------------------------------------------------
 # CRUD de Posiciones y Secuencias (API REST – DRF)
 # ----------------------------------------------------------------------------------------------------
 
+def _list_data(request, queryset, serializer_class):
+    """Lista completa, o una página por cursor si se pide ?cursor= / ?page_size=."""
+    if not api_cache.wants_pagination(request):
+        return serializer_class(queryset, many=True).data
+    paginator = api_cache.ApiCursorPagination()
+    page = paginator.paginate_queryset(queryset, request)
+    return paginator.get_paginated_response(serializer_class(page, many=True).data).data
+
 @api_view(['GET', 'POST'])
 def positions_list(request):
     if request.method == 'GET':
-        qs = RobotPosition.objects.all()
-        return Response(RobotPositionSerializer(qs, many=True).data)
+        return api_cache.cached_list_response(
+            request, api_cache.POSITIONS,
+            lambda: _list_data(request, RobotPosition.objects.all(), RobotPositionSerializer)
+        )
 
     # POST - Crear nueva posición
     serializer = RobotPositionSerializer(data=request.data)
@@ -122,70 +375,194 @@ def positions_list(request):
 @api_view(['GET', 'POST'])
 def sequences_list(request):
     if request.method == 'GET':
-        qs = RobotSequence.objects.all()
-        return Response(RobotSequenceSerializer(qs, many=True).data)
+        # Pasos y posiciones en 2 consultas extra, no una por secuencia/paso
+        qs = RobotSequence.objects.prefetch_related(
+            Prefetch('sequenceposition_set', queryset=SequencePosition.objects.select_related('position'))
+        )
+        return api_cache.cached_list_response(
+            request, api_cache.SEQUENCES,
+            lambda: _list_data(request, qs, RobotSequenceSerializer)
+        )
 
-    # POST - Crear nueva secuencia
+    # POST - Crear nueva secuencia (posiciones reutilizadas y pasos en bloque)
     try:
-        data = request.data
-        seq = RobotSequence.objects.create(name=data.get('name', 'Sin nombre'))
-        
-        for item in data.get('positions', []):
-            pos_data = item.get('position', {})
-            pos, created = RobotPosition.objects.get_or_create(**pos_data)
-            
-            SequencePosition.objects.create(
-                sequence=seq,
-                position=pos,
-                order=item.get('order', 0),
-                delay_seconds=item.get('delay_seconds', 1.0)
-            )
-        
-        serialized = RobotSequenceSerializer(seq).data
+        sequence = bulk_io.create_sequence(bulk_io.normalize_sequence(request.data))
+
+        serialized = RobotSequenceSerializer(sequence).data
         return Response(serialized, status=201)
-        
+
+    except bulk_io.BulkImportError as e:
+        return Response({'error': str(e)}, status=400)
     except Exception as e:
         print(f"[views.sequences_list] Error creando secuencia: {e}")
         return Response({'error': str(e)}, status=500)
 
+# ----------------------------------------------------------------------------------------------------
+# Importación / exportación masiva (JSON lines o CSV, en streaming)
+# ----------------------------------------------------------------------------------------------------
+
+_EXPORT_CONTENT_TYPES = {'jsonl': 'application/x-ndjson', 'csv': 'text/csv'}
+
+def _bulk_format(request):
+    fmt = request.GET.get('format')
+    if fmt is None:
+        fmt = 'csv' if 'csv' in request.content_type else 'jsonl'
+    if fmt not in bulk_io.FORMATS:
+        raise bulk_io.BulkImportError(f"Formato no soportado: {fmt}")
+    return fmt
+
+def _export_response(request, generator, filename):
+    try:
+        fmt = _bulk_format(request)
+    except bulk_io.BulkImportError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    response = StreamingHttpResponse(generator(fmt), content_type=_EXPORT_CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    return response
+
+def positions_export(request):
+    """
+    Descarga todas las posiciones (?format=jsonl|csv) sin cargarlas en memoria.
+    """
+    return _export_response(request, bulk_io.export_positions, 'positions')
+
+def sequences_export(request):
+    """
+    Descarga todas las secuencias con sus pasos (?format=jsonl|csv).
+    """
+    return _export_response(request, bulk_io.export_sequences, 'sequences')
+
 @csrf_exempt
-@api_view(['POST'])
-def run_sequence(request):
+def positions_import(request):
     """
-    Ejecuta una secuencia de movimientos
+    Importa posiciones desde el cuerpo del POST (JSON lines, o CSV con
+    ?format=csv / Content-Type text/csv) en una sola transacción.
     """
-    seq_id = request.data.get('sequence_id')
-    
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Método no permitido'}, status=405)
+    try:
+        created = bulk_io.import_positions(bulk_io.read_positions(request, _bulk_format(request)))
+    except bulk_io.BulkImportError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    print(f"[views.positions_import] {created} posiciones importadas")
+    return JsonResponse({'success': True, 'created': created}, status=201)
+
+@csrf_exempt
+def sequences_import(request):
+    """
+    Importa secuencias desde el cuerpo del POST (JSON lines o CSV) en una
+    sola transacción; las posiciones repetidas se reutilizan.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Método no permitido'}, status=405)
     try:
-        seq = RobotSequence.objects.get(id=seq_id)
-    except RobotSequence.DoesNotExist:
-        return Response({'success': False, 'error': 'Secuencia no encontrada'}, status=404)
+        sequences, positions, steps = bulk_io.import_sequences(
+            bulk_io.read_sequences(request, _bulk_format(request))
+        )
+    except bulk_io.BulkImportError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    print(f"[views.sequences_import] {sequences} secuencias importadas")
+    return JsonResponse({
+        'success': True,
+        'sequences': sequences,
+        'positions': positions,
+        'steps': steps
+    }, status=201)
 
-    if not arduino_controller.is_connected_status():
-        return Response({'success': False, 'error': 'Arduino no conectado'}, status=500)
+@csrf_exempt
+async def run_sequence(request):
+    """
+    Arranca la ejecución de una secuencia ({'sequence_id':..., 'robot':...})
+    en segundo plano y devuelve su run_id.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Método no permitido'}, status=405)
 
-    print(f"[views.run_sequence] Ejecutando secuencia: {seq.name}")
+    data, error = _request_data(request)
+    if error:
+        return error
+    robot, error = _get_robot(request, data)
+    if error:
+        return error
 
+    # Secuencia compilada en caché: sin consultas si ya se ejecutó antes
     try:
-        for sp in seq.sequenceposition_set.all().order_by('order'):
-            pos = sp.position
-            print(f"   Paso {sp.order}: arm1={pos.arm1_angle}, arm2={pos.arm2_angle}, base={pos.base_height}, gripper={pos.gripper_state}")
-            
-            arduino_controller.send_position(
-                pos.arm1_angle, 
-                pos.arm2_angle, 
-                pos.base_height, 
-                pos.gripper_state,
-                500  # Velocidad por defecto
-            )
-            
-            time.sleep(sp.delay_seconds)
-
-        return Response({'success': True, 'message': 'Secuencia ejecutada correctamente'})
-        
-    except Exception as e:
-        print(f"[views.run_sequence] Error ejecutando secuencia: {e}")
-        return Response({'success': False, 'error': str(e)}, status=500)
+        seq = await sequence_cache.aget(int(data.get('sequence_id')))
+    except (TypeError, ValueError):
+        seq = None
+    if seq is None:
+        return JsonResponse({'success': False, 'error': 'Secuencia no encontrada'}, status=404)
+
+    if not (await robot.astatus())['connected']:
+        return JsonResponse({'success': False, 'error': 'Arduino no conectado'}, status=500)
+
+    run = await robot.astart(seq)
+    if run is None:
+        active = await robot.aactive_run()
+        return JsonResponse({
+            'success': False,
+            'error': 'Ya hay una secuencia en ejecución',
+            'run_id': active.id if active else None
+        }, status=409)
+
+    return JsonResponse({'success': True, 'message': 'Secuencia iniciada', 'robot': robot.id, 'run_id': run.id}, status=202)
+
+def sequence_dry_run(request, sequence_id):
+    """
+    Simulacro de una secuencia sin mover el robot: tiempo de ciclo estimado
+    por paso y total según el modelo del firmware, los pasos más lentos y
+    los que send_position recortaría o traen valores fuera de rango. Parte
+    de la última posición del robot (?robot=), o de home con ?from=home.
+    """
+    robot, error = _get_robot(request)
+    if error:
+        return error
+    sequence = RobotSequence.objects.filter(id=sequence_id).first()
+    if sequence is None:
+        return JsonResponse({'success': False, 'error': 'Secuencia no encontrada'}, status=404)
+
+    start = robot.last_position() if request.GET.get('from') != 'home' else None
+    report = preflight.estimate(load_steps(sequence), start)
+    return JsonResponse({
+        'success': True,
+        'robot': robot.id,
+        'sequence_id': sequence.id,
+        'sequence_name': sequence.name,
+        **report
+    })
+
+def sequence_run_status(request, run_id):
+    """
+    Progreso de una ejecución: paso actual, tiempo transcurrido y ETA.
+    """
+    robot, run = robots.registry.find_run(run_id)
+    if run is None:
+        return JsonResponse({'success': False, 'error': 'Ejecución no encontrada'}, status=404)
+    return JsonResponse({'success': True, 'robot': robot.id, 'run': run.to_dict()})
+
+def _sequence_run_action(request, run_id, action, message):
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Método no permitido'}, status=405)
+    robot, run = robots.registry.find_run(run_id)
+    if run is None:
+        return JsonResponse({'success': False, 'error': 'Ejecución no encontrada'}, status=404)
+    if not getattr(robot.runner, action)(run_id):
+        return JsonResponse({'success': False, 'error': 'Acción no válida en el estado actual'}, status=409)
+    return JsonResponse({
+        'success': True, 'message': message, 'robot': robot.id, 'run': robot.runner.get_run(run_id).to_dict()
+    })
+
+@csrf_exempt
+def pause_sequence_run(request, run_id):
+    return _sequence_run_action(request, run_id, 'pause', 'Secuencia pausada')
+
+@csrf_exempt
+def resume_sequence_run(request, run_id):
+    return _sequence_run_action(request, run_id, 'resume', 'Secuencia reanudada')
+
+@csrf_exempt
+def cancel_sequence_run(request, run_id):
+    return _sequence_run_action(request, run_id, 'cancel', 'Secuencia cancelada')
 
 def control_robot(request):
     """
@@ -0,0 +1,192 @@
+"""
+Mapa precalculado de alcanzabilidad del espacio de trabajo.
+
+Rejilla XY con, por celda: si es alcanzable bajo los límites de
+send_position, la solución de cinemática inversa elegida y su margen
+(grados) hasta el límite articular más cercano. Se guarda como .npy
+mapeado en memoria más un JSON con los metadatos, lo construye el comando
+`build_workspace_map` y se carga la primera vez que se consulta.
+
+Z no entra en la rejilla: la altura es un eje independiente y su
+validación es una comparación de rango (se hace en lookup()).
+"""
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from numpy.lib.format import open_memmap
+
+from . import kinematics
+from .arduino_communication import ARM1_LIMITS, ARM2_LIMITS, BASE_LIMITS
+
+CELL_DTYPE = np.dtype([
+    ('reachable', 'u1'),
+    ('arm1', 'f4'),
+    ('arm2', 'f4'),
+    ('margin', 'f4'),
+])
+
+DEFAULT_RESOLUTION = 0.5
+FORMAT_VERSION = 1
+
+
+def default_path():
+    return Path(getattr(settings, 'SCARA_WORKSPACE_MAP', Path(settings.BASE_DIR) / 'workspace_map.npy'))
+
+
+def _sidecar(path):
+    return Path(path).with_suffix('.json')
+
+
+def _current_config(elbow):
+    return {
+        'version': FORMAT_VERSION,
+        'link_lengths': list(kinematics.link_lengths()),
+        'arm1_limits': list(ARM1_LIMITS),
+        'arm2_limits': list(ARM2_LIMITS),
+        'elbow': elbow,
+    }
+
+
+def joint_margin(arm1, arm2):
+    """Distancia (grados) al límite articular más cercano."""
+    return np.minimum.reduce([
+        arm1 - ARM1_LIMITS[0], ARM1_LIMITS[1] - arm1,
+        arm2 - ARM2_LIMITS[0], ARM2_LIMITS[1] - arm2,
+    ])
+
+
+def build_map(path=None, resolution=DEFAULT_RESOLUTION, elbow='auto', chunk_rows=256):
+    """
+    Calcula la rejilla y la escribe en `path` (.npy) por bloques de filas,
+    así la memoria no crece con la resolución. Retorna los metadatos.
+    """
+    path = Path(path or default_path())
+    l1, l2 = kinematics.link_lengths()
+    reach = l1 + l2
+    xs = np.arange(-reach, reach + resolution / 2, resolution, dtype=float)
+    ys = xs.copy()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    grid = open_memmap(path, mode='w+', dtype=CELL_DTYPE, shape=(len(ys), len(xs)))
+    for start in range(0, len(ys), chunk_rows):
+        rows = ys[start:start + chunk_rows]
+        x, y = np.meshgrid(xs, rows)
+        arm1, arm2, _, valid = kinematics.inverse(x, y, elbow=elbow, l1=l1, l2=l2)
+        block = grid[start:start + len(rows)]
+        block['reachable'] = valid
+        block['arm1'] = np.where(valid, arm1, np.nan)
+        block['arm2'] = np.where(valid, arm2, np.nan)
+        block['margin'] = np.where(valid, joint_margin(arm1, arm2), np.nan)
+    grid.flush()
+
+    meta = _current_config(elbow)
+    meta.update({
+        'resolution': resolution,
+        'x0': float(xs[0]),
+        'y0': float(ys[0]),
+        'shape': [len(ys), len(xs)],
+        'reachable_cells': int(np.count_nonzero(grid['reachable'])),
+    })
+    del grid
+    _sidecar(path).write_text(json.dumps(meta, indent=2))
+    return meta
+
+
+class WorkspaceMap:
+    """
+    Rejilla cargada con mmap. lookup() la usa como filtro grueso y confirma
+    los candidatos con la cinemática inversa exacta.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path or default_path())
+        self.meta = json.loads(_sidecar(self.path).read_text())
+        self.grid = np.load(self.path, mmap_mode='r')
+        self.resolution = self.meta['resolution']
+        self.origin = np.array([self.meta['x0'], self.meta['y0']])
+
+    def is_stale(self):
+        """True si el mapa se construyó con otros eslabones o límites."""
+        current = _current_config(self.meta.get('elbow', 'auto'))
+        return any(self.meta.get(key) != value for key, value in current.items())
+
+    def candidates(self, x, y):
+        """
+        Puntos con alguna de las cuatro celdas que los rodean alcanzable. En
+        el borde del espacio de trabajo la celda más cercana puede decir lo
+        contrario que el punto, así que solo se descartan los que están lejos
+        de toda celda alcanzable.
+        """
+        fx = (x - self.origin[0]) / self.resolution
+        fy = (y - self.origin[1]) / self.resolution
+        col0 = np.floor(fx).astype(np.int64)
+        row0 = np.floor(fy).astype(np.int64)
+        rows, cols = self.grid.shape
+        reachable = self.grid['reachable']
+        near = np.zeros(fx.shape, dtype=bool)
+        for dr in (0, 1):
+            for dc in (0, 1):
+                row, col = row0 + dr, col0 + dc
+                inside = (row >= 0) & (row < rows) & (col >= 0) & (col < cols)
+                near |= inside & reachable[np.where(inside, row, 0), np.where(inside, col, 0)].astype(bool)
+        return near
+
+    def lookup(self, x, y, z=None):
+        """
+        Consulta un lote de puntos. Retorna un dict de arrays: reachable,
+        arm1, arm2, margin. La rejilla descarta los puntos lejos del
+        espacio de trabajo; para el resto la IK exacta (con el codo del mapa)
+        decide si son alcanzables y da los ángulos y el margen del punto, no
+        los de una celda. Un punto alcanzable en una franja más angosta que
+        la resolución, sin celdas alcanzables alrededor, se da por fuera.
+        """
+        x, y = np.broadcast_arrays(np.atleast_1d(np.asarray(x, dtype=float)),
+                                   np.atleast_1d(np.asarray(y, dtype=float)))
+        near = self.candidates(x, y)
+
+        reachable = np.zeros(x.shape, dtype=bool)
+        arm1 = np.full(x.shape, np.nan)
+        arm2 = np.full(x.shape, np.nan)
+        if near.any():
+            a1, a2, _, valid = kinematics.inverse(x[near], y[near], elbow=self.meta.get('elbow', 'auto'))
+            reachable[near] = valid
+            arm1[near] = a1
+            arm2[near] = a2
+        if z is not None:
+            z = np.broadcast_to(np.asarray(z, dtype=float), reachable.shape)
+            reachable &= (z >= BASE_LIMITS[0]) & (z <= BASE_LIMITS[1])
+        arm1 = np.where(reachable, arm1, np.nan)
+        arm2 = np.where(reachable, arm2, np.nan)
+        return {
+            'reachable': reachable,
+            'arm1': arm1,
+            'arm2': arm2,
+            'margin': np.where(reachable, joint_margin(arm1, arm2), np.nan),
+        }
+
+
+_map = None
+_map_lock = threading.Lock()
+
+
+def get_map():
+    """Mapa global, cargado la primera vez. Lanza FileNotFoundError si no existe."""
+    global _map
+    if _map is None:
+        with _map_lock:
+            if _map is None:
+                _map = WorkspaceMap()
+                if _map.is_stale():
+                    print("[workspace] Aviso: el mapa no coincide con la configuración actual; "
+                          "ejecuta build_workspace_map")
+    return _map
+
+
+def reset_map():
+    """Olvida el mapa cargado (p. ej. después de reconstruirlo)."""
+    global _map
+    with _map_lock:
+        _map = None
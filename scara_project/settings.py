@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import json
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -31,6 +33,7 @@ ALLOWED_HOSTS = []
 # Application definition
 
 INSTALLED_APPS = [
+    'daphne',  # runserver con soporte ASGI/WebSocket (Channels)
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -39,11 +42,13 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'scara_control',  # Custom app for SCARA control
     'rest_framework',
+    'channels',
     'control',
     
 ]
 
 MIDDLEWARE = [
+    'scara_control.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,6 +76,15 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'scara_project.wsgi.application'
+ASGI_APPLICATION = 'scara_project.asgi.application'
+
+# Capa de canales en memoria: telemetría por WebSocket sin Redis
+# (un solo proceso; para varios procesos usar channels_redis)
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+    },
+}
 
 
 # Database
@@ -126,3 +140,56 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Robot SCARA / Arduino
+# Se pueden sobreescribir con variables de entorno del mismo nombre.
+
+SCARA_SERIAL_PORT = os.environ.get('SCARA_SERIAL_PORT', 'COM10')
+SCARA_BAUD_RATE = int(os.environ.get('SCARA_BAUD_RATE', '9600'))
+# True para usar MockArduinoController (sin hardware)
+SCARA_USE_FAKE_ARDUINO = os.environ.get('SCARA_USE_FAKE_ARDUINO', 'False').lower() in ('1', 'true', 'yes')
+# 'auto' negocia el protocolo binario; 'csv' o 'binary' lo fuerzan
+SCARA_PROTOCOL = os.environ.get('SCARA_PROTOCOL', 'auto')
+# Comandos sin DONE en vuelo si el firmware tiene buffer circular (0 = stop-and-wait)
+SCARA_PIPELINE_WINDOW = int(os.environ.get('SCARA_PIPELINE_WINDOW', '4'))
+# Longitudes de los eslabones (L1, L2) para la cinemática, p. ej. "80,60"
+SCARA_LINK_LENGTHS = tuple(
+    float(v) for v in os.environ.get('SCARA_LINK_LENGTHS', '80,60').split(',')
+)
+# Máximo de movimientos por segundo del jog del control PS4
+SCARA_JOG_MAX_RATE = float(os.environ.get('SCARA_JOG_MAX_RATE', '10'))
+# Frecuencia (Hz) del jog en velocidad con los sticks analógicos
+SCARA_STICK_RATE = float(os.environ.get('SCARA_STICK_RATE', '25'))
+# Secuencias: pasos seguidos sin delay ni cambio de pinza como una trayectoria continua
+SCARA_SEQUENCE_BLENDING = os.environ.get('SCARA_SEQUENCE_BLENDING', 'True').lower() in ('1', 'true', 'yes')
+# Desviación máxima (grados / cm) para descartar puntos de paso casi alineados
+SCARA_BLEND_TOLERANCE = float(os.environ.get('SCARA_BLEND_TOLERANCE', '0.5'))
+# True si el firmware acepta nuevos objetivos mientras se mueve (trayectorias continuas)
+SCARA_CONTINUOUS_FIRMWARE = os.environ.get('SCARA_CONTINUOUS_FIRMWARE', 'False').lower() in ('1', 'true', 'yes')
+# Mapa de alcanzabilidad precalculado (python manage.py build_workspace_map)
+SCARA_WORKSPACE_MAP = os.environ.get('SCARA_WORKSPACE_MAP', str(BASE_DIR / 'workspace_map.npy'))
+# Log binario de la E/S serial (python manage.py motion_log); vacío lo desactiva
+SCARA_MOTION_LOG = os.environ.get('SCARA_MOTION_LOG', str(BASE_DIR / 'motion_log.bin'))
+# Registros del buffer circular (64 bytes cada uno)
+SCARA_MOTION_LOG_RECORDS = int(os.environ.get('SCARA_MOTION_LOG_RECORDS', '65536'))
+# Varios robots: JSON {"id": {"port", "baud", "fake", "protocol", "pipeline", "motion_log"}};
+# lo que falte toma los valores de arriba. Vacío = un solo robot 'default'.
+SCARA_ROBOTS = json.loads(os.environ.get('SCARA_ROBOTS') or '{}')
+# Robot de las peticiones sin 'robot' y del control PS4 (vacío = el primero de SCARA_ROBOTS)
+SCARA_DEFAULT_ROBOT = os.environ.get('SCARA_DEFAULT_ROBOT', '')
+# Socket Unix del daemon dueño de los puertos (python manage.py robot_daemon);
+# vacío = cada proceso abre su propio puerto, como con un solo worker
+SCARA_DAEMON_SOCKET = os.environ.get('SCARA_DAEMON_SOCKET', '')
+# Caché de Django: guarda las versiones de las cachés en memoria (respuestas
+# de la API y secuencias compiladas, ver shared_versions). Con daemon hay
+# varios procesos y tiene que ser compartida: archivos en SCARA_CACHE_DIR.
+SCARA_CACHE_DIR = os.environ.get('SCARA_CACHE_DIR', str(BASE_DIR / '.scara_cache'))
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': SCARA_CACHE_DIR,
+    } if SCARA_DAEMON_SOCKET else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
@@ -555,19 +555,23 @@ setInterval(pollGamepad, 50);
 
 // ———————————————————————————————
 // 13. Verificar estado de Arduino (solo indica conectado/desconectado)
+function applyArduinoStatus(data) {
+  const dot = document.getElementById("arduino-dot");
+  if (dot) {
+    dot.classList.remove("bg-green-500", "bg-gray-500");
+    dot.classList.add(data.connected ? "bg-green-500" : "bg-gray-500");
+  }
+  // Actualizamos busy para usarlo en el momento de aplicar movimientos
+  if (window.scara2D && window.scara2D.appState) {
+    window.scara2D.appState.busy = data.busy;
+  }
+}
+
 async function checkArduinoStatus() {
   try {
     let res = await fetch("/get-status/");
     let data = await res.json();
-    const dot = document.getElementById("arduino-dot");
-    if (dot) {
-      dot.classList.remove("bg-green-500", "bg-gray-500");
-      dot.classList.add(data.connected ? "bg-green-500" : "bg-gray-500");
-    }
-    // Actualizamos busy para usarlo en el momento de aplicar movimientos
-    if (window.scara2D && window.scara2D.appState) {
-      window.scara2D.appState.busy = data.busy;
-    }
+    applyArduinoStatus(data);
   } catch (e) {
     console.error("Error al verificar estado Arduino:", e);
     const dot = document.getElementById("arduino-dot");
@@ -581,8 +585,13 @@ async function checkArduinoStatus() {
   }
 }
 
-checkArduinoStatus();
-setInterval(checkArduinoStatus, 3000);
+if (window.scaraTelemetry) {
+  // Estado empujado por el backend (WebSocket), sin polling
+  window.scaraTelemetry.subscribe(applyArduinoStatus);
+} else {
+  checkArduinoStatus();
+  setInterval(checkArduinoStatus, 3000);
+}
 
 // ———————————————————————————————
 // 14. Resto de inicialización
@@ -279,7 +279,13 @@ document.addEventListener("DOMContentLoaded", () => {
   }
 
   // ===== ESPERAR HASTA QUE busy === false =====
-  function waitUntilNotBusy(pollInterval = 500) {
+  // Con telemetría (WebSocket) se espera el aviso del backend; si no, polling.
+  function waitUntilNotBusy(since, pollInterval = 500) {
+    if (window.scaraTelemetry) {
+      return window.scaraTelemetry.waitUntilNotBusy(since).then(status => {
+        if (status) updateConnectionStatus(status);
+      });
+    }
     return new Promise((resolve) => {
       const intervalId = setInterval(async () => {
         const status = await checkSystemStatus();
@@ -347,6 +353,7 @@ document.addEventListener("DOMContentLoaded", () => {
       // Antes de enviar, marcar busy en interfaz
       appState.busy = true;
       setControlsEnabled(false);
+      const statusMark = window.scaraTelemetry ? window.scaraTelemetry.mark() : 0;
       logToTerminal(`[sendCmd] POST /send-command/ -> ${JSON.stringify(payload)}`, true);
       logToTerminal(`[sendCmd] Estado gripper: ${appState.gripperClosed ? 'CERRAR (119°)' : 'ABRIR (180°)'}`, true);
 
@@ -371,7 +378,7 @@ document.addEventListener("DOMContentLoaded", () => {
       }
 
       // Si todo OK, esperar hasta que Arduino mande DONE (backend actualiza busy=false)
-      await waitUntilNotBusy();
+      await waitUntilNotBusy(statusMark);
       logToTerminal("✅ Robot libre, controles habilitados", true);
       return true;
 
@@ -394,6 +401,7 @@ document.addEventListener("DOMContentLoaded", () => {
       // Marcar busy
       appState.busy = true;
       setControlsEnabled(false);
+      const statusMark = window.scaraTelemetry ? window.scaraTelemetry.mark() : 0;
       logToTerminal("[sendHome] POST /home/", true);
 
       const response = await fetch("/home/", {
@@ -420,7 +428,7 @@ document.addEventListener("DOMContentLoaded", () => {
       await updateRobotInterface();
 
       // Esperar hasta que Arduino mande DONE
-      await waitUntilNotBusy();
+      await waitUntilNotBusy(statusMark);
       logToTerminal("✅ Home completado, controles habilitados", true);
       return true;
 
@@ -659,8 +667,13 @@ document.addEventListener("DOMContentLoaded", () => {
     });
   }
 
-  // ===== MONITOREO PERIÓDICO DEL ESTADO =====
+  // ===== MONITOREO DEL ESTADO =====
+  // El backend empuja los cambios por /ws/telemetry/; sin telemetry.js se hace polling.
   function startStatusMonitoring() {
+    if (window.scaraTelemetry) {
+      window.scaraTelemetry.subscribe(updateConnectionStatus);
+      return;
+    }
     setInterval(async () => {
       await checkSystemStatus();
     }, 5000);
@@ -0,0 +1,130 @@
+// static/js/telemetry.js - Estado del robot en vivo por WebSocket (/ws/telemetry/)
+// Si el WebSocket no está disponible (p. ej. servidor WSGI), cae a long-poll de /get-status/.
+(function () {
+  const listeners = [];
+  let lastStatus = null;
+  let statusSeq = 0;          // Se incrementa con cada estado recibido
+  let socket = null;
+  let polling = false;
+  let statusVersion = null;   // 'version' de la última respuesta de /get-status/
+  let retryDelay = 1000;
+  const POLL_INTERVAL = 3000;
+  const LONG_POLL_WAIT = 25;  // Segundos que el servidor retiene la petición
+  const MAX_RETRY_DELAY = 15000;
+
+  function dispatch(status) {
+    lastStatus = status;
+    statusSeq += 1;
+    listeners.slice().forEach(cb => {
+      try {
+        cb(status, statusSeq);
+      } catch (e) {
+        console.error("[telemetry] Error en suscriptor:", e);
+      }
+    });
+  }
+
+  async function pollOnce(longPoll = false) {
+    try {
+      let url = "/get-status/";
+      if (longPoll && statusVersion !== null) {
+        // El servidor responde cuando el estado cambia (o al vencer la espera)
+        url += `?version=${statusVersion}&wait=${LONG_POLL_WAIT}`;
+      }
+      const res = await fetch(url, { credentials: "same-origin" });
+      if (res.ok) {
+        const status = await res.json();
+        statusVersion = status.version ?? null;
+        dispatch(status);
+        return lastStatus;
+      }
+    } catch (e) {
+      console.warn("[telemetry] Error en polling de estado:", e);
+    }
+    statusVersion = null;
+    dispatch({ connected: false, busy: false, last_position: null });
+    return lastStatus;
+  }
+
+  async function startPolling() {
+    if (polling) return;
+    polling = true;
+    while (polling) {
+      await pollOnce(true);
+      // Sin long-poll (error o servidor sin 'version') se espera como un polling normal
+      if (polling && statusVersion === null) {
+        await new Promise(r => setTimeout(r, POLL_INTERVAL));
+      }
+    }
+  }
+
+  function stopPolling() {
+    polling = false;
+  }
+
+  function connect() {
+    if (!("WebSocket" in window)) {
+      startPolling();
+      return;
+    }
+    const scheme = window.location.protocol === "https:" ? "wss" : "ws";
+    socket = new WebSocket(`${scheme}://${window.location.host}/ws/telemetry/`);
+
+    socket.onopen = () => {
+      retryDelay = 1000;
+      stopPolling();
+      console.log("[telemetry] WebSocket conectado");
+    };
+
+    socket.onmessage = (event) => {
+      const msg = JSON.parse(event.data);
+      if (msg.type === "status") {
+        dispatch(msg.status);
+      }
+    };
+
+    socket.onclose = () => {
+      // Mientras no haya WebSocket seguimos actualizando por polling
+      startPolling();
+      setTimeout(connect, retryDelay);
+      retryDelay = Math.min(retryDelay * 2, MAX_RETRY_DELAY);
+    };
+  }
+
+  window.scaraTelemetry = {
+    // Registra un callback(status); si ya hay estado se llama de inmediato
+    subscribe(cb) {
+      listeners.push(cb);
+      if (lastStatus) cb(lastStatus);
+    },
+    // Último estado conocido, o uno nuevo por HTTP si aún no hay
+    async getStatus() {
+      return lastStatus || pollOnce();
+    },
+    // Marca para waitUntilNotBusy: tomarla antes de enviar un comando
+    mark() {
+      return statusSeq;
+    },
+    // Promesa que se resuelve con el primer estado busy === false recibido
+    // después de la marca `since` (así no cuenta un "libre" previo al comando)
+    waitUntilNotBusy(since = statusSeq) {
+      return new Promise((resolve) => {
+        const check = (status, seq) => {
+          if (seq > since && (!status || !status.busy)) {
+            const i = listeners.indexOf(check);
+            if (i >= 0) listeners.splice(i, 1);
+            resolve(status);
+            return true;
+          }
+          return false;
+        };
+        if (!check(lastStatus, statusSeq)) listeners.push(check);
+      });
+    },
+    get lastStatus() {
+      return lastStatus;
+    }
+  };
+
+  connect();
+})();